@@ -1,7 +1,18 @@
-
 """
 Calendar Agent Package
+
+The agent is built on first access to `agent`, `root_agent` or `build_agent`,
+so importing `agent.tools` does not load ADK or build the agent.
 """
-from .agent import agent, root_agent, build_agent
+import importlib
+
+__all__ = ['agent', 'root_agent', 'build_agent']
+
 
-__all__ = ['agent', 'root_agent', 'build_agent']
\ No newline at end of file
+def __getattr__(name):
+    if name in __all__:
+        module = importlib.import_module('.agent', __name__)
+        # Importing the submodule binds `agent` to it; rebind to the Agent object
+        globals().update({attr: getattr(module, attr) for attr in __all__})
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,6 @@
 import os
 import logging
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +17,7 @@ except ImportError:
     from google.adk import Agent, InvocationContext, Event
 
 from agent.prompt import get_system_prompt
+from agent.router import IntentRouter, user_text
 # Import your calendar tools - FIXED IMPORTS
 from agent.tools.calendar_tools import (
     list_upcoming_events,
@@ -26,6 +28,17 @@ from agent.tools.calendar_tools import (
     find_meeting_slots,
     force_create_event
 )
+from agent.tools.batch_tools import batch_manage_events
+from agent.tools.scheduler import plan_schedule
+from agent.tools.calendar_service import preload as preload_calendar_client
+from agent.tools.async_tools import make_async
+from agent.tools.session_cache import release_session, session_cached, use_session
+from agent.tools.metrics import (
+    instrument,
+    before_model_callback,
+    after_model_callback,
+    start_metrics_server
+)
 
 # Import your new intelligent prompt tools
 from agent.tools.prompt_tools import (
@@ -45,25 +58,51 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 
-# Register calendar tools with ADK FunctionTool wrapper
-tools = [
-    FunctionTool(list_upcoming_events),
-    FunctionTool(create_calendar_event),
-    FunctionTool(search_events),
-    FunctionTool(create_meeting_with_attendees),
-    FunctionTool(check_free_busy),
-    FunctionTool(find_meeting_slots),
+tool_functions = [
+    list_upcoming_events,
+    create_calendar_event,
+    search_events,
+    create_meeting_with_attendees,
+    check_free_busy,
+    find_meeting_slots,
     # Add the new intelligent tools
-    FunctionTool(smart_create_event_from_text),
-    FunctionTool(parse_user_input_to_task),
-    FunctionTool(analyze_calendar_events),
-    FunctionTool(get_movable_events_from_calendar),
-    FunctionTool(get_location),
-    FunctionTool(get_current_weather),
-    FunctionTool(get_forecast_summary),
-    FunctionTool(force_create_event),
+    smart_create_event_from_text,
+    parse_user_input_to_task,
+    analyze_calendar_events,
+    get_movable_events_from_calendar,
+    get_location,
+    get_current_weather,
+    get_forecast_summary,
+    force_create_event,
+    batch_manage_events,
+    plan_schedule,
 ]
 
+# Register tools with ADK FunctionTool wrapper. The async wrappers run each
+# blocking call on a worker thread so one slow API call never stalls the loop,
+# instrument() records calls, latency and errors per tool, and
+# session_cached() memoizes read tools per session (writes invalidate them).
+tools = [FunctionTool(instrument(make_async(session_cached(func)))) for func in tool_functions]
+
+# Serves /metrics when METRICS_PORT is set
+start_metrics_server()
+
+
+def _preload_backends():
+    preload_calendar_client()
+    from agent.tools.http_session import get_http_session
+    get_http_session()
+
+
+# Load the Google client libraries and requests in the background so neither
+# the import nor the first tool call has to wait for them
+if os.getenv("TOOL_PRELOAD", "1") != "0":
+    threading.Thread(target=_preload_backends, name="tool-preload", daemon=True).start()
+
+# Answers the most common requests without a model call (ROUTER_INTENTS)
+router = IntentRouter()
+
+
 # Rest of your agent code stays exactly the same...
 class CalendarAgent(Agent):
     """Calendar agent that can read and create Google Calendar events."""
@@ -83,9 +122,29 @@ class CalendarAgent(Agent):
         logger.info(f"📅 Calendar Agent - User: {user_email}")
         logger.debug(f"🧾 Full session context: {ctx.session.__dict__}")
 
-        # Proceed with normal agent run
-        async for event in super()._run_async_impl(ctx):
-            yield event
+        # Read tools called during this invocation share the session's result cache
+        session_token = use_session(getattr(getattr(ctx, "session", None), "id", None))
+        try:
+            # Known intents are answered from a template; everything else goes to the model
+            text = user_text(getattr(ctx, "user_content", None))
+            if text:
+                user_id = getattr(getattr(ctx, "session", None), "user_id", None)
+                answer = await router.answer(text, user_id)
+                if answer is not None:
+                    logger.info("⚡ Answered by the intent router")
+                    yield Event(
+                        invocation_id=ctx.invocation_id,
+                        author=self.name,
+                        branch=ctx.branch,
+                        content=types.Content(role="model", parts=[types.Part(text=answer)]),
+                    )
+                    return
+
+            # Proceed with normal agent run
+            async for event in super()._run_async_impl(ctx):
+                yield event
+        finally:
+            release_session(session_token)
 
 
 
@@ -101,6 +160,8 @@ def build_agent() -> Agent:
         tools=tools,
         instruction=system_prompt,
         generate_content_config=types.GenerateContentConfig(temperature=0.7),
+        before_model_callback=before_model_callback,
+        after_model_callback=after_model_callback,
     )
 
 
@@ -1,6 +1,8 @@
 
 from datetime import datetime
 
+from agent.tools.result_format import COMPACT_NOTE, compact_results
+
 
 def get_system_prompt() -> str:
 
@@ -72,6 +74,7 @@ NOTE: For Event Listing Behavior: 🚨
 ### When user wants schedule analysis:
 - "What can I move?" → Use get_movable_events_from_calendar
 - "Which meetings are flexible?" → Use analyze_calendar_events
+- "Fit these tasks into my week" → Use plan_schedule with ALL tasks in one call, show the plan, and only apply it with batch_manage_events after the user confirms
 
 ### For Meeting Coordination:
 - Use 'create_meeting_with_attendees' to schedule and invite others
@@ -83,6 +86,7 @@ NOTE: For Event Listing Behavior: 🚨
 - Always use ISO 8601 format: 'YYYY-MM-DDTHH:MM:SS+TZ'
 - Default timezone is Europe/Amsterdam (+01:00 or +02:00 for DST)
 - For natural language, parse with smart tools first, then create actual events
+- If the parsed data contains 'start_time' and 'end_time', use them as-is in 'create_calendar_event' without recomputing dates
 - Be proactive about suggesting meeting times based on availability
 - Explain the intelligent categorization when using smart parsing
 
@@ -93,6 +97,12 @@ NOTE: For Event Listing Behavior: 🚨
 - Only call 'force_create_event' after explicit user confirmation
 - Never call 'force_create_event' without first showing the conflict warning
 
+### For Creating, Updating or Deleting Many Events:
+- Use 'batch_manage_events' with ALL operations in a single call (e.g. "block every weekday morning for the next month")
+- Never loop over 'create_calendar_event' for recurring blocks
+- Conflicting items are skipped and reported; only re-run them with force_create=True after explicit user confirmation
+- Items reported as "may or may not be applied" lost their connection mid-request: check with 'list_upcoming_events' or 'search_events' before re-running them, to avoid duplicates
+
 ### For weather Detection for current day
 - Use 'get_location' to automatically find the user's current location.
 - Then, use  'get_current_weather' with that city to retrieve the weather data.
@@ -139,6 +149,8 @@ NOTE: For Event Listing Behavior: 🚨
 
 Be friendly, intelligent, and help users manage their time more effectively!"""
 
+    if compact_results():
+        SYSTEM_PROMPT += f"\n\n## Tool Results:\n{COMPACT_NOTE}"
 
     return SYSTEM_PROMPT
 
@@ -0,0 +1,238 @@
+"""
+Pre-model intent router.
+
+The most common requests ("what's on today", "what's the weather", "what
+time is it") need two model round trips through the agent: one to pick the
+tool and one to phrase its result. The router recognizes a small set of
+high-confidence phrasings, calls the tool directly and answers from a
+template. Anything it does not match exactly, or whose tool call fails,
+goes to the model as before.
+
+Intents are enabled with ROUTER_INTENTS (comma-separated, default
+"time,date,events_today,weather"; empty or "off" disables the router).
+Hits, misses and the estimated model time saved are recorded in
+agent.tools.metrics under 'router'.
+"""
+import os
+import re
+import time
+import logging
+import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agent.tools.async_tools import make_async
+from agent.tools.calendar_time import DEFAULT_TZ, event_bounds
+from agent.tools.metrics import instrument, registry
+
+logger = logging.getLogger(__name__)
+
+ROUTER_INTENTS = os.getenv("ROUTER_INTENTS", "time,date,events_today,weather")
+
+# Model calls a routed request would have needed (pick the tool, phrase the answer)
+ROUTER_MODEL_CALLS_SAVED = int(os.getenv("ROUTER_MODEL_CALLS_SAVED", "2"))
+# Assumed model latency until real model calls have been measured
+ROUTER_MODEL_LATENCY_MS = float(os.getenv("ROUTER_MODEL_LATENCY_MS", "1000"))
+
+_POLITE = re.compile(r"^(hey|hi|hello|ok|okay|please|so)\b\s*|\s*\b(please|thanks|thank you)$")
+
+# Words that end a city name in a weather question
+_NOT_CITY = (
+    r"(today|tonight|tomorrow|now|right|this|next|later|weekend|week|morning|afternoon|evening"
+    r"|please|thanks|thank|like|outside)\b"
+)
+
+# Whole-message patterns over normalize()d text. Bare replies such as "today"
+# are left alone: they are usually answers to a question the model asked.
+PATTERNS = {
+    'time': r"(whats|what is) the (current )?time( now| right now)?|what time is it( now| right now)?",
+    'date': r"(whats|what is) (the date|todays date|the date today)|what day is (it|today)( today)?",
+    'events_today': (
+        r"(whats|what is) (on (my (calendar|schedule|agenda) )?|my (calendar|schedule|agenda|plan) )(for |on )?today"
+        r"|what do i have (on |planned |scheduled )?today"
+        r"|(show|list|give) (me )?(my )?(events|meetings|calendar|schedule|agenda) (for )?today"
+        r"|(do i have|are there) any (events|meetings) today"
+        r"|(my )?(schedule|agenda|calendar|events|meetings) (for )?today"
+    ),
+    # A question ("whats the weather") or a qualifier ("weather today", "weather in paris");
+    # a bare "weather" is usually a fragment or a reply. The city is one to four words
+    # and never a time or filler word, so "in paris tomorrow" goes to the model
+    'weather': (
+        r"((whats|what is|hows|how is) the weather|weather(?=( like)? (today|now|right now|outside|in )))"
+        r"( like)?( today| now| right now| outside)?"
+        r"( in (?P<city>(?!" + _NOT_CITY + r")[a-z][a-z.'-]*( (?!" + _NOT_CITY + r")[a-z][a-z.'-]*){0,3}))?"
+        r"( today| now| right now)?( please| thanks| thank you)?"
+    ),
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop apostrophes and trailing punctuation, collapse spaces."""
+    text = text.lower().replace("’", "'").replace("'", "")
+    text = re.sub(r"[?!.,]+", " ", text)
+    text = " ".join(text.split())
+    previous = None
+    while previous != text:
+        previous, text = text, _POLITE.sub("", text).strip()
+    return text
+
+
+# ---------------------------------------------------------------- handlers
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(DEFAULT_TZ)
+
+
+def answer_time(match, user_id) -> str:
+    # DEFAULT_TZ is USER_TIMEZONE (the server's zone only when it is unset); name it
+    return f"🕒 It's {_now():%H:%M %Z}."
+
+
+def answer_date(match, user_id) -> str:
+    now = _now()
+    return f"📅 Today is {now:%A, %B} {now.day}, {now.year}."
+
+
+def answer_events_today(match, user_id) -> Optional[str]:
+    from agent.tools.calendars import calendar_name, events_between, get_synced_stores
+
+    now = _now()
+    midnight = datetime.datetime.combine(now.date(), datetime.time.min, tzinfo=DEFAULT_TZ)
+    events = events_between(get_synced_stores(), midnight, midnight + datetime.timedelta(days=1))
+    if not events:
+        return "📅 You have no events scheduled for today. Want me to show your upcoming events?"
+
+    lines = [f"📅 Today ({now:%A, %B} {now.day}) you have {len(events)} event(s):\n"]
+    for calendar_id, event in events:
+        if 'date' in event['start']:
+            when = "All day"
+        else:
+            start, end = (value.astimezone(DEFAULT_TZ) for value in event_bounds(event, DEFAULT_TZ))
+            when = f"{start:%H:%M}–{end:%H:%M}"
+        line = f"• {when} {event.get('summary', 'No title')}"
+        if event.get('location'):
+            line += f" 📍 {event['location']}"
+        if calendar_id != 'primary':
+            line += f" ({calendar_name(calendar_id)})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _clothing(feels_like: float, condition: str) -> str:
+    if feels_like < 0:
+        advice = "Bundle up with a heavy winter coat, hat, gloves and a scarf"
+    elif feels_like < 10:
+        advice = "Wear a warm jacket"
+    elif feels_like < 18:
+        advice = "A light sweater or jacket should do"
+    elif feels_like < 25:
+        advice = "T-shirt weather, maybe with a light layer for the evening"
+    else:
+        advice = "Wear light clothing, use sunscreen and stay hydrated"
+    if any(word in condition for word in ('rain', 'drizzle', 'thunder')):
+        advice += ", and take an umbrella ☂️"
+    elif 'snow' in condition:
+        advice += ", and wear waterproof boots ❄️"
+    return advice + "."
+
+
+def answer_weather(match, user_id) -> Optional[str]:
+    from agent.tools.weather_tools import get_current_weather, get_location
+
+    city = (match.groupdict().get('city') or '').strip().title()
+    if not city:
+        location = get_location(SimpleNamespace(user_id=user_id))
+        if not location:
+            return None
+        city = location.get('city')
+    weather = get_current_weather(city) if city else None
+    if not weather:
+        return None
+
+    main = weather['main']
+    condition = weather['weather'][0]['description'] if weather.get('weather') else 'unknown conditions'
+    temp, feels = round(main['temp']), round(main['feels_like'])
+    return (
+        f"🌤️ {weather.get('name') or city}: {temp}°C (feels like {feels}°C), {condition}, "
+        f"humidity {main.get('humidity', '?')}%.\n{_clothing(main['feels_like'], condition.lower())}"
+    )
+
+
+HANDLERS: Dict[str, Callable] = {
+    'time': answer_time,
+    'date': answer_date,
+    'events_today': answer_events_today,
+    'weather': answer_weather,
+}
+
+
+# ------------------------------------------------------------------ router
+
+class IntentRouter:
+    """Matches whole messages against the enabled intents and answers them."""
+
+    def __init__(self, intents: str = ROUTER_INTENTS):
+        """
+        Args:
+            intents: Comma-separated intent names (see PATTERNS); empty or
+                'off' disables routing
+        """
+        names = [] if intents.strip().lower() in ('', 'off', 'none') else \
+            [name.strip() for name in intents.split(',') if name.strip()]
+        unknown = [name for name in names if name not in PATTERNS]
+        if unknown:
+            raise ValueError(f"Unknown router intents: {', '.join(unknown)}")
+        self.intents: List[Tuple[str, re.Pattern, Callable]] = [
+            (name, re.compile(PATTERNS[name]), make_async(instrument(HANDLERS[name], name=f"router.{name}")))
+            for name in names
+        ]
+
+    def match(self, text: str):
+        """Return (intent, match, handler) for a message, or None."""
+        if not self.intents or len(text) > 120:
+            return None
+        normalized = normalize(text)
+        for name, pattern, handler in self.intents:
+            found = pattern.fullmatch(normalized)
+            if found:
+                return name, found, handler
+        return None
+
+    async def answer(self, text: str, user_id: str = None) -> Optional[str]:
+        """
+        Answer a message without the model if it is a known intent.
+
+        Args:
+            text: The user's message
+            user_id: Session user, for per-user caches (location)
+
+        Returns:
+            The answer, or None when the message should go to the model
+        """
+        if not self.intents:
+            return None
+        start = time.perf_counter()
+        matched = self.match(text)
+        result = None
+        if matched is not None:
+            intent, found, handler = matched
+            try:
+                result = await handler(found, user_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Router intent '{intent}' failed, using the model: {e}")
+                result = None
+        if result is None:
+            registry.observe_route_miss()
+            return None
+
+        model_latency = registry.model_latency() or ROUTER_MODEL_LATENCY_MS / 1000
+        registry.observe_route(intent, time.perf_counter() - start, ROUTER_MODEL_CALLS_SAVED * model_latency)
+        return result
+
+
+def user_text(content) -> Optional[str]:
+    """Text of a user message, or None when it has non-text parts (files, images)."""
+    parts = getattr(content, 'parts', None) or []
+    if not parts or any(getattr(part, 'text', None) is None for part in parts):
+        return None
+    return " ".join(part.text for part in parts).strip() or None
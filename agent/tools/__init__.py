@@ -8,9 +8,13 @@ from .calendar_tools import (
     find_meeting_slots,
     get_calendar_credentials
 )
+from .batch_tools import batch_manage_events
+from .scheduler import plan_schedule
 from .prompt_tools import (
     parse_user_input_to_task,
     analyze_calendar_events,
+    classify_event_title,
+    classify_event_titles,
     smart_create_event_from_text,
     get_movable_events_from_calendar
 )
@@ -24,8 +28,12 @@ __all__ = [
     'check_free_busy',
     'find_meeting_slots',
     'get_calendar_credentials',
+    'batch_manage_events',
+    'plan_schedule',
     'parse_user_input_to_task',
     'analyze_calendar_events',
+    'classify_event_title',
+    'classify_event_titles',
     'smart_create_event_from_text',
     'get_movable_events_from_calendar'
 ]
\ No newline at end of file
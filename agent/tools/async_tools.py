@@ -0,0 +1,44 @@
+"""
+Async wrappers that keep blocking tool calls off the event loop.
+
+The Google API client and `requests` are synchronous. Every tool is wrapped
+in a coroutine that runs the original function on a bounded thread pool, so
+a slow Calendar or OpenWeather call only occupies one worker thread while
+other sessions on the same event loop keep running.
+"""
+import os
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "16"))
+
+_executor = ThreadPoolExecutor(max_workers=TOOL_MAX_WORKERS, thread_name_prefix="tool")
+
+
+def make_async(func):
+    """
+    Wrap a blocking tool function in a coroutine function.
+
+    The wrapper keeps the original name, docstring and signature, which ADK
+    uses to build the function declaration, and copies the caller's context
+    variables into the worker thread.
+
+    Args:
+        func: Synchronous tool function
+
+    Returns:
+        Async function with the same signature
+    """
+    if asyncio.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(_executor, call)
+
+    return wrapper
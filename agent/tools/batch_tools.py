@@ -0,0 +1,204 @@
+"""
+Bulk event operations sent through Google API HTTP batch requests.
+"""
+from typing import List
+
+from .calendar_service import get_calendar_service
+from .calendar_tools import find_conflicts_batch
+from .calendar_time import event_bounds, parse_iso
+from .event_store import get_event_store
+from .interval_index import IntervalIndex
+from .result_format import compact, compact_results
+
+# Google Calendar accepts at most 50 calls in one batch request
+BATCH_SIZE = 50
+
+ACTIONS = ('create', 'update', 'delete')
+
+
+def _event_body(op: dict) -> dict:
+    body = {}
+    if op.get('summary'):
+        body['summary'] = op['summary']
+    if op.get('start_time'):
+        body['start'] = {'dateTime': op['start_time']}
+    if op.get('end_time'):
+        body['end'] = {'dateTime': op['end_time']}
+    if op.get('description'):
+        body['description'] = op['description']
+    if op.get('location'):
+        body['location'] = op['location']
+    if op.get('attendee_emails'):
+        body['attendees'] = [{'email': email} for email in op['attendee_emails']]
+    return body
+
+
+def _validate(op: dict):
+    """Return an error message for a malformed operation, or None."""
+    action = op.get('action', 'create')
+    if action not in ACTIONS:
+        return f"unknown action '{action}'"
+    if action in ('update', 'delete') and not op.get('event_id'):
+        return f"'{action}' needs an event_id"
+    if action == 'create':
+        missing = [key for key in ('summary', 'start_time', 'end_time') if not op.get(key)]
+        if missing:
+            return f"missing {', '.join(missing)}"
+    if bool(op.get('start_time')) != bool(op.get('end_time')):
+        return "start_time and end_time must be given together"
+    if op.get('start_time'):
+        try:
+            start, end = parse_iso(op['start_time']), parse_iso(op['end_time'])
+        except (TypeError, ValueError):
+            return "start_time and end_time must be ISO date-times"
+        if end <= start:
+            return "end_time must be after start_time"
+    return None
+
+
+def _find_conflicts(ops: List[dict], items: List[int], force_create: bool):
+    """
+    Conflict check for every timed create/update in the batch at once.
+
+    Checks against the calendar and against other items of the same batch.
+    Returns a mapping of item index to a list of conflict descriptions.
+    """
+    timed = [i for i in items if ops[i].get('start_time') and ops[i].get('action', 'create') != 'delete']
+    if force_create or not timed:
+        return {}
+
+    proposed = [_event_body(ops[i]) for i in timed]
+    calendar_hits = find_conflicts_batch(proposed)
+
+    deleted = {ops[i]['event_id'] for i in items if ops[i].get('action') == 'delete'}
+    batch_index = IntervalIndex(
+        (*event_bounds(body), i) for i, body in zip(timed, proposed)
+    )
+
+    conflicts = {}
+    for i, body, hits in zip(timed, proposed, calendar_hits):
+        found = [
+            f"{hit['summary']} ({hit['start']} to {hit['end']})"
+            for hit in hits
+            if hit['id'] != ops[i].get('event_id') and hit['id'] not in deleted
+        ]
+        found += [
+            f"batch item #{other + 1} '{ops[other].get('summary', '')}'"
+            for other in batch_index.overlapping(*event_bounds(body))
+            if other != i
+        ]
+        if found:
+            conflicts[i] = found
+    return conflicts
+
+
+def batch_manage_events(
+    operations: List[dict],
+    force_create: bool = False,
+    send_notifications: bool = False
+) -> str:
+    """
+    Create, update or delete many calendar events in one step.
+    Use this instead of calling create_calendar_event repeatedly, e.g. for
+    "block every weekday morning for focus time for the next month".
+
+    Args:
+        operations: List of operations. Each is a dict with:
+            - action: 'create' (default), 'update' or 'delete'
+            - event_id: Required for 'update' and 'delete'
+            - summary, start_time, end_time: Required for 'create' (ISO format)
+            - description, location, attendee_emails: Optional
+        force_create: If True, skip conflict checks and write every item
+        send_notifications: Whether to email attendees about the changes (default: False)
+
+    Returns:
+        One consolidated report with the outcome of every operation
+    """
+    try:
+        service = get_calendar_service()
+        store = get_event_store()
+        send_updates = 'all' if send_notifications else 'none'
+
+        outcomes = {}
+        valid = []
+        for i, op in enumerate(operations):
+            error = _validate(op)
+            if error:
+                outcomes[i] = ('failed', error)
+            else:
+                valid.append(i)
+
+        conflicts = _find_conflicts(operations, valid, force_create)
+        for i, found in conflicts.items():
+            outcomes[i] = ('conflict', '; '.join(found))
+        to_send = [i for i in valid if i not in conflicts]
+
+        def callback(request_id, response, exception):
+            i = int(request_id)
+            action = operations[i].get('action', 'create')
+            if exception is not None:
+                outcomes[i] = ('failed', str(exception))
+            elif action == 'delete':
+                store.remove(operations[i]['event_id'])
+                outcomes[i] = ('ok', 'deleted')
+            else:
+                store.upsert(response)
+                outcomes[i] = ('ok', response.get('htmlLink', 'N/A'))
+
+    except Exception as e:
+        return f"❌ Error running batch: {str(e)}"
+
+    for offset in range(0, len(to_send), BATCH_SIZE):
+        chunk = to_send[offset:offset + BATCH_SIZE]
+        try:
+            batch = service.new_batch_http_request(callback=callback)
+            for i in chunk:
+                op = operations[i]
+                action = op.get('action', 'create')
+                if action == 'create':
+                    request = service.events().insert(
+                        calendarId='primary', body=_event_body(op), sendUpdates=send_updates
+                    )
+                elif action == 'update':
+                    request = service.events().patch(
+                        calendarId='primary', eventId=op['event_id'],
+                        body=_event_body(op), sendUpdates=send_updates
+                    )
+                else:
+                    request = service.events().delete(
+                        calendarId='primary', eventId=op['event_id'], sendUpdates=send_updates
+                    )
+                batch.add(request, request_id=str(i))
+            batch.execute()
+        except Exception as e:
+            # Earlier chunks are written already; report this one and go on with the next
+            for i in chunk:
+                if i not in outcomes:
+                    outcomes[i] = ('failed', f"batch request failed, may or may not be applied: {e}")
+
+    done = sum(1 for status, _ in outcomes.values() if status == 'ok')
+    if compact_results():
+        ops = []
+        for i, op in enumerate(operations):
+            status, detail = outcomes.get(i, ('failed', 'not executed'))
+            row = {'n': i + 1, 'st': status}
+            if status != 'ok':
+                row['err'] = detail
+            ops.append(row)
+        return compact('batch_manage_events', {'done': done, 'of': len(operations), 'ops': ops})
+    output = f"📦 Batch finished: {done}/{len(operations)} operation(s) succeeded\n\n"
+    for i, op in enumerate(operations):
+        status, detail = outcomes.get(i, ('failed', 'not executed'))
+        label = f"{op.get('action', 'create')} '{op.get('summary') or op.get('event_id', '')}'"
+        if op.get('start_time'):
+            label += f" {op['start_time']} to {op.get('end_time', '')}"
+        if status == 'ok':
+            output += f"{i + 1}. ✅ {label}\n"
+        elif status == 'conflict':
+            output += f"{i + 1}. ⚠️ {label} skipped, conflicts with: {detail}\n"
+        else:
+            output += f"{i + 1}. ❌ {label} failed: {detail}\n"
+
+    if conflicts:
+        output += "\nConflicting items were not created. Re-run them with force_create=True if the user confirms."
+    return output
@@ -0,0 +1,218 @@
+"""
+Shared Google Calendar service and credential manager.
+
+Credentials are loaded from disk once per process and refreshed proactively
+shortly before they expire. The discovery-based service object is built once
+per thread (httplib2 connections are not thread-safe) and reused by every tool.
+
+The Google client libraries are imported on first use rather than at import
+time, and the Calendar discovery document bundled with google-api-python-client
+is parsed once per process, which keeps cold starts short.
+"""
+import os
+import json
+import datetime
+import logging
+import threading
+
+from .metrics import instrument_http
+
+logger = logging.getLogger(__name__)
+
+# Scopes for Google Calendar access
+SCOPES = [
+    'https://www.googleapis.com/auth/calendar',
+    'https://www.googleapis.com/auth/userinfo.email',
+    'https://www.googleapis.com/auth/userinfo.profile',
+    'openid'
+]
+
+TOKEN_FILE = 'token.json'
+CLIENT_SECRETS_FILE = 'client_secret.json'
+
+# Refresh the access token this many seconds before it actually expires
+REFRESH_MARGIN_SECONDS = int(os.getenv("CALENDAR_TOKEN_REFRESH_MARGIN", "300"))
+
+# Base URL of the Calendar API, e.g. "http://127.0.0.1:8765/calendar/v3/" for
+# the offline benchmark backend. Empty means the public Google endpoint.
+CALENDAR_API_ENDPOINT = os.getenv("CALENDAR_API_ENDPOINT", "")
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/calendar/v3/rest"
+
+_discovery_lock = threading.Lock()
+_discovery_doc = None
+
+
+def get_discovery_document() -> dict:
+    """
+    Return the parsed Calendar v3 discovery document, loading it only once.
+
+    Uses the copy bundled with google-api-python-client, so no network round
+    trip is needed; falls back to fetching it if the bundled copy is missing.
+    """
+    global _discovery_doc
+    if _discovery_doc is None:
+        with _discovery_lock:
+            if _discovery_doc is None:
+                from googleapiclient.discovery_cache import get_static_doc
+
+                content = get_static_doc('calendar', 'v3')
+                if content is None:
+                    from .http_session import get_http_session
+
+                    logger.info("No bundled Calendar discovery document, fetching it")
+                    content = get_http_session().get(DISCOVERY_URL).text
+                _discovery_doc = json.loads(content)
+    return _discovery_doc
+
+
+def build_calendar_service(creds):
+    """
+    Build a Calendar v3 service from the cached discovery document.
+
+    Args:
+        creds: Google OAuth credentials
+
+    Returns:
+        googleapiclient Resource; not thread-safe, use one per thread
+    """
+    from google_auth_httplib2 import AuthorizedHttp
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.http import build_http
+
+    client_options = {'api_endpoint': CALENDAR_API_ENDPOINT} if CALENDAR_API_ENDPOINT else None
+    # Every request goes through the metrics hook, batches included
+    http = AuthorizedHttp(creds, http=instrument_http(build_http(), 'calendar'))
+    return build_from_document(get_discovery_document(), http=http, client_options=client_options)
+
+
+def needs_refresh(creds, margin: datetime.timedelta) -> bool:
+    """True if the access token is missing, expired or expires within `margin`."""
+    if not creds.token:
+        return True
+    if creds.expiry is None:
+        return False
+    # google-auth stores expiry as a naive UTC datetime
+    now = datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+    return creds.expiry - now <= margin
+
+
+def preload():
+    """Import the Google client libraries and parse the discovery document ahead of the first call."""
+    try:
+        from google.auth.transport.requests import Request  # noqa: F401
+        from google.oauth2.credentials import Credentials  # noqa: F401
+        from google_auth_httplib2 import AuthorizedHttp  # noqa: F401
+        from googleapiclient.discovery import build_from_document  # noqa: F401
+        from googleapiclient.errors import HttpError  # noqa: F401
+
+        get_discovery_document()
+    except Exception as e:
+        logger.warning("Preloading the Calendar client failed: %s", e)
+
+
+class CalendarServiceManager:
+    """Process-wide owner of the Calendar credentials and service objects."""
+
+    def __init__(
+        self,
+        token_file: str = TOKEN_FILE,
+        client_secrets_file: str = CLIENT_SECRETS_FILE,
+        scopes=None,
+        refresh_margin_seconds: int = REFRESH_MARGIN_SECONDS
+    ):
+        self.token_file = token_file
+        self.client_secrets_file = client_secrets_file
+        self.scopes = scopes or SCOPES
+        self.refresh_margin = datetime.timedelta(seconds=refresh_margin_seconds)
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._creds = None
+
+    def _needs_refresh(self, creds) -> bool:
+        """True if the token is missing, expired or about to expire."""
+        return needs_refresh(creds, self.refresh_margin)
+
+    def _save(self, creds):
+        with open(self.token_file, 'w') as token:
+            token.write(creds.to_json())
+        print(f"✅ Credentials saved to {self.token_file}")
+
+    def get_credentials(self):
+        """Get or refresh Google Calendar credentials"""
+        creds = self._creds
+        if creds is not None and not self._needs_refresh(creds):
+            return creds
+
+        with self._lock:
+            # Another thread may have refreshed while we were waiting
+            creds = self._creds
+            if creds is not None and not self._needs_refresh(creds):
+                return creds
+
+            if creds is None and os.path.exists(self.token_file):
+                from google.oauth2.credentials import Credentials
+
+                creds = Credentials.from_authorized_user_file(self.token_file, self.scopes)
+
+            if creds and creds.refresh_token and self._needs_refresh(creds):
+                from google.auth.transport.requests import Request
+
+                print("Refreshing credentials before expiry...")
+                creds.refresh(Request())
+                self._save(creds)
+            elif not creds or not creds.valid:
+                print("No valid credentials found. Starting OAuth flow...")
+                print("A browser window will open for authentication.")
+                # Only needed on a machine without a token, so not imported up front
+                from google_auth_oauthlib.flow import InstalledAppFlow
+
+                flow = InstalledAppFlow.from_client_secrets_file(
+                    self.client_secrets_file, self.scopes
+                )
+                creds = flow.run_local_server(port=8080)
+                self._save(creds)
+
+            self._creds = creds
+            return creds
+
+    def get_service(self):
+        """Return this thread's Calendar service, building it on first use."""
+        creds = self.get_credentials()
+
+        service = getattr(self._local, 'service', None)
+        if service is None or self._local.creds is not creds:
+            logger.debug("Building Calendar service for thread %s", threading.get_ident())
+            service = build_calendar_service(creds)
+            self._local.service = service
+            self._local.creds = creds
+        return service
+
+    def set_credentials(self, creds):
+        """Use the given credentials instead of token.json (benchmarks, service accounts)."""
+        with self._lock:
+            self._creds = creds
+
+    def reset(self):
+        """Forget cached credentials so the next call reloads them from disk."""
+        with self._lock:
+            self._creds = None
+
+
+_manager = CalendarServiceManager()
+
+
+def get_calendar_credentials():
+    """Get or refresh Google Calendar credentials"""
+    return _manager.get_credentials()
+
+
+def get_calendar_service():
+    """Return the shared Google Calendar service"""
+    return _manager.get_service()
+
+
+def set_calendar_credentials(creds):
+    """Replace the shared credentials for every later Calendar call"""
+    _manager.set_credentials(creds)
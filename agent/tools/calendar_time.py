@@ -0,0 +1,73 @@
+"""
+Time helpers shared by the calendar tools.
+
+Google Calendar mixes `dateTime` values with arbitrary UTC offsets and
+all-day `date` values. Everything is normalized to timezone-aware datetimes
+here so that comparisons never fall back to string ordering.
+"""
+import os
+import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def _default_timezone():
+    name = os.getenv("USER_TIMEZONE")
+    if name:
+        try:
+            return ZoneInfo(name)
+        except ZoneInfoNotFoundError:
+            pass
+    return datetime.datetime.now().astimezone().tzinfo
+
+
+DEFAULT_TZ = _default_timezone()
+
+
+def get_timezone(name: str = None):
+    """Return the tzinfo for an IANA name, falling back to DEFAULT_TZ."""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except ZoneInfoNotFoundError:
+            pass
+    return DEFAULT_TZ
+
+
+def parse_iso(value: str, tz=None) -> datetime.datetime:
+    """
+    Parse an ISO 8601 string into an aware datetime.
+
+    Args:
+        value: ISO string, e.g. '2025-11-24T10:00:00+01:00' or '...Z'
+        tz: Timezone assumed for naive values (default: DEFAULT_TZ)
+
+    Returns:
+        Timezone-aware datetime
+    """
+    dt = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=tz or DEFAULT_TZ)
+    return dt
+
+
+def parse_event_time(when: dict, tz=None) -> datetime.datetime:
+    """
+    Convert an event 'start'/'end' object into an aware datetime.
+
+    All-day events only carry a 'date'; they start at midnight in the
+    event's own timeZone, the given tz, or DEFAULT_TZ, in that order.
+    """
+    if 'dateTime' in when:
+        return parse_iso(when['dateTime'], tz)
+    day = datetime.date.fromisoformat(when['date'])
+    zone = get_timezone(when.get('timeZone')) if when.get('timeZone') else (tz or DEFAULT_TZ)
+    return datetime.datetime.combine(day, datetime.time.min, tzinfo=zone)
+
+
+def event_bounds(event: dict, tz=None):
+    """Return the (start, end) aware datetimes of a Calendar event resource."""
+    return parse_event_time(event['start'], tz), parse_event_time(event['end'], tz)
+
+
+def utc_now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
@@ -1,58 +1,31 @@
 import os
 import datetime
 import json
-from pathlib import Path
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
-# Scopes for Google Calendar access
-SCOPES = [
-    'https://www.googleapis.com/auth/calendar',
-    'https://www.googleapis.com/auth/userinfo.email',
-    'https://www.googleapis.com/auth/userinfo.profile',
-    'openid'
-]
+from .calendar_service import (
+    SCOPES,
+    TOKEN_FILE,
+    CLIENT_SECRETS_FILE,
+    get_calendar_credentials,
+    get_calendar_service,
+)
+from .calendar_time import event_bounds, get_timezone, parse_iso, utc_now
+from .calendars import calendar_name, events_between, find_overlaps, get_synced_stores, search, window_overlaps
+from .event_store import get_event_store
+from .result_format import compact, compact_results, event_row, span, when
+from .slot_engine import find_free_slots, parse_busy, parse_clock
 
-TOKEN_FILE = 'token.json'
-CLIENT_SECRETS_FILE = 'client_secret.json'
+# The free/busy API accepts at most 50 calendars per request
+FREEBUSY_CHUNK_SIZE = int(os.getenv("FREEBUSY_CHUNK_SIZE", "50"))
+FREEBUSY_MAX_WORKERS = int(os.getenv("FREEBUSY_MAX_WORKERS", "8"))
 
-
-def get_calendar_credentials():
-    """Get or refresh Google Calendar credentials"""
-    creds = None
-    
-    # Load existing token
-    if os.path.exists(TOKEN_FILE):
-        creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-    
-    # If no valid credentials, initiate OAuth flow
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            print("Refreshing expired credentials...")
-            creds.refresh(Request())
-        else:
-            print("No valid credentials found. Starting OAuth flow...")
-            print("A browser window will open for authentication.")
-            flow = InstalledAppFlow.from_client_secrets_file(
-                CLIENT_SECRETS_FILE, SCOPES
-            )
-            creds = flow.run_local_server(port=8080)
-        
-        # Save the credentials for future use
-        with open(TOKEN_FILE, 'w') as token:
-            token.write(creds.to_json())
-        print(f"✅ Credentials saved to {TOKEN_FILE}")
-    
-    return creds
-
-
-def get_calendar_service():
-    """Build and return Google Calendar service"""
-    creds = get_calendar_credentials()
-    return build('calendar', 'v3', credentials=creds)
+_freebusy_executor = ThreadPoolExecutor(
+    max_workers=FREEBUSY_MAX_WORKERS,
+    thread_name_prefix="freebusy"
+)
 
 
 def list_upcoming_events(max_results: int = 10) -> str:
@@ -66,104 +39,118 @@ def list_upcoming_events(max_results: int = 10) -> str:
         Formatted string of upcoming events
     """
     try:
-        service = get_calendar_service()
-        
-        # Get current time in UTC
-        now = datetime.datetime.now(datetime.UTC).isoformat()
-        
         print(f"Fetching {max_results} upcoming events...")
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
+        events = events_between(get_synced_stores(), utc_now(), limit=max_results)
         
+        if compact_results():
+            return compact('list_upcoming_events', {'ev': [event_row(event, cal) for cal, event in events]})
         if not events:
             return "No upcoming events found."
         
-        output = f"📅 Upcoming {len(events)} events:\n\n"
-        for i, event in enumerate(events, 1):
+        lines = [f"📅 Upcoming {len(events)} events:\n"]
+        for i, (calendar_id, event) in enumerate(events, 1):
             start = event['start'].get('dateTime', event['start'].get('date'))
             summary = event.get('summary', 'No title')
             location = event.get('location', '')
             
-            output += f"{i}. {summary}\n"
-            output += f"   Time: {start}\n"
+            lines.append(f"{i}. {summary}")
+            lines.append(f"   Time: {start}")
             if location:
-                output += f"   Location: {location}\n"
-            output += "\n"
+                lines.append(f"   Location: {location}")
+            if calendar_id != 'primary':
+                lines.append(f"   Calendar: {calendar_name(calendar_id)}")
+            lines.append("")
         
-        return output
+        return "\n".join(lines) + "\n"
     
     except Exception as e:
         return f"❌ Error fetching events: {str(e)}"
 
-def get_upcoming_events_raw(max_results: int=100):
+def get_upcoming_events_raw(max_results: int=100, service=None):
     """
     Get raw event data (for internal use by conflict checking).
     
     Args:
         max_results: Maximum number of events to return
+        service: Calendar service to reuse (optional)
     
     Returns:
         List of event dictionaries
     """
     try:
-        service = get_calendar_service()
-        now = datetime.datetime.now(datetime.UTC).isoformat()
+        if service is not None:
+            get_event_store().sync(service=service)
+        return [event for _, event in events_between(get_synced_stores(), utc_now(), limit=max_results)]
 
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-
-        return events_result.get('items', [])
-    
     except Exception as e:
         print(f"❌ Error fetching events: {str(e)}")
         return []
 
-def conflict_calendar(event_new):
+def _conflict_summary(ev, calendar_id='primary'):
+    summary = {
+        'id': ev.get('id'),
+        'summary': ev.get('summary', 'No title'),
+        'start': ev['start'].get('dateTime', ev['start'].get('date')),
+        'end': ev['end'].get('dateTime', ev['end'].get('date'))
+    }
+    if calendar_id != 'primary':
+        summary['calendar'] = calendar_name(calendar_id)
+    return summary
+
+
+def _created_row(created_event):
+    row = event_row(created_event, end=True, event_id=True)
+    row['created'] = True
+    row['link'] = created_event.get('htmlLink', 'N/A')
+    return row
+
+
+def conflict_calendar(event_new, service=None):
     """
     Find conflict events with a new event.
 
+    Only events overlapping the new event's [start, end) are looked at: synced
+    calendars answer locally, others with one events.list bounded to that
+    window (see calendars.window_overlaps).
+
     Args:
         event_new: New event dict with 'start' and 'end' keys containing 'dataTime'
+        service: Calendar service to reuse (optional)
 
     Return:
         List of conflicting events
     """
- 
-    overlap = []
-    events= get_upcoming_events_raw()
-
-    new_start = event_new['start']['dateTime']
-    new_end = event_new['end']['dateTime']
-
-    for ev in events:
-        # Get existing event times
-        ev_start = ev['start'].get('dateTime', ev['start'].get('date'))
-        ev_end = ev['end'].get('dateTime', ev['end'].get('date'))
-
-        if new_start < ev_end and new_end > ev_start:  
-            overlap.append({
-                'summary': ev.get('summary', 'No title'),
-                'start': ev_start,
-                'end': ev_end
-            })
-    
+    # Naive times in the proposed event are read in the primary calendar's zone
+    start, end = event_bounds(event_new, get_timezone(get_event_store().time_zone))
+    overlap = [_conflict_summary(ev, calendar_id) for calendar_id, ev in window_overlaps(start, end, service=service)]
     print(f"Found {len(overlap)} conflicting events")
     return overlap
-    
 
-    
+
+def find_conflicts_batch(new_events, service=None):
+    """
+    Find conflicting events for several proposed events in one pass.
+
+    Args:
+        new_events: List of event dicts with 'start' and 'end' keys
+        service: Calendar service to reuse (optional)
+
+    Return:
+        One list of conflicting events per proposed event
+    """
+    if service is not None:
+        get_event_store().sync(service=service)
+    stores = get_synced_stores()
+    # Naive times in the proposed events are read in the primary calendar's zone
+    tz = get_timezone(get_event_store().time_zone)
+
+    queries = [event_bounds(ev, tz) for ev in new_events]
+    return [
+        [_conflict_summary(ev, calendar_id) for calendar_id, ev in overlaps]
+        for overlaps in find_overlaps(stores, queries)
+    ]
+
+
 def create_calendar_event(
     summary: str,
     start_time: str,
@@ -187,6 +174,7 @@ def create_calendar_event(
         Confirmation message with event details or conflict warning
     """
     try:
+        # One service for both requests: at most a window-bounded conflict query, then the insert
         service = get_calendar_service()
         
         event = {
@@ -196,9 +184,15 @@ def create_calendar_event(
         }
         
         if not force_create:
-            has_conflict = conflict_calendar(event)
+            has_conflict = conflict_calendar(event, service=service)
 
             if len(has_conflict) > 0:
+                if compact_results():
+                    return compact('create_calendar_event', {
+                        'created': False,
+                        'conflicts': [{'t': c['summary'], 's': span(c['start'], c['end'])} for c in has_conflict],
+                        'next': 'ask the user; force_create_event if they confirm'
+                    })
                 conflict_msg = "⚠️ **Time Conflict Detected!**\n\n"
                 conflict_msg += f"Your new event '{summary}' conflicts with:\n\n"
                 
@@ -209,30 +203,32 @@ def create_calendar_event(
                 conflict_msg += "Would you still like to add this event? (Reply 'yes' to confirm)"
                 return conflict_msg
 
-        if len(has_conflict)>0:
-            return "Confliction"
-        else:
-            if description:
-                event['description'] = description
-            if location:
-                event['location'] = location
-            
-            created_event = service.events().insert(
-                calendarId='primary',
-                body=event
-            ).execute()
-            
-            return (
-                f"✅ Event created successfully!\n\n"
-                f"Title: {summary}\n"
-                f"Start: {start_time}\n"
-                f"End: {end_time}\n"
-                f"Event Link: {created_event.get('htmlLink', 'N/A')}"
-            )
+        if description:
+            event['description'] = description
+        if location:
+            event['location'] = location
+        
+        created_event = service.events().insert(
+            calendarId='primary',
+            body=event
+        ).execute()
         
     except Exception as e:
         return f"❌ Error creating event: {str(e)}"
 
+    # The event exists from here on: nothing below may report the write as failed
+    get_event_store().upsert(created_event)
+    if compact_results():
+        return compact('create_calendar_event', _created_row(created_event))
+    
+    return (
+        f"✅ Event created successfully!\n\n"
+        f"Title: {summary}\n"
+        f"Start: {start_time}\n"
+        f"End: {end_time}\n"
+        f"Event Link: {created_event.get('htmlLink', 'N/A')}"
+    )
+
 
 def force_create_event(
     summary: str,
@@ -275,16 +271,20 @@ def force_create_event(
             body=event
         ).execute()
         
-        return (
-            f"✅ Event created successfully (despite conflicts)!\n\n"
-            f"Title: {summary}\n"
-            f"Start: {start_time}\n"
-            f"End: {end_time}\n"
-            f"Event Link: {created_event.get('htmlLink', 'N/A')}"
-        )
-        
     except Exception as e:
         return f"❌ Error creating event: {str(e)}"
+
+    get_event_store().upsert(created_event)
+    if compact_results():
+        return compact('force_create_event', _created_row(created_event))
+    
+    return (
+        f"✅ Event created successfully (despite conflicts)!\n\n"
+        f"Title: {summary}\n"
+        f"Start: {start_time}\n"
+        f"End: {end_time}\n"
+        f"Event Link: {created_event.get('htmlLink', 'N/A')}"
+    )
     
 def create_meeting_with_attendees(
     summary: str,
@@ -346,27 +346,101 @@ def create_meeting_with_attendees(
             sendUpdates='all' if send_notifications else 'none',
             conferenceDataVersion=1 if conference_solution else 0
         ).execute()
-        
-        # Format response
-        output = f"✅ Meeting created successfully!\n\n"
-        output += f"Title: {summary}\n"
-        output += f"Start: {start_time}\n"
-        output += f"End: {end_time}\n"
-        output += f"\n👥 Attendees invited ({len(attendee_emails)}):\n"
-        for email in attendee_emails:
-            output += f"   • {email}\n"
-        
-        if conference_solution and 'hangoutLink' in created_event:
-            output += f"\n🎥 Google Meet: {created_event['hangoutLink']}\n"
-        
-        output += f"\n📧 Email invitations: {'Sent' if send_notifications else 'Not sent'}\n"
-        output += f"Event Link: {created_event.get('htmlLink', 'N/A')}"
-        
-        return output
     
     except Exception as e:
         return f"❌ Error creating meeting: {str(e)}"
 
+    get_event_store().upsert(created_event)
+    if compact_results():
+        row = _created_row(created_event)
+        row['invited'] = len(attendee_emails)
+        row['emails_sent'] = send_notifications
+        if created_event.get('hangoutLink'):
+            row['meet'] = created_event['hangoutLink']
+        return compact('create_meeting_with_attendees', row)
+    
+    # Format response
+    output = f"✅ Meeting created successfully!\n\n"
+    output += f"Title: {summary}\n"
+    output += f"Start: {start_time}\n"
+    output += f"End: {end_time}\n"
+    output += f"\n👥 Attendees invited ({len(attendee_emails)}):\n"
+    for email in attendee_emails:
+        output += f"   • {email}\n"
+    
+    if conference_solution and 'hangoutLink' in created_event:
+        output += f"\n🎥 Google Meet: {created_event['hangoutLink']}\n"
+    
+    output += f"\n📧 Email invitations: {'Sent' if send_notifications else 'Not sent'}\n"
+    output += f"Event Link: {created_event.get('htmlLink', 'N/A')}"
+    
+    return output
+
+
+def query_free_busy(attendee_emails: List[str], time_min: str, time_max: str):
+    """
+    Run free/busy queries for any number of calendars.
+
+    Attendees are split into chunks of FREEBUSY_CHUNK_SIZE, the chunks are
+    queried concurrently and their 'calendars' results merged. A failing
+    chunk only marks its own calendars as errored.
+
+    Args:
+        attendee_emails: List of email addresses to check
+        time_min: Start of time range in ISO format
+        time_max: End of time range in ISO format
+
+    Returns:
+        Tuple of (calendars, errors): calendars maps each email to its
+        free/busy data, errors maps each failed email to a reason
+    """
+    emails = list(dict.fromkeys(attendee_emails))
+    chunks = [
+        emails[i:i + FREEBUSY_CHUNK_SIZE]
+        for i in range(0, len(emails), FREEBUSY_CHUNK_SIZE)
+    ]
+
+    def run(chunk):
+        body = {
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "items": [{"id": email} for email in chunk]
+        }
+        return get_calendar_service().freebusy().query(body=body).execute()
+
+    if len(chunks) == 1:
+        # Nothing to parallelize; skip the thread hop
+        results = [(chunks[0], _call(run, chunks[0]))]
+    else:
+        # A context copy per chunk keeps the API calls attributed to the calling tool
+        futures = [
+            (chunk, _freebusy_executor.submit(contextvars.copy_context().run, _call, run, chunk))
+            for chunk in chunks
+        ]
+        results = [(chunk, future.result()) for chunk, future in futures]
+
+    calendars = {}
+    errors = {}
+    for chunk, (result, error) in results:
+        if error is not None:
+            for email in chunk:
+                errors[email] = error
+            continue
+        for email, calendar_data in result.get('calendars', {}).items():
+            calendars[email] = calendar_data
+            if calendar_data.get('errors'):
+                errors[email] = ', '.join(err.get('reason', 'unknown') for err in calendar_data['errors'])
+
+    return calendars, errors
+
+
+def _call(func, *args):
+    """Return (result, None) or (None, error message) instead of raising."""
+    try:
+        return func(*args), None
+    except Exception as e:
+        return None, str(e)
+
 
 def check_free_busy(
     attendee_emails: List[str],
@@ -385,33 +459,35 @@ def check_free_busy(
         Formatted string showing busy times for each attendee
     """
     try:
-        service = get_calendar_service()
+        calendars, errors = query_free_busy(attendee_emails, time_min, time_max)
         
-        body = {
-            "timeMin": time_min,
-            "timeMax": time_max,
-            "items": [{"id": email} for email in attendee_emails]
-        }
+        if compact_results():
+            people = []
+            for email in attendee_emails:
+                if email in errors:
+                    people.append({'who': email, 'err': errors[email]})
+                else:
+                    busy = calendars.get(email, {}).get('busy', [])
+                    people.append({'who': email, 'busy': [span(b['start'], b['end']) for b in busy]})
+            return compact('check_free_busy', {'people': people})
         
-        freebusy_result = service.freebusy().query(body=body).execute()
-        calendars = freebusy_result.get('calendars', {})
-        
-        output = f"📊 Free/Busy Status ({time_min} to {time_max}):\n\n"
+        lines = [f"📊 Free/Busy Status ({time_min} to {time_max}):\n"]
         
         for email in attendee_emails:
             calendar_data = calendars.get(email, {})
             busy_times = calendar_data.get('busy', [])
             
-            output += f"👤 {email}:\n"
-            if not busy_times:
-                output += "   ✅ Free during this time\n"
+            lines.append(f"👤 {email}:")
+            if email in errors:
+                lines.append(f"   ⚠️ Could not check availability: {errors[email]}")
+            elif not busy_times:
+                lines.append("   ✅ Free during this time")
             else:
-                output += f"   🔴 Busy periods ({len(busy_times)}):\n"
-                for busy in busy_times:
-                    output += f"      • {busy['start']} to {busy['end']}\n"
-            output += "\n"
+                lines.append(f"   🔴 Busy periods ({len(busy_times)}):")
+                lines.extend(f"      • {busy['start']} to {busy['end']}" for busy in busy_times)
+            lines.append("")
         
-        return output
+        return "\n".join(lines) + "\n"
     
     except Exception as e:
         return f"❌ Error checking availability: {str(e)}"
@@ -422,7 +498,12 @@ def find_meeting_slots(
     duration_minutes: int,
     time_min: str,
     time_max: str,
-    max_suggestions: int = 3
+    max_suggestions: int = 3,
+    granularity_minutes: int = 30,
+    working_hours_start: str = "",
+    working_hours_end: str = "",
+    weekdays_only: bool = False,
+    additional_durations: Optional[List[int]] = None
 ) -> str:
     """
     Find available meeting slots that work for all attendees.
@@ -433,75 +514,84 @@ def find_meeting_slots(
         time_min: Start of search range in ISO format
         time_max: End of search range in ISO format
         max_suggestions: Maximum number of time slots to suggest (default: 3)
+        granularity_minutes: Spacing between suggested start times (default: 30)
+        working_hours_start: Only suggest slots after this time of day in the user's timezone, e.g. '09:00' (optional)
+        working_hours_end: Only suggest slots before this time of day in the user's timezone, e.g. '17:00' (optional)
+        weekdays_only: Skip Saturdays and Sundays (default: False)
+        additional_durations: Other meeting lengths in minutes to search in the same pass (optional)
     
     Returns:
         Suggested meeting times that work for all attendees
     """
     try:
-        service = get_calendar_service()
-        
-        # Add your own calendar to the list
-        all_attendees = attendee_emails.copy()
-        
-        body = {
-            "timeMin": time_min,
-            "timeMax": time_max,
-            "items": [{"id": email} for email in all_attendees]
-        }
-        
-        freebusy_result = service.freebusy().query(body=body).execute()
-        calendars = freebusy_result.get('calendars', {})
-        
-        # Collect all busy times
+        # Add your own calendar to the list; free/busy already leaves out
+        # declined and transparent events
+        all_attendees = attendee_emails + ['primary']
+        
+        calendars, errors = query_free_busy(all_attendees, time_min, time_max)
+        own_error = errors.pop('primary', None)
+        if own_error:
+            print(f"⚠️ Could not read your own calendar: {own_error}")
+        
+        # Collect all busy times, parsed once
+        start_dt = parse_iso(time_min)
+        end_dt = parse_iso(time_max, start_dt.tzinfo)
         all_busy_times = []
         for email in all_attendees:
             calendar_data = calendars.get(email, {})
-            busy_times = calendar_data.get('busy', [])
-            all_busy_times.extend(busy_times)
-        
-        # Find free slots (simplified algorithm)
-        start_dt = datetime.datetime.fromisoformat(time_min.replace('Z', '+00:00'))
-        end_dt = datetime.datetime.fromisoformat(time_max.replace('Z', '+00:00'))
-        duration = datetime.timedelta(minutes=duration_minutes)
-        
-        suggestions = []
-        current_time = start_dt
-        
-        while current_time + duration <= end_dt and len(suggestions) < max_suggestions:
-            slot_start = current_time
-            slot_end = current_time + duration
-            
-            # Check if this slot conflicts with any busy time
-            is_free = True
-            for busy in all_busy_times:
-                busy_start = datetime.datetime.fromisoformat(busy['start'].replace('Z', '+00:00'))
-                busy_end = datetime.datetime.fromisoformat(busy['end'].replace('Z', '+00:00'))
-                
-                # Check for overlap
-                if not (slot_end <= busy_start or slot_start >= busy_end):
-                    is_free = False
-                    break
-            
-            if is_free:
-                suggestions.append({
-                    'start': slot_start.isoformat(),
-                    'end': slot_end.isoformat()
-                })
-            
-            # Move to next 30-minute slot
-            current_time += datetime.timedelta(minutes=30)
+            all_busy_times.extend(parse_busy(calendar_data.get('busy', []), start_dt.tzinfo))
+        
+        working_hours = None
+        if working_hours_start or working_hours_end:
+            working_hours = (parse_clock(working_hours_start), parse_clock(working_hours_end))
+        
+        durations = [duration_minutes] + [d for d in (additional_durations or []) if d != duration_minutes]
+        slots = find_free_slots(
+            all_busy_times,
+            start_dt,
+            end_dt,
+            durations,
+            granularity_minutes=granularity_minutes,
+            working_hours=working_hours,
+            weekdays=range(5) if weekdays_only else None,
+            max_results=max_suggestions
+        )
         
         # Format output
-        if not suggestions:
+        if compact_results():
+            payload = {'slots': {
+                str(minutes): [span(lo, hi) for lo, hi in slots[minutes]]
+                for minutes in durations
+            }}
+            if errors:
+                payload['unknown'] = [{'who': email, 'err': reason} for email, reason in errors.items()]
+            return compact('find_meeting_slots', payload)
+
+        if not any(slots.values()):
             return f"❌ No available time slots found for all attendees in the given range."
         
-        output = f"💡 Found {len(suggestions)} available time slot(s) for a {duration_minutes}-minute meeting:\n\n"
-        for i, slot in enumerate(suggestions, 1):
-            output += f"{i}. {slot['start']} to {slot['end']}\n"
+        lines = []
+        for minutes in durations:
+            suggestions = slots[minutes]
+            if not suggestions:
+                lines.append(f"❌ No available {minutes}-minute slots found.\n")
+                continue
+            lines.append(f"💡 Found {len(suggestions)} available time slot(s) for a {minutes}-minute meeting:\n")
+            lines.extend(
+                f"{i}. {slot_start.isoformat()} to {slot_end.isoformat()}"
+                for i, (slot_start, slot_end) in enumerate(suggestions, 1)
+            )
+            lines.append("")
         
-        output += f"\n👥 All {len(attendee_emails)} attendee(s) are available during these times."
+        if errors:
+            lines.append(f"⚠️ Availability unknown for {len(errors)} attendee(s), not taken into account:")
+            lines.extend(f"   • {email}: {reason}" for email, reason in errors.items())
+            lines.append("")
         
-        return output
+        available = len(attendee_emails) - len(errors)
+        lines.append(f"👥 All {available} attendee(s) are available during these times.")
+        
+        return "\n".join(lines)
     
     except Exception as e:
         return f"❌ Error finding meeting slots: {str(e)}"
@@ -519,34 +609,25 @@ def search_events(query: str, max_results: int = 10) -> str:
         Formatted string of matching events
     """
     try:
-        service = get_calendar_service()
-        
-        # Get current time in UTC
-        now = datetime.datetime.now(datetime.UTC).isoformat()
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            maxResults=max_results,
-            q=query,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
+        events = search(get_synced_stores(), query, utc_now(), limit=max_results)
         
+        if compact_results():
+            return compact('search_events', {'ev': [event_row(event, cal, location=False) for cal, event in events]})
         if not events:
             return f"No events found matching '{query}'."
         
-        output = f"🔍 Found {len(events)} event(s) matching '{query}':\n\n"
-        for i, event in enumerate(events, 1):
+        lines = [f"🔍 Found {len(events)} event(s) matching '{query}':\n"]
+        for i, (calendar_id, event) in enumerate(events, 1):
             start = event['start'].get('dateTime', event['start'].get('date'))
             summary = event.get('summary', 'No title')
             
-            output += f"{i}. {summary}\n"
-            output += f"   Time: {start}\n\n"
+            lines.append(f"{i}. {summary}")
+            lines.append(f"   Time: {start}")
+            if calendar_id != 'primary':
+                lines.append(f"   Calendar: {calendar_name(calendar_id)}")
+            lines.append("")
         
-        return output
+        return "\n".join(lines) + "\n"
     
     except Exception as e:
         return f"❌ Error searching events: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""
+Read access across every calendar the user has selected.
+
+The calendars come from `calendarList` (cached for CALENDAR_LIST_TTL seconds).
+Each calendar has its own EventStore; the stores are synced concurrently and
+their events, already ordered by start time, are combined with a heap-based
+k-way merge. Listing stops as soon as enough events were merged.
+
+CALENDAR_SOURCES picks the calendars:
+    selected   calendars shown in the Google Calendar UI (default)
+    all        every calendar in the list except hidden ones
+    primary    only the primary calendar, without calling calendarList
+    a,b,c      explicit calendar ids
+"""
+import os
+import heapq
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, List, Optional
+
+from .calendar_service import get_calendar_service
+from .calendar_time import event_bounds, get_timezone
+from .event_iter import CONFLICT_FIELDS, iter_event_pages
+from .event_store import EventStore, get_event_store
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_SOURCES = os.getenv("CALENDAR_SOURCES", "selected")
+CALENDAR_LIST_TTL = float(os.getenv("CALENDAR_LIST_TTL", "600"))
+CALENDAR_SYNC_WORKERS = int(os.getenv("CALENDAR_SYNC_WORKERS", "8"))
+
+CALENDAR_LIST_FIELDS = "nextPageToken,items(id,summary,summaryOverride,primary,selected,hidden,accessRole,timeZone)"
+
+_calendar_list_cache = TTLCache(maxsize=1, ttl=CALENDAR_LIST_TTL)
+
+_sync_executor = ThreadPoolExecutor(
+    max_workers=CALENDAR_SYNC_WORKERS,
+    thread_name_prefix="calendar-sync"
+)
+
+
+def list_calendars(service=None) -> List[dict]:
+    """
+    The user's calendar list, with the primary calendar's id normalized to 'primary'.
+
+    Args:
+        service: Calendar service to reuse (optional)
+
+    Returns:
+        List of calendarList entries (id, summary, primary, selected, accessRole, ...)
+    """
+    calendars = _calendar_list_cache.get("calendars")
+    if calendars is not None:
+        return calendars
+
+    service = service or get_calendar_service()
+    calendars = []
+    page_token = None
+    while True:
+        response = service.calendarList().list(
+            pageToken=page_token,
+            fields=CALENDAR_LIST_FIELDS
+        ).execute()
+        for entry in response.get('items', []):
+            entry = dict(entry)
+            if entry.get('primary'):
+                # The primary store is shared with the write-through in the create tools
+                entry['id'] = 'primary'
+            entry['summary'] = entry.get('summaryOverride') or entry.get('summary') or entry['id']
+            calendars.append(entry)
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            break
+
+    if not any(entry['id'] == 'primary' for entry in calendars):
+        calendars.insert(0, {'id': 'primary', 'summary': 'primary', 'primary': True, 'selected': True})
+    _calendar_list_cache.set("calendars", calendars)
+    return calendars
+
+
+def get_calendar_ids(sources: str = None, service=None) -> List[str]:
+    """
+    Ids of the calendars to read, according to CALENDAR_SOURCES.
+
+    Falls back to the primary calendar if the calendar list cannot be read.
+
+    Args:
+        sources: Overrides CALENDAR_SOURCES
+        service: Calendar service to reuse if the calendar list must be fetched (optional)
+    """
+    sources = (sources or CALENDAR_SOURCES).strip()
+    mode = sources.lower()
+    if mode == 'primary':
+        return ['primary']
+    if mode not in ('selected', 'all'):
+        return [cal.strip() for cal in sources.split(',') if cal.strip()]
+
+    try:
+        calendars = list_calendars(service=service)
+    except Exception as e:
+        logger.warning("Could not read the calendar list, using primary only: %s", e)
+        return ['primary']
+
+    if mode == 'all':
+        return [entry['id'] for entry in calendars if not entry.get('hidden') or entry.get('primary')]
+    return [entry['id'] for entry in calendars if entry.get('selected') or entry.get('primary')]
+
+
+def calendar_name(calendar_id: str) -> str:
+    """Display name of a calendar, from the cached calendar list when available."""
+    for entry in _calendar_list_cache.get("calendars") or []:
+        if entry['id'] == calendar_id:
+            return entry['summary']
+    return calendar_id
+
+
+def get_synced_stores(calendar_ids: Optional[List[str]] = None) -> List[EventStore]:
+    """
+    Bring the store of every calendar up to date, concurrently.
+
+    A calendar that fails to sync is skipped (or served from its last good
+    copy) instead of failing the whole read.
+
+    Args:
+        calendar_ids: Calendars to sync (default: get_calendar_ids())
+
+    Returns:
+        Stores that hold usable data
+    """
+    stores = [get_event_store(cal) for cal in (calendar_ids or get_calendar_ids())]
+    if len(stores) == 1:
+        stores[0].sync()
+        return stores
+
+    # Each worker uses its own thread-local service; the copied context keeps
+    # outbound API calls attributed to the calling tool
+    futures = [
+        _sync_executor.submit(contextvars.copy_context().run, store.sync)
+        for store in stores
+    ]
+    usable = []
+    for store, future in zip(stores, futures):
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning("Sync of %s failed: %s", store.calendar_id, e)
+            if store.sync_token is None:
+                continue
+        usable.append(store)
+    return usable
+
+
+def _dedupe(merged: Iterable[tuple]):
+    """Drop copies of the same event seen on several calendars (e.g. an invite on a shared calendar)."""
+    seen = set()
+    for start, calendar_id, event in merged:
+        key = (event.get('iCalUID') or event.get('id'), start)
+        if key in seen:
+            continue
+        seen.add(key)
+        yield start, calendar_id, event
+
+
+def _tagged(calendar_id: str, pairs: Iterable[tuple]):
+    for start, event in pairs:
+        yield start, calendar_id, event
+
+
+def _merge(sources: Iterable[Iterable[tuple]]):
+    return _dedupe(heapq.merge(*sources, key=itemgetter(0)))
+
+
+def events_between(stores: List[EventStore], time_min, time_max=None, limit: int = None):
+    """
+    Events from all stores overlapping [time_min, time_max), merged by start time.
+
+    Returns:
+        List of (calendar_id, event) pairs
+    """
+    sources = [_tagged(store.calendar_id, store.iter_between(time_min, time_max)) for store in stores]
+    return [(cal, event) for _, cal, event in islice(_merge(sources), limit)]
+
+
+def search(stores: List[EventStore], query: str, time_min, limit: int = None):
+    """
+    Matching events from all stores after time_min, merged by start time.
+
+    Returns:
+        List of (calendar_id, event) pairs
+    """
+    sources = [_tagged(store.calendar_id, store.iter_search(query, time_min)) for store in stores]
+    return [(cal, event) for _, cal, event in islice(_merge(sources), limit)]
+
+
+def find_overlaps(stores: List[EventStore], queries: List[tuple]):
+    """
+    Events from all stores overlapping each (start, end) query.
+
+    Returns:
+        One list of (calendar_id, event) pairs per query, ordered by start time
+    """
+    per_store = []
+    for store in stores:
+        tz = get_timezone(store.time_zone)
+        per_store.append([
+            [(event_bounds(event, tz)[0], store.calendar_id, event) for event in overlaps]
+            for overlaps in store.overlapping_many(queries)
+        ])
+    return [
+        [(cal, event) for _, cal, event in _merge(results[i] for results in per_store)]
+        for i in range(len(queries))
+    ]
+
+
+def _query_window(service, calendar_id: str, time_min, time_max):
+    """(time zone, events) overlapping the window, straight from events.list."""
+    time_zone, events = None, []
+    for page in iter_event_pages(
+        service or get_calendar_service(),
+        calendar_id,
+        fields=CONFLICT_FIELDS,
+        page_size=250,
+        timeMin=time_min.isoformat(),
+        timeMax=time_max.isoformat(),
+        singleEvents=True
+    ):
+        time_zone = page.get('timeZone', time_zone)
+        events.extend(event for event in page.get('items', []) if event.get('status') != 'cancelled')
+    return time_zone, events
+
+
+def _check_window(service, calendar_id: str, time_min, time_max):
+    """(time zone, events) overlapping the window, from the synced store or a window query."""
+    store = get_event_store(calendar_id)
+    if store.sync_token is None:
+        return _query_window(service, calendar_id, time_min, time_max)
+    try:
+        store.sync(service=service)
+    except Exception as e:
+        logger.warning("Sync of %s failed, using the last copy: %s", calendar_id, e)
+    return store.time_zone, store.overlapping_many([(time_min, time_max)])[0]
+
+
+def window_overlaps(time_min, time_max, service=None, calendar_ids: Optional[List[str]] = None):
+    """
+    Events from all calendars overlapping one window, for a single check.
+
+    A calendar whose store is already synced answers from the store after at
+    most a delta sync (none within its sync interval). A calendar that was
+    never synced is not fully downloaded for one window: it gets a single
+    events.list bounded to [time_min, time_max) with CONFLICT_FIELDS.
+
+    With CALENDAR_SOURCES=selected or all, the first check in a process
+    also reads the calendar list (then cached for CALENDAR_LIST_TTL), so
+    that conflicts on every calendar are found, not only on the primary one.
+    The primary calendar and the calendar list go through the given service;
+    the other calendars, delta sync or window query, are handled
+    concurrently, each worker with its own thread-local service.
+
+    Args:
+        time_min: Window start (aware datetime)
+        time_max: Window end (aware datetime)
+        service: Calendar service to reuse (optional)
+        calendar_ids: Calendars to check (default: get_calendar_ids())
+
+    Returns:
+        List of (calendar_id, event) pairs ordered by start time
+    """
+    service = service or get_calendar_service()
+    calendar_ids = calendar_ids or get_calendar_ids(service=service)
+    pending = {
+        calendar_id: _sync_executor.submit(
+            contextvars.copy_context().run, _check_window, None, calendar_id, time_min, time_max
+        )
+        for calendar_id in calendar_ids
+        if calendar_id != 'primary'
+    }
+
+    found = []
+    for calendar_id in calendar_ids:
+        try:
+            if calendar_id in pending:
+                time_zone, events = pending[calendar_id].result()
+            else:
+                time_zone, events = _check_window(service, calendar_id, time_min, time_max)
+        except Exception as e:
+            if calendar_id == 'primary':
+                raise
+            logger.warning("Could not check %s: %s", calendar_id, e)
+            continue
+
+        tz = get_timezone(time_zone)
+        found.extend((event_bounds(event, tz)[0], calendar_id, event) for event in events)
+
+    found.sort(key=itemgetter(0))
+    return [(cal, event) for _, cal, event in _dedupe(found)]
@@ -0,0 +1,37 @@
+"""
+Per-provider circuit breaker for rate-limited external APIs.
+"""
+import time
+import threading
+
+
+class CircuitBreaker:
+    """Skip a provider for a cooldown period after it fails or rate-limits."""
+
+    def __init__(self, cooldown: float = 3600):
+        """
+        Args:
+            cooldown: Default number of seconds a tripped provider is skipped
+        """
+        self.cooldown = cooldown
+        self._open_until = {}
+        self._lock = threading.Lock()
+
+    def is_open(self, name: str) -> bool:
+        """True while the provider is cooling down and should not be called."""
+        with self._lock:
+            until = self._open_until.get(name)
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self._open_until[name]
+                return False
+            return True
+
+    def trip(self, name: str, cooldown: float = None):
+        with self._lock:
+            self._open_until[name] = time.monotonic() + (self.cooldown if cooldown is None else cooldown)
+
+    def reset(self, name: str):
+        with self._lock:
+            self._open_until.pop(name, None)
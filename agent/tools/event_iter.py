@@ -0,0 +1,105 @@
+"""
+Lazy, paginated iteration over `events().list` with partial responses.
+
+`iter_event_pages` follows `nextPageToken` one request at a time and
+`iter_events` yields individual events, asking only for as many as the caller
+still needs and stopping as soon as the limit is reached. Each caller passes a
+`fields=` mask so Google only sends the parts of the event resource it uses.
+"""
+from typing import Iterator, Optional
+
+# Largest page the Calendar API accepts
+MAX_PAGE_SIZE = 2500
+
+# Listing: title, time, place and a link
+LIST_FIELDS = (
+    "nextPageToken,timeZone,"
+    "items(id,status,summary,location,start,end,htmlLink)"
+)
+
+# Local event store: everything the read tools, search and conflict checks use;
+# leaves out conferenceData, reminders, creator, attachments and the like
+SYNC_FIELDS = (
+    "nextPageToken,nextSyncToken,timeZone,"
+    "items(id,iCalUID,status,summary,description,location,start,end,htmlLink,transparency,"
+    "recurrence,recurringEventId,originalStartTime,attendees(email,displayName,responseStatus,self),"
+    "organizer(email,displayName,self))"
+)
+
+# Conflict check of one window: what the conflict warning shows
+CONFLICT_FIELDS = "nextPageToken,timeZone,items(id,iCalUID,status,summary,start,end)"
+
+
+def iter_event_pages(
+    service,
+    calendar_id: str = 'primary',
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    page_size: int = MAX_PAGE_SIZE,
+    **params
+) -> Iterator[dict]:
+    """
+    Yield raw `events().list` responses, fetching the next page only when asked.
+
+    Args:
+        service: Calendar service
+        calendar_id: Calendar to list
+        fields: Partial-response mask, e.g. LIST_FIELDS (default: full resources)
+        limit: Stop requesting pages once this many items were returned
+        page_size: maxResults per request (capped at 2500)
+        **params: Other events().list parameters (timeMin, syncToken, q, ...)
+
+    Yields:
+        Response dicts with 'items' and the page/sync tokens
+    """
+    page_token = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = min(page_size, MAX_PAGE_SIZE, remaining if remaining is not None else MAX_PAGE_SIZE)
+        request = {
+            'calendarId': calendar_id,
+            'maxResults': size,
+            'pageToken': page_token,
+            **params
+        }
+        if fields:
+            request['fields'] = fields
+        response = service.events().list(**request).execute()
+        yield response
+
+        if remaining is not None:
+            remaining -= len(response.get('items', []))
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return
+
+
+def iter_events(
+    service,
+    calendar_id: str = 'primary',
+    fields: Optional[str] = LIST_FIELDS,
+    limit: Optional[int] = None,
+    page_size: int = 250,
+    **params
+) -> Iterator[dict]:
+    """
+    Yield events one by one across pages, stopping early once `limit` is met.
+
+    Args:
+        service: Calendar service
+        calendar_id: Calendar to list
+        fields: Partial-response mask (default: LIST_FIELDS)
+        limit: Maximum number of events to yield
+        page_size: Events per request
+        **params: Other events().list parameters (timeMin, orderBy, q, ...)
+
+    Yields:
+        Event dicts
+    """
+    count = 0
+    for page in iter_event_pages(service, calendar_id, fields, limit, page_size, **params):
+        for event in page.get('items', []):
+            yield event
+            count += 1
+            if limit is not None and count >= limit:
+                return
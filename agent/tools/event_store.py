@@ -0,0 +1,359 @@
+"""
+Local event store kept in sync with Google Calendar through sync tokens.
+
+The first read performs one full listing of the calendar and remembers the
+`nextSyncToken`. Later reads only ask Google for what changed since then, and
+a 410 GONE response (expired token) triggers a fresh full sync. All read tools
+answer from the in-memory copy.
+
+By default Google expands recurring events (`singleEvents=True`), so a daily
+standup is stored as hundreds of instances. With EVENT_STORE_RECURRENCE=local
+the store keeps the series master and its exceptions instead and expands
+them with `recurrence.RecurringSeries`, only inside the window being read.
+"""
+import os
+import time
+import uuid
+import heapq
+import bisect
+import datetime
+import logging
+import threading
+from collections import defaultdict
+from itertools import islice
+from operator import itemgetter
+
+from .calendar_service import get_calendar_service
+from .calendar_time import event_bounds, get_timezone, parse_event_time
+from .event_iter import SYNC_FIELDS, iter_event_pages
+from .interval_index import IntervalIndex
+from .recurrence import RecurringSeries
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two delta syncs of the same calendar
+SYNC_INTERVAL_SECONDS = float(os.getenv("EVENT_STORE_SYNC_INTERVAL", "15"))
+
+PAGE_SIZE = 2500
+
+# 'server': Google expands recurring events; 'local': keep series and expand them here
+RECURRENCE_MODE = os.getenv("EVENT_STORE_RECURRENCE", "server")
+
+
+class EventStore:
+    """In-memory copy of one calendar, updated incrementally."""
+
+    def __init__(
+        self,
+        calendar_id: str = 'primary',
+        service_factory=None,
+        sync_interval: float = SYNC_INTERVAL_SECONDS,
+        recurrence: str = RECURRENCE_MODE
+    ):
+        self.calendar_id = calendar_id
+        self.service_factory = service_factory or get_calendar_service
+        self.sync_interval = sync_interval
+        self.expand_locally = recurrence == 'local'
+
+        self.time_zone = None
+        self.version = 0
+        self._instance = uuid.uuid4().hex[:8]
+
+        self._events = {}
+        self._sync_token = None
+        self._last_sync = None
+        self._sorted = None
+        self._index = None
+        self._series = None
+        self._lock = threading.RLock()
+
+    # ------------------------------------------------------------------ sync
+
+    @property
+    def sync_token(self):
+        return self._sync_token
+
+    @property
+    def state_tag(self) -> str:
+        """Opaque tag that changes whenever the stored events change (for ETags)."""
+        return f"{self._instance}-{self.version}"
+
+    def sync(self, force: bool = False, service=None) -> bool:
+        """
+        Bring the store up to date with Google Calendar.
+
+        Args:
+            force: Ignore the minimum sync interval
+            service: Calendar service to reuse (optional)
+
+        Returns:
+            True if any event changed
+        """
+        with self._lock:
+            if (
+                not force
+                and self._sync_token is not None
+                and time.monotonic() - self._last_sync < self.sync_interval
+            ):
+                return False
+
+            from googleapiclient.errors import HttpError
+
+            service = service or self.service_factory()
+            if self._sync_token is None:
+                changed = self._full_sync(service)
+            else:
+                try:
+                    changed = self._incremental_sync(service)
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.info("Sync token for %s expired, running full sync", self.calendar_id)
+                    changed = self._full_sync(service)
+
+            self._last_sync = time.monotonic()
+            if changed:
+                self._touch()
+            return changed
+
+    def _pages(self, service, **params):
+        if self.expand_locally:
+            # Masters plus exceptions; cancelled instances are needed to skip them
+            params.update(singleEvents=False, showDeleted=True)
+        else:
+            params.update(singleEvents=True)
+        return iter_event_pages(
+            service,
+            self.calendar_id,
+            fields=SYNC_FIELDS,
+            page_size=PAGE_SIZE,
+            **params
+        )
+
+    def _keep(self, event: dict) -> bool:
+        """Whether to store an event from a listing; cancelled exceptions mark skipped instances."""
+        if event.get('status') != 'cancelled':
+            return True
+        return self.expand_locally and 'recurringEventId' in event
+
+    def _full_sync(self, service) -> bool:
+        events = {}
+        sync_token = None
+        for page in self._pages(service):
+            self.time_zone = page.get('timeZone', self.time_zone)
+            for event in page.get('items', []):
+                if self._keep(event):
+                    events[event['id']] = event
+            sync_token = page.get('nextSyncToken', sync_token)
+
+        self._events = events
+        self._sync_token = sync_token
+        logger.info("Full sync of %s: %d events", self.calendar_id, len(events))
+        return True
+
+    def _incremental_sync(self, service) -> bool:
+        changed = False
+        sync_token = self._sync_token
+        for page in self._pages(service, syncToken=self._sync_token):
+            for event in page.get('items', []):
+                if self._keep(event):
+                    self._events[event['id']] = event
+                else:
+                    self._events.pop(event['id'], None)
+                changed = True
+            sync_token = page.get('nextSyncToken', sync_token)
+
+        self._sync_token = sync_token
+        return changed
+
+    # ---------------------------------------------------------- write-through
+
+    def upsert(self, event: dict):
+        """Apply an event returned by insert/update without waiting for a sync."""
+        with self._lock:
+            if self._keep(event):
+                self._events[event['id']] = event
+            else:
+                self._events.pop(event.get('id'), None)
+            self._touch()
+
+    def remove(self, event_id: str):
+        with self._lock:
+            if self._events.pop(event_id, None) is not None:
+                self._touch()
+
+    def _touch(self):
+        self.version += 1
+        self._sorted = None
+        self._index = None
+        self._series = None
+
+    # ----------------------------------------------------------------- reads
+
+    def _sorted_events(self):
+        """Events as parallel (starts, entries) lists ordered by start time."""
+        with self._lock:
+            if self._sorted is None:
+                tz = get_timezone(self.time_zone)
+                entries = []
+                for event in self._events.values():
+                    if event.get('status') == 'cancelled' or 'recurrence' in event:
+                        # Skipped instances and series masters; see recurring_series()
+                        continue
+                    try:
+                        start, end = event_bounds(event, tz)
+                    except (KeyError, ValueError):
+                        continue
+                    entries.append((start, end, event))
+                entries.sort(key=lambda entry: entry[0])
+                self._sorted = ([entry[0] for entry in entries], entries)
+            return self._sorted
+
+    def interval_index(self) -> IntervalIndex:
+        """Overlap index over all stored events, rebuilt only after changes."""
+        with self._lock:
+            if self._index is None:
+                starts, entries = self._sorted_events()
+                self._index = IntervalIndex(entries)
+            return self._index
+
+    def recurring_series(self):
+        """RecurringSeries for every stored master (local recurrence only), rebuilt after changes."""
+        with self._lock:
+            if self._series is None:
+                self._series = self._build_series() if self.expand_locally else []
+            return self._series
+
+    def _build_series(self):
+        tz = get_timezone(self.time_zone)
+        overridden = defaultdict(set)
+        for event in self._events.values():
+            if 'recurringEventId' in event and 'originalStartTime' in event:
+                original = parse_event_time(event['originalStartTime'], tz)
+                overridden[event['recurringEventId']].add(original.timestamp())
+
+        series = []
+        for event in self._events.values():
+            if 'recurrence' not in event or event.get('status') == 'cancelled':
+                continue
+            try:
+                series.append(RecurringSeries(event, tz, overridden[event['id']]))
+            except (KeyError, ValueError) as e:
+                logger.warning("Cannot expand recurring event %s: %s", event.get('id'), e)
+        return series
+
+    def iter_between(self, time_min, time_max=None):
+        """
+        Lazily yield (start, event) for events overlapping [time_min, time_max),
+        ordered by start time.
+        """
+        sources = [self._iter_single(time_min, time_max)]
+        sources += [series.between(time_min, time_max) for series in self.recurring_series()]
+        if len(sources) == 1:
+            return sources[0]
+        return heapq.merge(*sources, key=itemgetter(0))
+
+    def _iter_single(self, time_min, time_max=None):
+        starts, entries = self._sorted_events()
+        first = bisect.bisect_left(starts, time_min)
+        stop = len(entries) if time_max is None else bisect.bisect_left(starts, time_max)
+
+        if first:
+            # Events already running at time_min; the index avoids scanning the past
+            tz = get_timezone(self.time_zone)
+            instant = time_min + datetime.timedelta(microseconds=1)
+            for event in self.interval_index().overlapping(time_min, instant):
+                start = event_bounds(event, tz)[0]
+                if start < time_min and (time_max is None or start < time_max):
+                    yield start, event
+
+        for i in range(first, stop):
+            start, end, event = entries[i]
+            if end > time_min:
+                yield start, event
+
+    def overlapping_many(self, queries):
+        """
+        Events overlapping each (start, end) query, ordered by start.
+
+        Recurring series are expanded only inside each query's window.
+
+        Returns:
+            One list of events per query, in query order
+        """
+        results = self.interval_index().overlapping_many(queries)
+        series = self.recurring_series()
+        if not series:
+            return results
+
+        tz = get_timezone(self.time_zone)
+        merged = []
+        for (start, end), found in zip(queries, results):
+            instances = [pair for item in series for pair in item.between(start, end)]
+            if instances:
+                pairs = [(event_bounds(event, tz)[0], event) for event in found] + instances
+                pairs.sort(key=itemgetter(0))
+                found = [event for _, event in pairs]
+            merged.append(found)
+        return merged
+
+    def events_between(self, time_min, time_max=None, limit: int = None):
+        """
+        Events overlapping [time_min, time_max), ordered by start time.
+
+        Args:
+            time_min: Aware datetime; events ending after it are included
+            time_max: Aware datetime; events starting before it are included
+            limit: Maximum number of events to return
+
+        Returns:
+            List of event dictionaries
+        """
+        return [event for _, event in islice(self.iter_between(time_min, time_max), limit)]
+
+    def iter_search(self, query: str, time_min):
+        """Lazily yield (start, event) for matching events after time_min, ordered by start."""
+        terms = query.lower().split()
+        for start, event in self.iter_between(time_min):
+            text = _search_text(event)
+            if all(term in text for term in terms):
+                yield start, event
+
+    def search(self, query: str, time_min, limit: int = None):
+        """
+        Events after time_min whose text fields contain every query term.
+
+        Mirrors the fields covered by the API's `q` parameter: summary,
+        description, location and attendee/organizer names and emails.
+        """
+        return [event for _, event in islice(self.iter_search(query, time_min), limit)]
+
+
+def _search_text(event: dict) -> str:
+    people = event.get('attendees', []) + [event.get('organizer', {})]
+    parts = [event.get('summary', ''), event.get('description', ''), event.get('location', '')]
+    for person in people:
+        parts.append(person.get('displayName', ''))
+        parts.append(person.get('email', ''))
+    return ' '.join(parts).lower()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_event_store(calendar_id: str = 'primary') -> EventStore:
+    """Return the process-wide store for a calendar, creating it on first use."""
+    with _stores_lock:
+        store = _stores.get(calendar_id)
+        if store is None:
+            store = EventStore(calendar_id)
+            _stores[calendar_id] = store
+        return store
+
+
+def get_synced_store(calendar_id: str = 'primary') -> EventStore:
+    """Return the store for a calendar after bringing it up to date."""
+    store = get_event_store(calendar_id)
+    store.sync()
+    return store
@@ -0,0 +1,107 @@
+"""
+Shared pooled `requests` sessions for the weather and location tools.
+
+Sessions keep connections alive between calls, apply bounded connect/read
+timeouts to every request, ask for gzip responses, and retry 429/5xx answers
+with jittered exponential backoff. All settings come from the environment.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import instrument_session
+
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5"))
+HTTP_BACKOFF_JITTER = float(os.getenv("HTTP_BACKOFF_JITTER", "0.3"))
+HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "5"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CappedRetry(Retry):
+    """Retry that never sleeps longer than HTTP_MAX_RETRY_AFTER for Retry-After."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, HTTP_MAX_RETRY_AFTER)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout."""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def build_session(max_retries: int = HTTP_MAX_RETRIES, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    Create a session with pooling, timeouts, retries and gzip enabled.
+
+    Args:
+        max_retries: Retries for connection errors and 429/5xx responses
+        pool_size: Keep-alive connections per host
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = CappedRetry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        backoff_factor=HTTP_BACKOFF_FACTOR,
+        backoff_jitter=HTTP_BACKOFF_JITTER,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = TimeoutHTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return instrument_session(session)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_http_session(name: str = "default", **kwargs) -> requests.Session:
+    """
+    Return the process-wide session registered under `name`.
+
+    Args:
+        name: Session name; different names get separate pools and settings
+        **kwargs: Passed to build_session the first time the name is used
+
+    Returns:
+        Shared requests.Session
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = build_session(**kwargs)
+            _sessions[name] = session
+        return session
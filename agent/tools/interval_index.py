@@ -0,0 +1,94 @@
+"""
+Static interval index for fast overlap queries.
+
+Intervals are sorted by start and laid out as an implicit balanced binary
+search tree over that array, where every node also records the largest end
+time in its subtree. An overlap query for [start, end) prunes whole subtrees
+that finish before `start` or begin after `end`, so it runs in O(log n + k)
+instead of scanning every event.
+"""
+import datetime
+from typing import Any, Iterable, List, Tuple
+
+
+def _key(value) -> float:
+    """Timestamps compare faster than aware datetimes."""
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return float(value)
+
+
+class IntervalIndex:
+    """Immutable index over half-open [start, end) intervals with payloads."""
+
+    def __init__(self, intervals: Iterable[Tuple[Any, Any, Any]] = ()):
+        """
+        Args:
+            intervals: (start, end, payload) tuples; start/end may be aware
+                datetimes or numbers, but must not be mixed
+        """
+        items = sorted(
+            ((_key(start), _key(end), payload) for start, end, payload in intervals),
+            key=lambda item: item[0]
+        )
+        self._starts = [item[0] for item in items]
+        self._ends = [item[1] for item in items]
+        self._payloads = [item[2] for item in items]
+        self._max_end = [0.0] * len(items)
+        self._build(0, len(items))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def _build(self, lo: int, hi: int) -> float:
+        if lo >= hi:
+            return float('-inf')
+        mid = (lo + hi) // 2
+        self._max_end[mid] = max(
+            self._ends[mid],
+            self._build(lo, mid),
+            self._build(mid + 1, hi)
+        )
+        return self._max_end[mid]
+
+    def _collect(self, lo: int, hi: int, start: float, end: float, out: List[Any]):
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        if self._max_end[mid] <= start:
+            # Nothing in this subtree ends after the query begins
+            return
+        self._collect(lo, mid, start, end, out)
+        if self._starts[mid] >= end:
+            # This node and everything to its right begin too late
+            return
+        if self._ends[mid] > start:
+            out.append(self._payloads[mid])
+        self._collect(mid + 1, hi, start, end, out)
+
+    def overlapping(self, start, end) -> List[Any]:
+        """
+        Payloads of intervals overlapping [start, end), ordered by start.
+
+        Args:
+            start: Query start (datetime or number)
+            end: Query end (datetime or number)
+
+        Returns:
+            List of payloads
+        """
+        out = []
+        self._collect(0, len(self._starts), _key(start), _key(end), out)
+        return out
+
+    def overlapping_many(self, queries: Iterable[Tuple[Any, Any]]) -> List[List[Any]]:
+        """
+        Answer several overlap queries against the same index in one call.
+
+        Args:
+            queries: (start, end) pairs
+
+        Returns:
+            One list of payloads per query, in query order
+        """
+        return [self.overlapping(start, end) for start, end in queries]
@@ -0,0 +1,494 @@
+"""
+In-process metrics for tool calls, outbound API requests and model calls.
+
+Tools are wrapped with `instrument()` when they are registered, which records
+call counts, latency histograms and errors per tool. While a tool runs its
+name is kept in a context variable, so the HTTP hooks installed on the
+Calendar client and the shared `requests` sessions attribute every outbound
+request (count, latency, response size, errors) to the tool that made it.
+Model latency is recorded through the agent's before/after model callbacks,
+and the intent router (agent/router.py) records its hits, misses and the
+model time each hit is estimated to have saved. The session tool cache
+(session_cache.py) counts hits, misses and invalidations per tool.
+
+Read the numbers with `snapshot()` or `render_prometheus()`, or set
+METRICS_PORT to serve them at /metrics (Prometheus text) and /metrics.json.
+"""
+import os
+import json
+import time
+import asyncio
+import bisect
+import functools
+import threading
+import contextvars
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = os.getenv("METRICS_PORT", "")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+NO_TOOL = "-"
+
+_current_tool = contextvars.ContextVar("current_tool", default=NO_TOOL)
+
+
+def current_tool() -> str:
+    """Name of the tool running in this context, or '-' outside of tools."""
+    return _current_tool.get()
+
+
+class Histogram:
+    """Cumulative latency histogram with Prometheus-style buckets."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def cumulative(self):
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            yield bound, seen
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum / self.count * 1000, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50) * 1000, 2),
+            "p95_ms": round(self.quantile(0.95) * 1000, 2),
+            "p99_ms": round(self.quantile(0.99) * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe store for tool, outbound and model metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # tool -> {'calls', 'errors', 'latency'}
+            self._tools = {}
+            # (tool, service) -> {'calls', 'errors', 'bytes', 'latency'}
+            self._outbound = {}
+            # model -> {'calls', 'errors', 'latency'}
+            self._models = {}
+            # intent -> {'hits', 'saved', 'latency'}
+            self._routes = {}
+            self._route_misses = 0
+            # tool -> {'hits', 'misses', 'invalidations'}
+            self._cache = {}
+
+    def observe_tool(self, tool: str, seconds: float, error: bool):
+        with self._lock:
+            entry = self._tools.get(tool)
+            if entry is None:
+                entry = self._tools[tool] = {"calls": 0, "errors": 0, "latency": Histogram()}
+            entry["calls"] += 1
+            entry["errors"] += bool(error)
+            entry["latency"].observe(seconds)
+
+    def observe_outbound(self, service: str, seconds: float, size: int, error: bool, tool: str = None):
+        key = (tool or current_tool(), service)
+        with self._lock:
+            entry = self._outbound.get(key)
+            if entry is None:
+                entry = self._outbound[key] = {"calls": 0, "errors": 0, "bytes": 0, "latency": Histogram()}
+            entry["calls"] += 1
+            entry["errors"] += bool(error)
+            entry["bytes"] += size
+            entry["latency"].observe(seconds)
+
+    def observe_model(self, model: str, seconds: float, error: bool):
+        with self._lock:
+            entry = self._models.get(model)
+            if entry is None:
+                entry = self._models[model] = {"calls": 0, "errors": 0, "latency": Histogram()}
+            entry["calls"] += 1
+            entry["errors"] += bool(error)
+            entry["latency"].observe(seconds)
+
+    def observe_route(self, intent: str, seconds: float, saved_seconds: float):
+        with self._lock:
+            entry = self._routes.get(intent)
+            if entry is None:
+                entry = self._routes[intent] = {"hits": 0, "saved": 0.0, "latency": Histogram()}
+            entry["hits"] += 1
+            entry["saved"] += saved_seconds
+            entry["latency"].observe(seconds)
+
+    def observe_route_miss(self):
+        with self._lock:
+            self._route_misses += 1
+
+    def _cache_entry(self, tool: str) -> dict:
+        entry = self._cache.get(tool)
+        if entry is None:
+            entry = self._cache[tool] = {"hits": 0, "misses": 0, "invalidations": 0}
+        return entry
+
+    def observe_cache(self, tool: str, hit: bool):
+        with self._lock:
+            self._cache_entry(tool)["hits" if hit else "misses"] += 1
+
+    def observe_cache_invalidation(self, tool: str, count: int = 1):
+        with self._lock:
+            self._cache_entry(tool)["invalidations"] += count
+
+    def model_latency(self) -> float:
+        """Mean latency of all model calls so far in seconds, or 0.0 before the first one."""
+        with self._lock:
+            count = sum(e["latency"].count for e in self._models.values())
+            total = sum(e["latency"].sum for e in self._models.values())
+        return total / count if count else 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Current metrics as plain data.
+
+        Returns:
+            Dict with 'tools', 'outbound', 'models', 'router' and 'cache' sections;
+            latencies are summarized as count/avg/p50/p95/p99/max in milliseconds
+        """
+        with self._lock:
+            hits = sum(e["hits"] for e in self._routes.values())
+            routed = hits + self._route_misses
+            return {
+                "tools": {
+                    tool: {"calls": e["calls"], "errors": e["errors"], "latency": e["latency"].to_dict()}
+                    for tool, e in sorted(self._tools.items())
+                },
+                "outbound": [
+                    {"tool": tool, "service": service, "calls": e["calls"], "errors": e["errors"],
+                     "bytes": e["bytes"], "latency": e["latency"].to_dict()}
+                    for (tool, service), e in sorted(self._outbound.items())
+                ],
+                "models": {
+                    model: {"calls": e["calls"], "errors": e["errors"], "latency": e["latency"].to_dict()}
+                    for model, e in sorted(self._models.items())
+                },
+                "router": {
+                    "hits": hits,
+                    "misses": self._route_misses,
+                    "hit_rate": round(hits / routed, 4) if routed else 0.0,
+                    "saved_ms": round(sum(e["saved"] for e in self._routes.values()) * 1000, 1),
+                    "intents": {
+                        intent: {"hits": e["hits"], "saved_ms": round(e["saved"] * 1000, 1),
+                                 "latency": e["latency"].to_dict()}
+                        for intent, e in sorted(self._routes.items())
+                    },
+                },
+                "cache": {tool: dict(e) for tool, e in sorted(self._cache.items())},
+            }
+
+    def render_prometheus(self) -> str:
+        """Current metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name, labels, hist):
+            for bound, seen in hist.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {seen}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            tools = sorted(self._tools.items())
+            outbound = sorted(self._outbound.items())
+            models = sorted(self._models.items())
+            routes = sorted(self._routes.items())
+            cache = sorted(self._cache.items())
+
+            family("agent_tool_calls_total", "counter", "Tool invocations.")
+            for tool, e in tools:
+                lines.append(f'agent_tool_calls_total{{tool="{_escape(tool)}"}} {e["calls"]}')
+            family("agent_tool_errors_total", "counter", "Tool invocations that raised or returned an error.")
+            for tool, e in tools:
+                lines.append(f'agent_tool_errors_total{{tool="{_escape(tool)}"}} {e["errors"]}')
+            family("agent_tool_latency_seconds", "histogram", "Tool latency including thread pool wait.")
+            for tool, e in tools:
+                histogram("agent_tool_latency_seconds", f'tool="{_escape(tool)}"', e["latency"])
+
+            family("agent_outbound_requests_total", "counter", "Outbound HTTP requests by tool and service.")
+            for (tool, service), e in outbound:
+                lines.append(f'agent_outbound_requests_total{{tool="{_escape(tool)}",service="{_escape(service)}"}} {e["calls"]}')
+            family("agent_outbound_errors_total", "counter", "Outbound HTTP requests that failed (status >= 400).")
+            for (tool, service), e in outbound:
+                lines.append(f'agent_outbound_errors_total{{tool="{_escape(tool)}",service="{_escape(service)}"}} {e["errors"]}')
+            family("agent_outbound_response_bytes_total", "counter", "Response body bytes received.")
+            for (tool, service), e in outbound:
+                lines.append(f'agent_outbound_response_bytes_total{{tool="{_escape(tool)}",service="{_escape(service)}"}} {e["bytes"]}')
+            family("agent_outbound_latency_seconds", "histogram", "Outbound HTTP request latency.")
+            for (tool, service), e in outbound:
+                histogram("agent_outbound_latency_seconds", f'tool="{_escape(tool)}",service="{_escape(service)}"', e["latency"])
+
+            family("agent_model_calls_total", "counter", "LLM calls.")
+            for model, e in models:
+                lines.append(f'agent_model_calls_total{{model="{_escape(model)}"}} {e["calls"]}')
+            family("agent_model_errors_total", "counter", "LLM calls that returned an error.")
+            for model, e in models:
+                lines.append(f'agent_model_errors_total{{model="{_escape(model)}"}} {e["errors"]}')
+            family("agent_model_latency_seconds", "histogram", "LLM call latency.")
+            for model, e in models:
+                histogram("agent_model_latency_seconds", f'model="{_escape(model)}"', e["latency"])
+
+            family("agent_router_hits_total", "counter", "Requests answered by the intent router without the model.")
+            for intent, e in routes:
+                lines.append(f'agent_router_hits_total{{intent="{_escape(intent)}"}} {e["hits"]}')
+            family("agent_router_misses_total", "counter", "Requests passed on to the model.")
+            lines.append(f"agent_router_misses_total {self._route_misses}")
+            family("agent_router_saved_seconds_total", "counter", "Estimated model latency avoided by router hits.")
+            for intent, e in routes:
+                lines.append(f'agent_router_saved_seconds_total{{intent="{_escape(intent)}"}} {e["saved"]:.6f}')
+            family("agent_router_latency_seconds", "histogram", "Latency of router answers, tool call included.")
+            for intent, e in routes:
+                histogram("agent_router_latency_seconds", f'intent="{_escape(intent)}"', e["latency"])
+
+            family("agent_tool_cache_hits_total", "counter", "Tool calls answered from the session cache.")
+            for tool, e in cache:
+                lines.append(f'agent_tool_cache_hits_total{{tool="{_escape(tool)}"}} {e["hits"]}')
+            family("agent_tool_cache_misses_total", "counter", "Cacheable tool calls that ran the tool.")
+            for tool, e in cache:
+                lines.append(f'agent_tool_cache_misses_total{{tool="{_escape(tool)}"}} {e["misses"]}')
+            family("agent_tool_cache_invalidations_total", "counter", "Cached results dropped by calendar writes.")
+            for tool, e in cache:
+                lines.append(f'agent_tool_cache_invalidations_total{{tool="{_escape(tool)}"}} {e["invalidations"]}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+def snapshot() -> dict:
+    """Current metrics of the process-wide registry as plain data."""
+    return registry.snapshot()
+
+
+def render_prometheus() -> str:
+    """Current metrics of the process-wide registry in Prometheus text format."""
+    return registry.render_prometheus()
+
+
+def _is_error(result) -> bool:
+    """Tools report failures as '❌ ...' strings or by returning None."""
+    if result is None:
+        return True
+    return isinstance(result, str) and result.lstrip().startswith("❌")
+
+
+def instrument(func, name: str = None):
+    """
+    Wrap a tool function so every call is recorded in the registry.
+
+    Works for plain and coroutine functions and keeps the name, docstring
+    and signature that FunctionTool uses for the declaration.
+
+    Args:
+        func: Tool function
+        name: Metric label (default: the function name)
+
+    Returns:
+        Wrapped function of the same kind
+    """
+    tool = name or func.__name__
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            token = _current_tool.set(tool)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = await func(*args, **kwargs)
+                error = _is_error(result)
+                return result
+            finally:
+                registry.observe_tool(tool, time.perf_counter() - start, error)
+                _current_tool.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _current_tool.set(tool)
+        start = time.perf_counter()
+        error = True
+        try:
+            result = func(*args, **kwargs)
+            error = _is_error(result)
+            return result
+        finally:
+            registry.observe_tool(tool, time.perf_counter() - start, error)
+            _current_tool.reset(token)
+
+    return wrapper
+
+
+def instrument_http(http, service: str):
+    """
+    Record every request made through an httplib2.Http (Google API client).
+
+    Args:
+        http: httplib2.Http instance
+        service: Metric label, e.g. 'calendar'
+
+    Returns:
+        The same object, with request() wrapped
+    """
+    request = http.request
+
+    @functools.wraps(request)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            response, content = request(*args, **kwargs)
+        except Exception:
+            registry.observe_outbound(service, time.perf_counter() - start, 0, True)
+            raise
+        registry.observe_outbound(service, time.perf_counter() - start, len(content or b""), response.status >= 400)
+        return response, content
+
+    http.request = wrapper
+    return http
+
+
+def _record_response(response, *args, **kwargs):
+    service = urlsplit(response.url).hostname or "unknown"
+    registry.observe_outbound(
+        service,
+        response.elapsed.total_seconds(),
+        len(response.content or b""),
+        response.status_code >= 400
+    )
+
+
+def instrument_session(session):
+    """
+    Record every response received by a requests.Session, labelled by host.
+
+    Args:
+        session: requests.Session
+
+    Returns:
+        The same session
+    """
+    session.hooks["response"].append(_record_response)
+    return session
+
+
+# ------------------------------------------------------------- model timing
+
+_model_starts = {}
+_model_starts_lock = threading.Lock()
+
+
+def _model_key(callback_context):
+    return getattr(callback_context, "invocation_id", None) or id(callback_context)
+
+
+def before_model_callback(callback_context, llm_request):
+    """ADK before_model_callback that starts the model timer for this invocation."""
+    with _model_starts_lock:
+        _model_starts[_model_key(callback_context)] = (time.perf_counter(), getattr(llm_request, "model", None))
+    return None
+
+
+def after_model_callback(callback_context, llm_response):
+    """ADK after_model_callback that records the model latency."""
+    with _model_starts_lock:
+        started = _model_starts.pop(_model_key(callback_context), None)
+    if started is not None:
+        start, model = started
+        error = bool(getattr(llm_response, "error_code", None))
+        registry.observe_model(model or "unknown", time.perf_counter() - start, error)
+    return None
+
+
+# ------------------------------------------------------------------ server
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body = render_prometheus().encode()
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(snapshot(), indent=2).encode()
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None, host: str = METRICS_HOST):
+    """
+    Serve /metrics and /metrics.json from a background thread.
+
+    Args:
+        port: Port to listen on (default: METRICS_PORT)
+        host: Interface to bind (default: METRICS_HOST, 127.0.0.1)
+
+    Returns:
+        The running server, or None if no port is configured
+    """
+    global _server
+    port = port if port is not None else (int(METRICS_PORT) if METRICS_PORT else None)
+    if port is None:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics", daemon=True).start()
+            print(f"📈 Metrics on http://{host}:{_server.server_address[1]}/metrics")
+        return _server
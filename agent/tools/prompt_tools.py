@@ -1,10 +1,33 @@
+import re
 import json
+import datetime
+import functools
 from typing import Dict, List, Any
 import logging
 import os
 
+from .result_format import compact, compact_results
+from .time_parser import parse_temporal
+
 logger = logging.getLogger(__name__)
 
+# Keywords that indicate LOCKED events
+LOCKED_KEYWORDS = (
+    'meeting', 'sync', 'standup', 'call', 'interview', 'appointment',
+    'lunch', 'dinner', 'client', 'team', 'with', 'dentist', 'doctor',
+    'conference', 'presentation', 'demo', 'review'
+)
+
+# Keywords that indicate MOVABLE events
+MOVABLE_KEYWORDS = (
+    'gym', 'workout', 'exercise', 'study', 'read', 'write', 'work',
+    'deep work', 'focus', 'personal', 'break', 'rest'
+)
+
+# One alternation per class, matched as plain substrings like `keyword in title`
+_LOCKED_RE = re.compile('|'.join(map(re.escape, LOCKED_KEYWORDS)))
+_MOVABLE_RE = re.compile('|'.join(map(re.escape, MOVABLE_KEYWORDS)))
+
 def parse_user_input_to_task(user_input: str) -> str:
     """
     Convert natural language requests into structured JSON data for calendar events.
@@ -15,6 +38,20 @@ def parse_user_input_to_task(user_input: str) -> str:
     Returns:
         Structured JSON string with task details
     """
+    return json.dumps(parse_task(user_input), indent=2)
+
+
+def parse_task(user_input: str) -> Dict[str, Any]:
+    """
+    Rule-based parse of a task description (see parse_user_input_to_task).
+
+    Args:
+        user_input: Natural language description of a task or event
+
+    Returns:
+        Task dict with task_name, priority, flexibility, duration_minutes
+        and, when the text names them, start_time/end_time or date
+    """
     
     # For now, we'll do rule-based parsing until AI integration is stable
     # This gives you immediate functionality while we fix the AI imports
@@ -54,26 +91,63 @@ def parse_user_input_to_task(user_input: str) -> str:
     elif any(word in user_lower for word in ['meeting', 'call']):
         task_data["duration_minutes"] = 30
     
-    # Extract time if mentioned
-    import re
-    time_match = re.search(r'(\d{1,2})(:\d{2})?\s*(am|pm|AM|PM)', user_input)
-    if time_match:
-        hour = int(time_match.group(1))
-        minute = time_match.group(2) or ":00"
-        ampm = time_match.group(3).lower()
-        
-        if ampm == 'pm' and hour != 12:
-            hour += 12
-        elif ampm == 'am' and hour == 12:
-            hour = 0
-            
-        task_data["hard_start_time"] = f"{hour:02d}{minute}"
-        task_data["flexibility"] = "FIXED"
+    # Resolve dates, times and durations ("next Tuesday at 4pm for 45 minutes")
+    when = parse_temporal(user_input)
+    if when["duration_minutes"]:
+        task_data["duration_minutes"] = when["duration_minutes"]
+    
+    if when["start"] is not None:
+        start = when["start"]
+        end = when["end"] or start + datetime.timedelta(minutes=task_data["duration_minutes"])
+        task_data["start_time"] = start.isoformat()
+        task_data["end_time"] = end.isoformat()
+        if when["explicit_time"]:
+            task_data["hard_start_time"] = start.strftime("%H:%M")
+            task_data["flexibility"] = "FIXED"
+    elif when["date"] is not None:
+        task_data["date"] = when["date"].isoformat()
     
-    print("------------")
-    print(f"time: {task_data}")
-    print("------------")
-    return json.dumps(task_data, indent=2)
+    logger.debug("Parsed task: %s", task_data)
+    return task_data
+
+
+@functools.lru_cache(maxsize=4096)
+def classify_event_title(event_title: str) -> str:
+    """
+    Classify a single event title as LOCKED or MOVABLE.
+    
+    Args:
+        event_title: Event title from Google Calendar
+    
+    Returns:
+        "LOCKED" or "MOVABLE"
+    """
+    title_lower = event_title.lower()
+    
+    if _LOCKED_RE.search(title_lower):
+        return "LOCKED"
+    if _MOVABLE_RE.search(title_lower):
+        return "MOVABLE"
+    
+    # Default: if it contains names or multiple words, probably locked
+    if len(event_title.split()) > 2 or any(c.isupper() for c in event_title[1:]):
+        return "LOCKED"
+    return "MOVABLE"
+
+
+def classify_event_titles(titles: List[str]) -> List[str]:
+    """
+    Classify many titles at once, e.g. a year of calendar history.
+    Each distinct title is only classified once.
+    
+    Args:
+        titles: Event titles
+    
+    Returns:
+        List of "LOCKED"/"MOVABLE" in the same order as titles
+    """
+    statuses = {title: classify_event_title(title) for title in set(titles)}
+    return [statuses[title] for title in titles]
 
 
 def analyze_calendar_events(events_list: List[str]) -> str:
@@ -87,42 +161,10 @@ def analyze_calendar_events(events_list: List[str]) -> str:
         JSON analysis of which events can be moved
     """
     
-    analysis_results = []
-    
-    for event_title in events_list:
-        title_lower = event_title.lower()
-        
-        # Rule-based classification
-        is_locked = False
-        
-        # Keywords that indicate LOCKED events
-        locked_keywords = [
-            'meeting', 'sync', 'standup', 'call', 'interview', 'appointment',
-            'lunch', 'dinner', 'client', 'team', 'with', 'dentist', 'doctor',
-            'conference', 'presentation', 'demo', 'review'
-        ]
-        
-        # Keywords that indicate MOVABLE events
-        movable_keywords = [
-            'gym', 'workout', 'exercise', 'study', 'read', 'write', 'work',
-            'deep work', 'focus', 'personal', 'break', 'rest'
-        ]
-        
-        if any(keyword in title_lower for keyword in locked_keywords):
-            status = "LOCKED"
-        elif any(keyword in title_lower for keyword in movable_keywords):
-            status = "MOVABLE"
-        else:
-            # Default: if it contains names or multiple words, probably locked
-            if len(event_title.split()) > 2 or any(c.isupper() for c in event_title[1:]):
-                status = "LOCKED"
-            else:
-                status = "MOVABLE"
-        
-        analysis_results.append({
-            "title": event_title,
-            "status": status
-        })
+    analysis_results = [
+        {"title": event_title, "status": status}
+        for event_title, status in zip(events_list, classify_event_titles(events_list))
+    ]
     
     return json.dumps(analysis_results, indent=2)
 
@@ -147,6 +189,10 @@ def smart_create_event_from_text(user_input: str) -> str:
         except json.JSONDecodeError:
             return f"⚠️ Could not parse task properly. Raw output:\n{parsed_json}"
         
+        if compact_results():
+            # The parsed task alone; the prose below repeats the same fields
+            return compact('smart_create_event_from_text', task_data)
+        
         # Format the response
         output = "🧠 Intelligent Task Analysis:\n\n"
         output += f"📝 Task: {task_data.get('task_name', 'Unknown')}\n"
@@ -161,7 +207,12 @@ def smart_create_event_from_text(user_input: str) -> str:
         elif 'preferred_time' in task_data:
             output += f"🎯 Preferred Time: {task_data['preferred_time']}\n"
         
-        output += "\n💡 To actually create this event, please provide specific date/time details!"
+        if 'start_time' in task_data:
+            output += f"📅 Start: {task_data['start_time']}\n"
+            output += f"📅 End: {task_data['end_time']}\n"
+            output += "\n💡 Times are resolved; pass start_time/end_time straight to create_calendar_event."
+        else:
+            output += "\n💡 To actually create this event, please provide specific date/time details!"
         output += f"\n\n📋 Parsed Data:\n```json\n{json.dumps(task_data, indent=2)}\n```"
         
         return output
@@ -179,25 +230,14 @@ def get_movable_events_from_calendar() -> str:
     """
     try:
         # Import here to avoid circular imports
-        from .calendar_tools import get_calendar_service
-        import datetime
-        
-        service = get_calendar_service()
+        from .calendar_time import utc_now
+        from .event_store import get_synced_store
         
         # Get events for the next 7 days
-        now = datetime.datetime.now(datetime.UTC).isoformat()
-        week_later = (datetime.datetime.now(datetime.UTC) + datetime.timedelta(days=7)).isoformat()
+        now = utc_now()
+        week_later = now + datetime.timedelta(days=7)
         
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=now,
-            timeMax=week_later,
-            maxResults=20,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
+        events = get_synced_store().events_between(now, week_later, limit=20)
         
         if not events:
             return "📅 No events found in the next 7 days to analyze."
@@ -208,6 +248,13 @@ def get_movable_events_from_calendar() -> str:
             title = event.get('summary', 'Untitled Event')
             event_titles.append(title)
         
+        if compact_results():
+            titles = [event.get('summary', 'Untitled Event') for event in events]
+            grouped = {'lock': [], 'mov': []}
+            for title, status in zip(titles, classify_event_titles(titles)):
+                grouped['lock' if status == 'LOCKED' else 'mov'].append(title)
+            return compact('get_movable_events_from_calendar', grouped)
+        
         # Analyze the events
         analysis_result = analyze_calendar_events(event_titles)
         
@@ -0,0 +1,232 @@
+"""
+Local expansion of recurring events.
+
+With EVENT_STORE_RECURRENCE=local the event store keeps each recurring series
+as its master event (RRULE / RDATE / EXDATE lines) plus the exceptions Google
+stores for moved or cancelled instances, instead of every expanded instance.
+RecurringSeries turns that description back into instances on demand, only
+inside the window being read.
+
+Rules are expanded in the wall-clock time of the series' own time zone, so a
+09:00 standup stays at 09:00 across daylight-saving changes. Instances get
+the ids Google gives them ('<master id>_<UTC start>'), so they can be patched
+or deleted like server-expanded ones.
+"""
+import os
+import re
+import heapq
+import bisect
+import datetime
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .calendar_time import get_timezone, parse_event_time
+
+# Open-ended reads (no time_max) stop expanding this far after time_min
+RECURRENCE_HORIZON_DAYS = int(os.getenv("RECURRENCE_HORIZON_DAYS", "366"))
+
+_UNTIL = re.compile(r'UNTIL=(\d{8})(?:T(\d{6})(Z?))?', re.IGNORECASE)
+_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+def _ical_time(value: str, params: dict, zone) -> datetime.datetime:
+    """Aware datetime of an RDATE/EXDATE value ('20251201', '20251201T090000' or '...Z')."""
+    if 'T' not in value:
+        day = datetime.datetime.strptime(value, '%Y%m%d')
+        return day.replace(tzinfo=zone)
+    if value.endswith('Z'):
+        return datetime.datetime.strptime(value, '%Y%m%dT%H%M%SZ').replace(tzinfo=datetime.UTC)
+    tzid = params.get('TZID')
+    return datetime.datetime.strptime(value, '%Y%m%dT%H%M%S').replace(tzinfo=get_timezone(tzid) if tzid else zone)
+
+
+class _Rule(NamedTuple):
+    """Options of one RRULE line, read from its text; UNTIL already in wall-clock time."""
+    freq: str
+    interval: int
+    count: Optional[int]
+    until: Optional[datetime.datetime]
+    parts: dict
+
+
+def _rule_options(value: str) -> _Rule:
+    parts = dict(part.split('=', 1) for part in value.upper().split(';') if '=' in part)
+    until = parts.pop('UNTIL', None)
+    count = parts.pop('COUNT', None)
+    return _Rule(
+        freq=parts.pop('FREQ', ''),
+        interval=int(parts.pop('INTERVAL', 1)),
+        count=int(count) if count is not None else None,
+        until=datetime.datetime.strptime(until, '%Y%m%dT%H%M%S') if until else None,
+        parts=parts,
+    )
+
+
+def _fixed_step(options: _Rule, dtstart: datetime.datetime) -> Optional[datetime.timedelta]:
+    """Constant distance between the instances of a plain daily or weekly rule, else None."""
+    parts = set(options.parts) - {'WKST'}
+    if options.freq == 'DAILY' and not parts:
+        return datetime.timedelta(days=options.interval)
+    if options.freq == 'WEEKLY' and parts <= {'BYDAY'}:
+        days = options.parts.get('BYDAY')
+        if days is None or days == _WEEKDAYS[dtstart.weekday()]:
+            return datetime.timedelta(weeks=options.interval)
+    return None
+
+
+class RecurringSeries:
+    """Lazily expandable recurring event."""
+
+    def __init__(self, master: dict, tz=None, overridden: Iterable[float] = ()):
+        """
+        Args:
+            master: Recurring event resource with 'recurrence' lines
+            tz: Calendar time zone, used when the master names none
+            overridden: UTC timestamps of original starts that have an
+                exception event (moved or cancelled instance)
+
+        Raises:
+            ValueError: If the recurrence lines cannot be parsed
+        """
+        from dateutil.rrule import rrulestr
+
+        self.master = master
+        self.all_day = 'date' in master['start']
+        name = master['start'].get('timeZone')
+        self.zone = get_timezone(name) if name else (tz or get_timezone())
+
+        start = parse_event_time(master['start'], self.zone).astimezone(self.zone)
+        end = parse_event_time(master['end'], self.zone).astimezone(self.zone)
+        # Everything below is naive wall-clock time in self.zone
+        self.dtstart = start.replace(tzinfo=None)
+        self.duration = end.replace(tzinfo=None) - self.dtstart
+
+        self.excluded = set(overridden)
+        self.rules = []
+        self.rdates = [self.dtstart]
+        for line in master.get('recurrence', []):
+            name, _, value = line.partition(':')
+            name, *raw_params = name.split(';')
+            params = dict(param.split('=', 1) for param in raw_params if '=' in param)
+            name = name.upper()
+            if name == 'RRULE':
+                value = _UNTIL.sub(self._wall_until, value)
+                options = _rule_options(value)
+                self.rules.append((_fixed_step(options, self.dtstart), options, rrulestr(value, dtstart=self.dtstart)))
+            elif name == 'RDATE':
+                for item in value.split(','):
+                    when = _ical_time(item, params, self.zone).astimezone(self.zone)
+                    self.rdates.append(when.replace(tzinfo=None))
+            elif name == 'EXDATE':
+                for item in value.split(','):
+                    self.excluded.add(_ical_time(item, params, self.zone).timestamp())
+        self.rdates.sort()
+        self.last_end = self._last_end()
+
+    def _last_end(self):
+        """Wall-clock end of the last instance, or None for a series without end."""
+        last = self.rdates[-1]
+        for step, options, _ in self.rules:
+            if step is not None and options.count is not None:
+                last = max(last, self.dtstart + (options.count - 1) * step)
+            elif options.until is not None:
+                last = max(last, options.until)
+            else:
+                return None
+        return last + self.duration
+
+    def _wall_until(self, match) -> str:
+        """Rewrite UNTIL into the same naive wall-clock time as DTSTART (dateutil requires it)."""
+        day, clock, utc = match.groups()
+        if clock is None:
+            # A date bound includes that whole day
+            until = datetime.datetime.strptime(day, '%Y%m%d') + datetime.timedelta(days=1, seconds=-1)
+        else:
+            until = datetime.datetime.strptime(day + clock, '%Y%m%d%H%M%S')
+            if utc:
+                until = until.replace(tzinfo=datetime.UTC).astimezone(self.zone).replace(tzinfo=None)
+        return 'UNTIL=' + until.strftime('%Y%m%dT%H%M%S')
+
+    def _starts_from(self, lo: datetime.datetime) -> Iterator[datetime.datetime]:
+        """Wall-clock instance starts at or after lo, in order and without duplicates."""
+        sources = [iter(self.rdates[bisect.bisect_left(self.rdates, lo):])]
+        for step, options, rule in self.rules:
+            if step is not None:
+                sources.append(self._stepped(step, options.count, options.until, lo))
+                continue
+            # dateutil always iterates from DTSTART; for unbounded daily and weekly
+            # rules jump to the period just before lo so old series stay cheap
+            if options.count is None and options.freq in ('DAILY', 'WEEKLY') and lo > self.dtstart:
+                step = datetime.timedelta(days=options.interval * (1 if options.freq == 'DAILY' else 7))
+                periods = (lo - self.dtstart) // step - 1
+                if periods > 0:
+                    rule = rule.replace(dtstart=self.dtstart + periods * step)
+            sources.append(rule.xafter(lo, inc=True))
+
+        previous = None
+        for start in heapq.merge(*sources):
+            if start != previous:
+                yield start
+                previous = start
+
+    def _stepped(self, step, count, until, lo):
+        """Starts of a rule with one instance per period, computed without dateutil."""
+        k = max(0, -((self.dtstart - lo) // step))
+        while count is None or k < count:
+            start = self.dtstart + k * step
+            if until is not None and start > until:
+                return
+            yield start
+            k += 1
+
+    def between(self, time_min, time_max=None) -> Iterator[Tuple[datetime.datetime, dict]]:
+        """
+        Lazily yield (start, instance) for instances overlapping [time_min, time_max).
+
+        Args:
+            time_min: Aware datetime
+            time_max: Aware datetime (default: RECURRENCE_HORIZON_DAYS after time_min)
+
+        Yields:
+            Aware start and a synthesized instance event, ordered by start
+        """
+        if time_max is None:
+            time_max = time_min + datetime.timedelta(days=RECURRENCE_HORIZON_DAYS)
+        # Wall-clock bounds, widened by an hour so a daylight-saving shift cannot hide an instance
+        hour = datetime.timedelta(hours=1)
+        lo = time_min.astimezone(self.zone).replace(tzinfo=None) - self.duration - hour
+        if time_max.astimezone(self.zone).replace(tzinfo=None) + hour < self.rdates[0]:
+            return
+        if self.last_end is not None and lo > self.last_end:
+            return
+
+        for wall in self._starts_from(lo):
+            start = wall.replace(tzinfo=self.zone)
+            if start >= time_max:
+                return
+            end = (wall + self.duration).replace(tzinfo=self.zone)
+            if end <= time_min or start.timestamp() in self.excluded:
+                continue
+            yield start, self.instance(start, end)
+
+    def instance(self, start: datetime.datetime, end: datetime.datetime) -> dict:
+        """Event resource for one occurrence, shaped like Google's expanded instances."""
+        master = self.master
+        event = {key: value for key, value in master.items() if key not in ('recurrence', 'start', 'end')}
+        if self.all_day:
+            start_field = {'date': start.date().isoformat()}
+            end_field = {'date': end.date().isoformat()}
+            suffix = start.strftime('%Y%m%d')
+        else:
+            start_field = {'dateTime': start.isoformat()}
+            end_field = {'dateTime': end.isoformat()}
+            if 'timeZone' in master['start']:
+                start_field['timeZone'] = end_field['timeZone'] = master['start']['timeZone']
+            suffix = start.astimezone(datetime.UTC).strftime('%Y%m%dT%H%M%SZ')
+        event.update(
+            id=f"{master['id']}_{suffix}",
+            start=start_field,
+            end=end_field,
+            recurringEventId=master['id'],
+            originalStartTime=dict(start_field),
+        )
+        return event
@@ -0,0 +1,212 @@
+"""
+Compact tool results for the model context.
+
+Tool results go back into the model context on every later turn, so their
+size is paid again and again. With TOOL_RESULT_FORMAT=compact the calendar
+tools return minified JSON with short keys instead of emoji prose:
+
+    t: title   s: start (or range)   loc: location   cal: calendar
+    id: event id   err: error message of one item
+
+Times are written in the user's timezone as 'YYYY-MM-DD HH:MM' (all-day
+events as 'YYYY-MM-DD'), and a same-day range as 'YYYY-MM-DD HH:MM-HH:MM',
+which is about half the tokens of two full RFC 3339 timestamps. Lists of
+records are sent as a table, {"cols": ["t", "s"], "rows": [["Gym", ...]]},
+so the keys are not repeated on every row.
+
+Each result is also held to a character budget (TOOL_RESULT_BUDGET, or per
+tool with TOOL_RESULT_BUDGETS="list_upcoming_events=3000,check_free_busy=1200").
+When a result is over budget, items are dropped from the end of its longest
+list (a list of records, or a list inside one record, never a table header) and
+a "<key>+" entry records how many were left out, e.g. "ev+": 12.
+If that is not enough (or there is no list), the longest strings are cut
+and end in "...".
+"""
+import os
+import json
+import datetime
+from typing import Any, Dict, Union
+
+from .calendar_time import DEFAULT_TZ, parse_event_time, parse_iso
+
+RESULT_FORMAT = os.getenv("TOOL_RESULT_FORMAT", "text").lower()
+RESULT_BUDGET = int(os.getenv("TOOL_RESULT_BUDGET", "2000"))
+
+# Strings are never cut shorter than this
+MIN_STRING = 40
+
+
+def _parse_budgets(value: str) -> Dict[str, int]:
+    budgets = {}
+    for item in value.split(','):
+        name, _, size = item.partition('=')
+        if name.strip() and size.strip():
+            budgets[name.strip()] = int(size)
+    return budgets
+
+
+# Listing tools get more room; anything else falls back to RESULT_BUDGET
+RESULT_BUDGETS = {
+    'list_upcoming_events': 4000,
+    'search_events': 3000,
+    'check_free_busy': 3000,
+    'plan_schedule': 3000,
+    'batch_manage_events': 3000,
+    **_parse_budgets(os.getenv("TOOL_RESULT_BUDGETS", "")),
+}
+
+# Short instruction added to the system prompt in compact mode
+COMPACT_NOTE = (
+    f"Calendar tools return compact JSON. Times are local ({DEFAULT_TZ}) 'YYYY-MM-DD HH:MM', "
+    "ranges 'YYYY-MM-DD HH:MM-HH:MM'; add the UTC offset when passing them back to a tool. "
+    "Keys: t=title, s=start or range, loc=location, "
+    "cal=calendar, id=event id, err=error of one item; a key ending in '+' counts items "
+    "that were left out (call the tool again with a narrower range to see them). "
+    "Lists of records are tables: 'cols' names the fields of each row in 'rows'; missing trailing fields are empty."
+)
+
+
+def compact_results() -> bool:
+    """True when tools should return compact JSON instead of prose."""
+    return RESULT_FORMAT == 'compact'
+
+
+def when(value: Union[str, dict, datetime.datetime]) -> str:
+    """
+    Short local rendering of a time.
+
+    Args:
+        value: Aware datetime, ISO string, or an event 'start'/'end' field
+
+    Returns:
+        'YYYY-MM-DD HH:MM' in the user's timezone, or 'YYYY-MM-DD' for dates
+    """
+    if isinstance(value, dict):
+        if 'date' in value:
+            return value['date']
+        value = parse_event_time(value, DEFAULT_TZ)
+    elif isinstance(value, str):
+        if 'T' not in value:
+            return value
+        value = parse_iso(value, DEFAULT_TZ)
+    return value.astimezone(DEFAULT_TZ).strftime('%Y-%m-%d %H:%M')
+
+
+def span(start, end) -> str:
+    """'YYYY-MM-DD HH:MM-HH:MM' for a same-day range, else both full times joined by '/'."""
+    start, end = when(start), when(end)
+    if len(start) == len(end) == 16 and start[:10] == end[:10]:
+        return f"{start}-{end[11:]}"
+    return f"{start}/{end}"
+
+
+def event_row(event: dict, calendar_id: str = 'primary', end: bool = False, event_id: bool = False,
+              location: bool = True) -> dict:
+    """Short-key view of an event resource; with end=True, 's' holds the whole range."""
+    row = {'t': event.get('summary', 'No title')}
+    row['s'] = span(event['start'], event['end']) if end else when(event['start'])
+    if event_id:
+        row['id'] = event.get('id')
+    if location and event.get('location'):
+        row['loc'] = event['location']
+    if calendar_id != 'primary':
+        from .calendars import calendar_name
+        row['cal'] = calendar_name(calendar_id)
+    return row
+
+
+def _dumps(payload: Any) -> str:
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def _tabulated(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the payload with top-level lists of dicts as {'cols': [...], 'rows': [[...]]} tables."""
+    tables = {}
+    for key, value in payload.items():
+        if not isinstance(value, list) or len(value) < 2 or not all(isinstance(row, dict) for row in value):
+            tables[key] = value
+            continue
+        cols = list(dict.fromkeys(col for row in value for col in row))
+        rows = []
+        for row in value:
+            cells = [row.get(col, '') for col in cols]
+            while cells and cells[-1] == '':
+                cells.pop()
+            rows.append(cells)
+        tables[key] = {'cols': cols, 'rows': rows}
+    return tables
+
+
+def _lists(value: Any, found: list):
+    """Collect (container, key) for every list in the payload, nested ones included."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if isinstance(item, list):
+                found.append((value, key))
+            _lists(item, found)
+    elif isinstance(value, list):
+        for item in value:
+            _lists(item, found)
+
+
+def _strings(value: Any, found: list):
+    """Collect (container, key) for every string value in the payload, list items included."""
+    items = value.items() if isinstance(value, dict) else enumerate(value) if isinstance(value, list) else ()
+    for key, item in items:
+        if isinstance(item, str):
+            found.append((value, key))
+        else:
+            _strings(item, found)
+
+
+def compact(tool: str, payload: Dict[str, Any]) -> str:
+    """
+    Minified JSON for a tool result, truncated to the tool's budget.
+
+    Args:
+        tool: Tool name, used to look up its budget
+        payload: JSON-serializable result; modified in place when truncated
+            (before its lists of records are turned into tables)
+
+    Returns:
+        JSON string of at most the budget (unless even one item per list with
+        every string cut to MIN_STRING is too much)
+    """
+    budget = RESULT_BUDGETS.get(tool, RESULT_BUDGET)
+    text = _dumps(_tabulated(payload))
+    if len(text) <= budget:
+        return text
+
+    # Truncate the records themselves and measure them as tables, so table
+    # headers are never cut and lists nested in a record can be shortened
+    lists = []
+    _lists(payload, lists)
+    dropped = {}
+    while lists and len(text) > budget:
+        lists.sort(key=lambda item: len(item[0][item[1]]), reverse=True)
+        container, key = lists[0]
+        if len(container[key]) <= 1:
+            break
+        # Drop roughly the overflow at once, then settle item by item; stop at
+        # the length of the next longest list so equally long lists share the cut
+        items = container[key]
+        average = max(len(_dumps(items)) // len(items), 1)
+        runner_up = len(lists[1][0][lists[1][1]]) if len(lists) > 1 else 0
+        count = max(min((len(text) - budget) // average, len(items) - max(runner_up, 1)), 1)
+        del items[-count:]
+        marker = (id(container), key)
+        dropped[marker] = dropped.get(marker, 0) + count
+        container[key + '+'] = dropped[marker]
+        text = _dumps(_tabulated(payload))
+
+    strings = []
+    if len(text) > budget:
+        _strings(payload, strings)
+    while strings and len(text) > budget:
+        container, key = max(strings, key=lambda item: len(item[0][item[1]]))
+        value = container[key]
+        if len(value) <= MIN_STRING:
+            break
+        container[key] = value[:max(len(value) - (len(text) - budget) - 3, MIN_STRING)] + '...'
+        text = _dumps(_tabulated(payload))
+    return text
@@ -0,0 +1,465 @@
+"""
+Greedy schedule planner that places parsed tasks into free time.
+
+Takes tasks shaped like the output of parse_user_input_to_task and the
+calendar's events in a window, and proposes where every task goes:
+
+* LOCKED events (meetings, anything with other attendees or on a shared
+  calendar) and time outside working hours are never touched.
+* FIXED tasks keep their time; clashes with locked events are reported.
+* The other tasks are placed by priority (CRITICAL, CORE, FILLER), tightest
+  window first, in the earliest free slot, or the one nearest to the time
+  they ask for. When a CRITICAL or CORE task does not fit, MOVABLE events may
+  be pushed out of its way; they are then put back as close as possible to
+  their original time.
+
+Free time is a sorted list of disjoint gaps, so finding a slot is a bisect
+plus a short scan, and MOVABLE events live in an IntervalIndex, so weeks of
+events and dozens of tasks are planned in milliseconds. Nothing is written
+to the calendar; the plan is only a proposal.
+"""
+import json
+import bisect
+import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .calendar_time import event_bounds, get_timezone, parse_iso, utc_now
+from .calendars import events_between, get_synced_stores
+from .interval_index import IntervalIndex
+from .prompt_tools import classify_event_title, parse_task
+from .result_format import compact, compact_results, span, when
+from .slot_engine import off_hours, parse_clock
+
+PRIORITY_RANK = {'CRITICAL': 0, 'CORE': 1, 'FILLER': 2}
+
+# Only these priorities may push MOVABLE events out of the way
+DISPLACING_PRIORITIES = ('CRITICAL', 'CORE')
+
+
+class FreeTime:
+    """Disjoint free intervals over a window, as parallel sorted lists of timestamps."""
+
+    def __init__(self, start: float, end: float, grid: float = 900, origin: float = 0.0):
+        """
+        Args:
+            start: Window start (timestamp)
+            end: Window end (timestamp)
+            grid: Slots start on multiples of this many seconds after origin
+            origin: Grid anchor, e.g. local midnight of the first day
+        """
+        self._starts = [start] if end > start else []
+        self._ends = [end] if end > start else []
+        self.grid = grid
+        self.origin = origin
+
+    def __len__(self):
+        return len(self._starts)
+
+    def copy(self) -> 'FreeTime':
+        other = FreeTime(0, 0, self.grid, self.origin)
+        other._starts, other._ends = list(self._starts), list(self._ends)
+        return other
+
+    def gaps(self, start: float = float('-inf'), end: float = float('inf')) -> List[Tuple[float, float]]:
+        """Free intervals clipped to [start, end)."""
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        out = []
+        while i < len(self._starts) and self._starts[i] < end:
+            lo, hi = max(self._starts[i], start), min(self._ends[i], end)
+            if lo < hi:
+                out.append((lo, hi))
+            i += 1
+        return out
+
+    def reserve(self, start: float, end: float):
+        """Mark [start, end) as busy."""
+        i = max(bisect.bisect_right(self._starts, start) - 1, 0)
+        j = i
+        starts, ends = [], []
+        while j < len(self._starts) and self._starts[j] < end:
+            lo, hi = self._starts[j], self._ends[j]
+            if hi <= start:
+                starts.append(lo)
+                ends.append(hi)
+            else:
+                if lo < start:
+                    starts.append(lo)
+                    ends.append(start)
+                if hi > end:
+                    starts.append(end)
+                    ends.append(hi)
+            j += 1
+        self._starts[i:j] = starts
+        self._ends[i:j] = ends
+
+    def release(self, start: float, end: float):
+        """Mark [start, end) as free again, merging with neighbouring gaps."""
+        i = bisect.bisect_left(self._ends, start)
+        j = bisect.bisect_right(self._starts, end)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def _align(self, value: float) -> float:
+        offset = (value - self.origin) % self.grid
+        return value if not offset else value + self.grid - offset
+
+    def first_fit(self, length: float, not_before: float, not_after: float) -> Optional[float]:
+        """Earliest grid-aligned start of a free slot of `length` seconds inside [not_before, not_after)."""
+        i = max(bisect.bisect_right(self._starts, not_before) - 1, 0)
+        while i < len(self._starts) and self._starts[i] < not_after:
+            start = self._align(max(self._starts[i], not_before))
+            if start + length <= min(self._ends[i], not_after):
+                return start
+            i += 1
+        return None
+
+    def nearest_fit(self, length: float, target: float, not_before: float, not_after: float) -> Optional[float]:
+        """Grid-aligned start of a free slot of `length` seconds closest to `target`."""
+        best = None
+        later = self.first_fit(length, max(target, not_before), not_after)
+        if later is not None:
+            best = later
+        # Walk back over the gaps that end before the target
+        i = min(bisect.bisect_right(self._starts, target), len(self._starts)) - 1
+        while i >= 0 and self._ends[i] > not_before:
+            lo = max(self._starts[i], not_before)
+            hi = min(self._ends[i], not_after, target + length)
+            start = hi - length
+            start -= (start - self.origin) % self.grid
+            if start >= lo:
+                if best is None or target - start < best - target:
+                    best = start
+                break
+            if best is not None and target - self._ends[i] >= best - target:
+                break
+            i -= 1
+        return best
+
+
+def _local_day(ts: float, tz) -> Tuple[float, float]:
+    """Midnight-to-midnight bounds of the local day containing ts."""
+    day = datetime.datetime.fromtimestamp(ts, tz).date()
+    start = datetime.datetime.combine(day, datetime.time.min, tzinfo=tz)
+    end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+    return start.timestamp(), end.timestamp()
+
+
+def _off_hours(start: float, end: float, tz, day_start: datetime.time, day_end: datetime.time,
+               weekdays: Optional[Sequence[int]]) -> List[Tuple[float, float]]:
+    blocked = off_hours(
+        datetime.datetime.fromtimestamp(start, tz),
+        datetime.datetime.fromtimestamp(end, tz),
+        day_start, day_end, weekdays, tz
+    )
+    return [(lo.timestamp(), hi.timestamp()) for lo, hi in blocked]
+
+
+def is_movable(event: dict, calendar_id: str = 'primary') -> bool:
+    """MOVABLE events are the user's own, without guests, with a title classified MOVABLE."""
+    if calendar_id != 'primary':
+        return False
+    guests = [person for person in event.get('attendees', []) if not person.get('self')]
+    if guests:
+        return False
+    organizer = event.get('organizer', {})
+    if organizer and not organizer.get('self', True):
+        return False
+    return classify_event_title(event.get('summary', '')) == 'MOVABLE'
+
+
+def _task_window(task: dict, window: Tuple[float, float], now: float, tz):
+    """
+    (not_before, not_after, target) for a flexible task, or None outside the window.
+
+    target is the start the task asked for ("this evening"), or None for
+    "as early as possible".
+    """
+    lo, hi = window
+    target = None
+    if task.get('start_time'):
+        start = datetime.datetime.fromisoformat(task['start_time']).timestamp()
+        target = start
+        lo, hi = max(lo, start - 2 * 3600), min(hi, _local_day(start, tz)[1])
+    elif task.get('date'):
+        day = datetime.date.fromisoformat(task['date'])
+        day_start = datetime.datetime.combine(day, datetime.time.min, tzinfo=tz).timestamp()
+        lo, hi = max(lo, day_start), min(hi, day_start + 86400)
+    elif task.get('flexibility') == 'FLOATING':
+        # "today", "this afternoon": the rest of today
+        lo, hi = max(lo, now), min(hi, _local_day(now, tz)[1])
+    return (lo, hi, target) if lo < hi else None
+
+
+def plan_tasks(
+    tasks: List[dict],
+    events: List[Tuple[str, dict]],
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    working_hours: Tuple[Optional[datetime.time], Optional[datetime.time]] = (datetime.time(9), datetime.time(18)),
+    weekdays: Optional[Sequence[int]] = None,
+    granularity_minutes: int = 15,
+    allow_moving: bool = True,
+    now: datetime.datetime = None
+) -> Dict[str, list]:
+    """
+    Place tasks into the free time of a calendar.
+
+    Args:
+        tasks: Task dicts with task_name, priority, flexibility,
+            duration_minutes and optionally start_time/end_time,
+            hard_start_time or date (see parse_user_input_to_task)
+        events: (calendar_id, event) pairs overlapping the window
+        window_start: Aware start of the planning window
+        window_end: Aware end of the planning window
+        working_hours: (day_start, day_end) tasks must stay within
+        weekdays: Allowed weekdays (Monday=0); None allows every day
+        granularity_minutes: Proposed starts lie on this grid
+        allow_moving: Let CRITICAL and CORE tasks push MOVABLE events aside
+        now: Reference time for FLOATING ("today") tasks
+
+    Returns:
+        Dict with 'scheduled' (task, start, end), 'moves' (event, start,
+        end, new_start, new_end), 'unscheduled' (task, reason) and
+        'conflicts' (task, events) lists; times are aware datetimes in the
+        window's timezone
+    """
+    tz = window_start.tzinfo
+    lo, hi = window_start.timestamp(), window_end.timestamp()
+    now_ts = (now or window_start).timestamp()
+    origin = _local_day(lo, tz)[0]
+    grid = granularity_minutes * 60
+
+    # hard: free time ignoring MOVABLE events; free: what is actually free now
+    hard = FreeTime(lo, hi, grid, origin)
+    for start, end in _off_hours(lo, hi, tz, working_hours[0], working_hours[1], weekdays):
+        hard.reserve(start, end)
+
+    locked, movable = [], []
+    for calendar_id, event in events:
+        if 'date' in event['start'] or event.get('transparency') == 'transparent':
+            # All-day and "free" events do not block time
+            continue
+        start, end = (value.timestamp() for value in event_bounds(event, tz))
+        if end <= lo or start >= hi:
+            continue
+        if allow_moving and is_movable(event, calendar_id):
+            movable.append((start, end, event))
+        else:
+            locked.append((start, end, event))
+            hard.reserve(start, end)
+
+    free = hard.copy()
+    for start, end, _ in movable:
+        free.reserve(start, end)
+    movable_index = IntervalIndex(movable)
+    locked_index = IntervalIndex(locked)
+    displaced = {}   # event id -> (start, end, event)
+
+    def to_dt(ts):
+        return datetime.datetime.fromtimestamp(ts, tz)
+
+    def occupy(start, end):
+        hard.reserve(start, end)
+        free.reserve(start, end)
+
+    def displace(start, end):
+        """Push the MOVABLE events overlapping [start, end) aside and free their time."""
+        for event in movable_index.overlapping(start, end):
+            if event['id'] in displaced:
+                continue
+            ev_start, ev_end = (value.timestamp() for value in event_bounds(event, tz))
+            displaced[event['id']] = (ev_start, ev_end, event)
+            # Give back only what no other (still placed) MOVABLE event covers
+            others = [
+                tuple(value.timestamp() for value in event_bounds(other, tz))
+                for other in movable_index.overlapping(ev_start, ev_end)
+                if other['id'] not in displaced
+            ]
+            for gap_start, gap_end in hard.gaps(ev_start, ev_end):
+                cursor = gap_start
+                for other_start, other_end in sorted(others):
+                    if other_start > cursor:
+                        free.release(cursor, min(other_start, gap_end))
+                    cursor = max(cursor, other_end)
+                    if cursor >= gap_end:
+                        break
+                if cursor < gap_end:
+                    free.release(cursor, gap_end)
+
+    result = {'scheduled': [], 'moves': [], 'unscheduled': [], 'conflicts': []}
+
+    fixed = [task for task in tasks if task.get('hard_start_time') and task.get('start_time')]
+    flexible = [task for task in tasks if task not in fixed]
+
+    for task in fixed:
+        start = datetime.datetime.fromisoformat(task['start_time']).timestamp()
+        end = datetime.datetime.fromisoformat(task['end_time']).timestamp() if task.get('end_time') \
+            else start + 60 * int(task.get('duration_minutes', 60))
+        clashes = locked_index.overlapping(start, end)
+        if clashes:
+            result['conflicts'].append({'task': task, 'events': clashes})
+        if allow_moving:
+            displace(start, end)
+        occupy(start, end)
+        result['scheduled'].append({'task': task, 'start': to_dt(start), 'end': to_dt(end)})
+
+    windows = {}
+    for i, task in enumerate(flexible):
+        windows[i] = _task_window(task, (lo, hi), now_ts, tz)
+    order = sorted(
+        (i for i in windows if windows[i] is not None),
+        key=lambda i: (
+            PRIORITY_RANK.get(flexible[i].get('priority'), 1),
+            windows[i][1] - windows[i][0],
+            -int(flexible[i].get('duration_minutes', 60))
+        )
+    )
+    for i, task in enumerate(flexible):
+        if windows[i] is None:
+            result['unscheduled'].append({'task': task, 'reason': 'outside the planning window'})
+
+    for i in order:
+        task = flexible[i]
+        not_before, not_after, target = windows[i]
+        length = 60 * int(task.get('duration_minutes', 60))
+
+        def fit(space):
+            if target is not None:
+                return space.nearest_fit(length, target, not_before, not_after)
+            return space.first_fit(length, not_before, not_after)
+
+        start = fit(free)
+        if start is None and allow_moving and task.get('priority', 'CORE') in DISPLACING_PRIORITIES:
+            start = fit(hard)
+            if start is not None:
+                displace(start, start + length)
+        if start is None:
+            result['unscheduled'].append({'task': task, 'reason': 'no free slot long enough'})
+            continue
+        occupy(start, start + length)
+        result['scheduled'].append({'task': task, 'start': to_dt(start), 'end': to_dt(start + length)})
+
+    # Put displaced events back as close to their old time as possible, same day first
+    for ev_start, ev_end, event in sorted(displaced.values(), key=lambda item: item[0]):
+        length = ev_end - ev_start
+        day_lo, day_hi = _local_day(ev_start, tz)
+        start = free.nearest_fit(length, ev_start, max(lo, day_lo), min(hi, day_hi))
+        if start is None:
+            start = free.nearest_fit(length, ev_start, lo, hi)
+        move = {'event': event, 'start': to_dt(ev_start), 'end': to_dt(ev_end), 'new_start': None, 'new_end': None}
+        if start is not None:
+            occupy(start, start + length)
+            move['new_start'], move['new_end'] = to_dt(start), to_dt(start + length)
+        result['moves'].append(move)
+
+    result['scheduled'].sort(key=lambda item: item['start'])
+    return result
+
+
+def _describe(task: dict) -> str:
+    return f"{task.get('task_name', 'Task')} [{task.get('priority', 'CORE')}, {task.get('duration_minutes', 60)} min]"
+
+
+def _compact_plan(plan: dict) -> dict:
+    payload = {'plan': [
+        {'t': item['task'].get('task_name', 'Task'), 's': span(item['start'], item['end'])}
+        for item in plan['scheduled']
+    ]}
+    if plan['moves']:
+        payload['moves'] = [
+            {'id': move['event']['id'], 't': move['event'].get('summary', 'Untitled'), 's': when(move['start']),
+             'to': span(move['new_start'], move['new_end']) if move['new_start'] else None}
+            for move in plan['moves']
+        ]
+    if plan['conflicts']:
+        payload['clash'] = [
+            {'t': conflict['task'].get('task_name', 'Task'), 'with': [event.get('summary', 'Untitled') for event in conflict['events']]}
+            for conflict in plan['conflicts']
+        ]
+    if plan['unscheduled']:
+        payload['unplaced'] = [
+            {'t': item['task'].get('task_name', 'Task'), 'err': item['reason']} for item in plan['unscheduled']
+        ]
+    payload['applied'] = False
+    return payload
+
+
+def plan_schedule(
+    tasks: List[str],
+    time_min: str = "",
+    time_max: str = "",
+    working_hours_start: str = "09:00",
+    working_hours_end: str = "18:00",
+    allow_moving: bool = True
+) -> str:
+    """
+    Plan when to do a set of tasks around the existing calendar.
+
+    Meetings and events with other people stay where they are; personal
+    MOVABLE events (gym, focus time, ...) may be shifted to make room for
+    CRITICAL and CORE tasks. Nothing is created or moved; apply the plan with
+    batch_manage_events.
+
+    Args:
+        tasks: Task descriptions in natural language, or task JSON objects
+            as returned by parse_user_input_to_task
+        time_min: Start of the planning window in ISO format (default: now)
+        time_max: End of the planning window in ISO format (default: 7 days after time_min)
+        working_hours_start: Earliest time of day for tasks (default: '09:00')
+        working_hours_end: Latest time of day for tasks (default: '18:00')
+        allow_moving: Allow shifting MOVABLE events (default: True)
+
+    Returns:
+        Proposed start/end for each task and the events to move
+    """
+    try:
+        parsed = []
+        for task in tasks:
+            task = task.strip()
+            parsed.append(json.loads(task) if task.startswith('{') else parse_task(task))
+
+        tz = get_timezone()
+        now = utc_now().astimezone(tz)
+        start_dt = parse_iso(time_min, tz) if time_min else now
+        end_dt = parse_iso(time_max, start_dt.tzinfo) if time_max else start_dt + datetime.timedelta(days=7)
+
+        events = events_between(get_synced_stores(), start_dt, end_dt)
+        plan = plan_tasks(
+            parsed, events, start_dt, end_dt,
+            working_hours=(parse_clock(working_hours_start), parse_clock(working_hours_end)),
+            allow_moving=allow_moving,
+            now=now
+        )
+
+        if compact_results():
+            return compact('plan_schedule', _compact_plan(plan))
+
+        output = f"🗓️ Proposed plan for {len(parsed)} task(s) ({len(events)} existing events considered):\n\n"
+        for item in plan['scheduled']:
+            output += f"✅ {_describe(item['task'])}: {item['start'].isoformat()} to {item['end'].isoformat()}\n"
+        if plan['moves']:
+            output += "\n🔀 Events to move:\n"
+            for move in plan['moves']:
+                event = move['event']
+                if move['new_start'] is None:
+                    output += f"⚠️ {event.get('summary', 'Untitled')} ({move['start'].isoformat()}) has no free slot left; cancel or shorten it\n"
+                else:
+                    output += (f"↪️ {event.get('summary', 'Untitled')} (ID: {event['id']}): "
+                               f"{move['start'].isoformat()} → {move['new_start'].isoformat()} to {move['new_end'].isoformat()}\n")
+        if plan['conflicts']:
+            output += "\n⚠️ Fixed tasks that clash with locked events:\n"
+            for conflict in plan['conflicts']:
+                names = ', '.join(event.get('summary', 'Untitled') for event in conflict['events'])
+                output += f"• {_describe(conflict['task'])} overlaps {names}\n"
+        if plan['unscheduled']:
+            output += "\n❌ Could not schedule:\n"
+            for item in plan['unscheduled']:
+                output += f"• {_describe(item['task'])}: {item['reason']}\n"
+        output += "\n💡 Nothing has been changed yet. Use batch_manage_events to create the tasks and apply the moves."
+        return output
+
+    except Exception as e:
+        return f"❌ Error planning schedule: {str(e)}"
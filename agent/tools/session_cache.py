@@ -0,0 +1,265 @@
+"""
+Per-session memo of read-only tool results.
+
+Within one conversation the model often asks for the same data twice: it
+lists events and then searches the same window, or re-runs check_free_busy
+with identical arguments after a clarifying question. Read tools wrapped with
+`session_cached()` remember their result per session, keyed by the tool name
+and its normalized arguments, for SESSION_CACHE_TTL seconds.
+
+Every entry records the time window it depends on. When a write tool
+(creating, updating or deleting events) runs, only the entries whose window
+overlaps the written events are dropped, in every session, since they all
+read the same calendar; the rest stay valid. Hits, misses and invalidations
+are counted per tool in agent.tools.metrics.
+
+The session comes from a context variable that CalendarAgent sets for each
+invocation; outside a session, or with SESSION_CACHE_TTL=0, read tools run
+uncached.
+"""
+import os
+import json
+import time
+import inspect
+import functools
+import threading
+import contextvars
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .calendar_time import parse_iso, utc_now
+from .metrics import registry
+
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "120"))
+SESSION_CACHE_SESSIONS = int(os.getenv("SESSION_CACHE_SESSIONS", "1000"))
+SESSION_CACHE_ENTRIES = int(os.getenv("SESSION_CACHE_ENTRIES", "64"))
+
+INF = float("inf")
+Window = Tuple[float, float]
+
+_session = contextvars.ContextVar("tool_session", default=None)
+
+
+def use_session(session_id: Optional[str]):
+    """Make tool calls in this context use the cache of session_id; returns a token for release_session()."""
+    return _session.set(session_id)
+
+
+def release_session(token):
+    try:
+        _session.reset(token)
+    except ValueError:
+        # Reset from another context (e.g. a generator closed elsewhere)
+        _session.set(None)
+
+
+def current_session() -> Optional[str]:
+    return _session.get()
+
+
+# ------------------------------------------------------------ windows
+
+def _ts(value: str, default: float) -> float:
+    if not value:
+        return default
+    try:
+        return parse_iso(value).timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+def _span(time_min: str = "", time_max: str = "", days: float = None) -> Window:
+    """Window of ISO bounds; an empty time_min means now, an empty time_max `days` later (or open)."""
+    lo = _ts(time_min, utc_now().timestamp())
+    hi = _ts(time_max, lo + days * 86400 if days is not None else INF)
+    return lo, hi
+
+
+def _from_now(days: float = None) -> Callable:
+    return lambda args: [_span(days=days)]
+
+
+def _args_span(days: float = None) -> Callable:
+    return lambda args: [_span(args.get('time_min', ''), args.get('time_max', ''), days)]
+
+
+def _created(args) -> List[Window]:
+    return [_span(args.get('start_time', ''), args.get('end_time', ''))] if args.get('start_time') else [(-INF, INF)]
+
+
+def _batch(args) -> List[Window]:
+    windows = []
+    for op in args.get('operations') or []:
+        if op.get('action', 'create') != 'create' or not op.get('start_time'):
+            # Updates and deletes move or remove an event whose old time is unknown here
+            return [(-INF, INF)]
+        windows.append(_span(op['start_time'], op.get('end_time', '')))
+    return windows
+
+
+# Read tools and the window their result depends on
+READ_TOOLS: Dict[str, Callable] = {
+    'list_upcoming_events': _from_now(),
+    'search_events': _from_now(),
+    'get_movable_events_from_calendar': _from_now(days=7),
+    'check_free_busy': _args_span(),
+    'find_meeting_slots': _args_span(),
+    'plan_schedule': _args_span(days=7),
+}
+
+# Write tools and the windows they change
+WRITE_TOOLS: Dict[str, Callable] = {
+    'create_calendar_event': _created,
+    'force_create_event': _created,
+    'create_meeting_with_attendees': _created,
+    'batch_manage_events': _batch,
+}
+
+
+# -------------------------------------------------------------- cache
+
+def _normalize(value):
+    # Only whitespace: tools echo names and addresses back as given
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items()}
+    return value
+
+
+class SessionToolCache:
+    """Results per session: session id -> key -> (result, windows, expires)."""
+
+    def __init__(self, max_sessions: int = SESSION_CACHE_SESSIONS, max_entries: int = SESSION_CACHE_ENTRIES,
+                 ttl: float = SESSION_CACHE_TTL):
+        self.max_sessions = max_sessions
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, key: str):
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            item = entries.get(key) if entries is not None else None
+            if item is None:
+                return None
+            if item[2] <= time.monotonic():
+                del entries[key]
+                return None
+            self._sessions.move_to_end(session_id)
+            entries.move_to_end(key)
+            return item[0]
+
+    def set(self, session_id: str, key: str, result, windows: List[Window]):
+        with self._lock:
+            entries = self._sessions.get(session_id)
+            if entries is None:
+                entries = self._sessions[session_id] = OrderedDict()
+            self._sessions.move_to_end(session_id)
+            entries[key] = (result, windows, time.monotonic() + self.ttl)
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def invalidate(self, windows: List[Window]) -> Dict[str, int]:
+        """
+        Drop entries overlapping any of the windows, in every session.
+
+        Returns:
+            Number of dropped entries per tool
+        """
+        dropped = {}
+        with self._lock:
+            for entries in self._sessions.values():
+                for key in [key for key, (_, deps, _) in entries.items()
+                            if any(lo < w_hi and w_lo < hi for lo, hi in deps for w_lo, w_hi in windows)]:
+                    del entries[key]
+                    tool = key.split(':', 1)[0]
+                    dropped[tool] = dropped.get(tool, 0) + 1
+        return dropped
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._sessions.values())
+
+
+cache = SessionToolCache()
+
+
+def _is_error(result) -> bool:
+    return result is None or (isinstance(result, str) and result.lstrip().startswith("❌"))
+
+
+def session_cached(func):
+    """
+    Wrap a tool so reads are memoized per session and writes invalidate them.
+
+    Tools in neither READ_TOOLS nor WRITE_TOOLS are returned unchanged. The
+    wrapper keeps the name, docstring and signature FunctionTool relies on.
+
+    Args:
+        func: Synchronous tool function
+
+    Returns:
+        Wrapped function
+    """
+    tool = func.__name__
+    signature = inspect.signature(func)
+
+    def arguments(args, kwargs) -> dict:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return _normalize(dict(bound.arguments))
+
+    if tool in READ_TOOLS:
+        windows_of = READ_TOOLS[tool]
+
+        @functools.wraps(func)
+        def read(*args, **kwargs):
+            session_id = current_session()
+            if session_id is None or cache.ttl <= 0:
+                return func(*args, **kwargs)
+            call = arguments(args, kwargs)
+            key = f"{tool}:{json.dumps(call, sort_keys=True, default=str)}"
+            result = cache.get(session_id, key)
+            if result is not None:
+                registry.observe_cache(tool, hit=True)
+                return result
+            registry.observe_cache(tool, hit=False)
+            windows = windows_of(call)
+            result = func(*args, **kwargs)
+            if not _is_error(result):
+                cache.set(session_id, key, result, windows)
+            return result
+
+        return read
+
+    if tool in WRITE_TOOLS:
+        windows_of = WRITE_TOOLS[tool]
+
+        @functools.wraps(func)
+        def write(*args, **kwargs):
+            windows = windows_of(arguments(args, kwargs))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # Also after conflicts and errors: dropping an entry is only ever a miss
+                for name, count in cache.invalidate(windows).items():
+                    registry.observe_cache_invalidation(name, count)
+
+        return write
+
+    return func
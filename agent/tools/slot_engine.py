@@ -0,0 +1,161 @@
+"""
+Sweep-line free-slot engine.
+
+Busy intervals from every attendee are parsed once, sorted and merged, and
+the gaps between them are walked in a single pass. Non-working hours are
+treated as extra busy intervals, and several meeting durations can be
+searched at the same time.
+
+Working hours are wall-clock times in the user's timezone (USER_TIMEZONE),
+whatever offset the search window was given in, so '09:00-17:00' stays
+09:00-17:00 local across daylight-saving changes.
+"""
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .calendar_time import DEFAULT_TZ, parse_iso
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+
+
+def parse_busy(busy_times: Iterable[dict], tz=None) -> List[Interval]:
+    """Convert free/busy API entries ({'start', 'end'}) into datetime pairs."""
+    return [(parse_iso(busy['start'], tz), parse_iso(busy['end'], tz)) for busy in busy_times]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_clock(value: str) -> Optional[datetime.time]:
+    """Parse 'HH:MM' into a time, or None for an empty string."""
+    if not value:
+        return None
+    return datetime.time.fromisoformat(value.strip())
+
+
+def off_hours(
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    day_start: Optional[datetime.time],
+    day_end: Optional[datetime.time],
+    weekdays: Optional[Sequence[int]] = None,
+    tz=None
+) -> List[Interval]:
+    """
+    Intervals outside working hours.
+
+    Args:
+        window_start: Start of the search window
+        window_end: End of the search window
+        day_start: Start of the working day (None for midnight)
+        day_end: End of the working day (None for the next midnight)
+        weekdays: Allowed weekdays (Monday=0); None allows every day
+        tz: Timezone the working hours and days are in (default: DEFAULT_TZ)
+
+    Returns:
+        Busy intervals covering the non-working time, in the timezone of window_start
+    """
+    tz = tz or DEFAULT_TZ
+    day = window_start.astimezone(tz).date() - datetime.timedelta(days=1)
+    last = window_end.astimezone(tz).date() + datetime.timedelta(days=1)
+
+    blocked = []
+    while day <= last:
+        midnight = datetime.datetime.combine(day, datetime.time.min, tzinfo=tz)
+        next_midnight = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz)
+        if weekdays is not None and day.weekday() not in weekdays:
+            blocked.append((midnight, next_midnight))
+        else:
+            if day_start is not None:
+                blocked.append((midnight, datetime.datetime.combine(day, day_start, tzinfo=tz)))
+            if day_end is not None:
+                blocked.append((datetime.datetime.combine(day, day_end, tzinfo=tz), next_midnight))
+        day += datetime.timedelta(days=1)
+    out = window_start.tzinfo
+    return [(start.astimezone(out), end.astimezone(out)) for start, end in blocked]
+
+
+def find_free_slots(
+    busy: Iterable[Interval],
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    durations: Sequence[int],
+    granularity_minutes: int = 30,
+    working_hours: Optional[Tuple[Optional[datetime.time], Optional[datetime.time]]] = None,
+    weekdays: Optional[Sequence[int]] = None,
+    max_results: Optional[int] = None,
+    tz=None
+) -> Dict[int, List[Interval]]:
+    """
+    Find free slots for one or more meeting durations.
+
+    Candidate starts lie on a grid of `granularity_minutes` anchored at
+    window_start; inside every gap between merged busy intervals each grid
+    point that still fits the meeting is reported.
+
+    Args:
+        busy: Busy (start, end) pairs from all attendees, in any order
+        window_start: Start of the search window
+        window_end: End of the search window
+        durations: Meeting lengths in minutes
+        granularity_minutes: Spacing of candidate start times
+        working_hours: Optional (day_start, day_end) mask; either may be None
+        weekdays: Allowed weekdays (Monday=0); None allows every day
+        max_results: Maximum number of slots per duration
+        tz: Timezone of the working hours and weekdays (default: DEFAULT_TZ)
+
+    Returns:
+        Mapping of duration (minutes) to a list of (start, end) slots
+    """
+    step = datetime.timedelta(minutes=granularity_minutes)
+    lengths = {minutes: datetime.timedelta(minutes=minutes) for minutes in durations}
+    results = {minutes: [] for minutes in durations}
+
+    busy = list(busy)
+    if working_hours is not None or weekdays is not None:
+        day_start, day_end = working_hours or (None, None)
+        busy.extend(off_hours(window_start, window_end, day_start, day_end, weekdays, tz))
+
+    # Gaps are the complement of the merged busy intervals inside the window
+    gaps = []
+    cursor = window_start
+    for start, end in merge_intervals(busy):
+        if end <= cursor:
+            continue
+        if start >= window_end:
+            break
+        if start > cursor:
+            gaps.append((cursor, start))
+        cursor = max(cursor, end)
+    if cursor < window_end:
+        gaps.append((cursor, window_end))
+
+    pending = set(durations)
+    for gap_start, gap_end in gaps:
+        if not pending:
+            break
+        # First grid point at or after the gap start
+        offset = (gap_start - window_start) % step
+        first = gap_start if not offset else gap_start + (step - offset)
+        first = first.astimezone(window_start.tzinfo)
+
+        for minutes in list(pending):
+            length = lengths[minutes]
+            slot_start = first
+            while slot_start + length <= gap_end:
+                results[minutes].append((slot_start, slot_start + length))
+                if max_results is not None and len(results[minutes]) >= max_results:
+                    pending.discard(minutes)
+                    break
+                slot_start += step
+
+    return results
@@ -0,0 +1,241 @@
+"""
+Deterministic parser for the temporal expressions users type most often.
+
+Resolves relative dates ("tomorrow", "next Tuesday", "in 2 hours"), clock
+times ("3pm", "15:30", "noon"), parts of the day and durations ("for 45
+minutes") into concrete timezone-aware start/end datetimes, so an event can
+be created without asking the model to do date arithmetic. All patterns are
+compiled once at import time.
+"""
+import re
+import datetime
+from typing import Optional
+
+from .calendar_time import DEFAULT_TZ
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december']
+
+_NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'fifteen': 15, 'twenty': 20, 'thirty': 30, 'forty': 40, 'forty-five': 45,
+}
+_NUMBER = r'(\d+(?:\.\d+)?|' + '|'.join(sorted(_NUMBER_WORDS, key=len, reverse=True)) + r')'
+_UNIT = r'(minutes?|mins?|m|hours?|hrs?|h|days?|weeks?)'
+
+# Default clock times for parts of the day
+DAY_PARTS = {
+    'morning': datetime.time(9, 0),
+    'noon': datetime.time(12, 0),
+    'afternoon': datetime.time(14, 0),
+    'evening': datetime.time(18, 0),
+    'tonight': datetime.time(20, 0),
+    'night': datetime.time(20, 0),
+}
+
+_RE_RELATIVE = re.compile(r'\bin\s+' + _NUMBER + r'\s*' + _UNIT + r'\b')
+_RE_DURATION = re.compile(
+    r'(?<!in )(?<![\d.])\b(for\s+)?(?:(half\s+an?\s+hour)|' + _NUMBER + r'\s*-?\s*(minutes?|mins?|hours?|hrs?|h)\b)'
+    r'(\s+and\s+a\s+half)?'
+)
+_RE_RANGE = re.compile(
+    r'\b(?:from\s+|between\s+)?(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|–|to|until|and)\s*'
+    r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b'
+)
+_RE_CLOCK_12 = re.compile(r'\b(\d{1,2})(?::(\d{2}))?\s*(am|pm)\b')
+_RE_CLOCK_24 = re.compile(r'\b(?:at\s+)?([01]?\d|2[0-3]):([0-5]\d)\b')
+_RE_AT_HOUR = re.compile(r'\bat\s+(\d{1,2})(?!\s*(?::|\d|%|am|pm|st|nd|rd|th))\b')
+_RE_NOON = re.compile(r'\b(noon|midday|midnight)\b')
+_RE_DAY_PART = re.compile(r'\b(?:this\s+|in\s+the\s+|tomorrow\s+)?(morning|afternoon|evening|tonight|night)\b')
+_RE_TODAY = re.compile(r'\b(today|tonight|this\s+(?:morning|afternoon|evening))\b')
+_RE_TOMORROW = re.compile(r'\b(day\s+after\s+tomorrow|tomorrow|tmrw|tmr)\b')
+_RE_WEEKDAY = re.compile(r'\b(next\s+|this\s+|on\s+)?(' + '|'.join(WEEKDAYS) + r')\b')
+_RE_NEXT_WEEK = re.compile(r'\bnext\s+week\b')
+_RE_ISO_DATE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b')
+# Full month names and their usual abbreviations only, so "marketing" or "decks" is no month
+_MONTH = (
+    r'\b(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b\.?'
+)
+_RE_MONTH_DAY = re.compile(_MONTH + r'\s+(\d{1,2})(?:st|nd|rd|th)?\b')
+_RE_DAY_MONTH = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?' + _MONTH)
+
+
+def _number(value: str) -> float:
+    return _NUMBER_WORDS[value] if value in _NUMBER_WORDS else float(value)
+
+
+def _minutes(amount: float, unit: str) -> float:
+    if unit.startswith('h'):
+        return amount * 60
+    if unit.startswith('d'):
+        return amount * 24 * 60
+    if unit.startswith('w'):
+        return amount * 7 * 24 * 60
+    return amount
+
+
+def _clock(hour: int, minute: int, ampm: Optional[str]) -> Optional[datetime.time]:
+    if ampm == 'pm' and hour != 12:
+        hour += 12
+    elif ampm == 'am' and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return datetime.time(hour, minute)
+
+
+def _parse_date(text: str, today: datetime.date) -> Optional[datetime.date]:
+    match = _RE_ISO_DATE.search(text)
+    if match:
+        try:
+            return datetime.date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        except ValueError:
+            return None
+
+    for pattern, month_group, day_group in ((_RE_MONTH_DAY, 1, 2), (_RE_DAY_MONTH, 2, 1)):
+        match = pattern.search(text)
+        if match:
+            month = [m[:3] for m in MONTHS].index(match.group(month_group)[:3]) + 1
+            try:
+                day = datetime.date(today.year, month, int(match.group(day_group)))
+            except ValueError:
+                return None
+            # A date that already passed this year means next year
+            return day if day >= today else day.replace(year=today.year + 1)
+
+    match = _RE_TOMORROW.search(text)
+    if match:
+        return today + datetime.timedelta(days=2 if match.group(1).startswith('day') else 1)
+
+    match = _RE_WEEKDAY.search(text)
+    if match:
+        ahead = (WEEKDAYS.index(match.group(2)) - today.weekday()) % 7
+        if ahead == 0 and (match.group(1) or '').strip() == 'next':
+            ahead = 7
+        return today + datetime.timedelta(days=ahead)
+
+    if _RE_NEXT_WEEK.search(text):
+        # Monday of next week
+        return today + datetime.timedelta(days=7 - today.weekday())
+
+    if _RE_TODAY.search(text):
+        return today
+    return None
+
+
+def _parse_time(text: str):
+    """Return (start_time, end_time, explicit) from clock expressions."""
+    match = _RE_RANGE.search(text)
+    if match:
+        end_ampm = match.group(6)
+        start_ampm = match.group(3)
+        start_hour, end_hour = int(match.group(1)), int(match.group(4))
+        if start_ampm is None:
+            # "2-4pm": the start shares the end's am/pm unless that would put it after the end
+            start_ampm = end_ampm
+            if end_ampm == 'pm' and start_hour > end_hour and start_hour != 12:
+                start_ampm = 'am'
+        start = _clock(start_hour, int(match.group(2) or 0), start_ampm)
+        end = _clock(end_hour, int(match.group(5) or 0), end_ampm)
+        if start and end:
+            return start, end, True
+
+    match = _RE_CLOCK_12.search(text)
+    if match:
+        clock = _clock(int(match.group(1)), int(match.group(2) or 0), match.group(3))
+        if clock:
+            return clock, None, True
+
+    match = _RE_CLOCK_24.search(text)
+    if match:
+        return datetime.time(int(match.group(1)), int(match.group(2))), None, True
+
+    match = _RE_NOON.search(text)
+    if match:
+        return (datetime.time(0, 0) if match.group(1) == 'midnight' else datetime.time(12, 0)), None, True
+
+    match = _RE_AT_HOUR.search(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        hour = int(match.group(1))
+        # "at 3" during the working day almost always means 3pm
+        if hour < 8:
+            hour += 12
+        return datetime.time(hour, 0), None, True
+
+    match = _RE_DAY_PART.search(text)
+    if match:
+        return DAY_PARTS[match.group(1)], None, False
+    return None, None, False
+
+
+def _parse_duration(text: str) -> Optional[int]:
+    matches = list(_RE_DURATION.finditer(text))
+    if not matches:
+        return None
+    # "for 45 minutes" wins over a bare "2 hour" elsewhere in the sentence
+    match = next((m for m in matches if m.group(1)), matches[0])
+    if match.group(2):
+        return 30
+    minutes = _minutes(_number(match.group(3)), match.group(4))
+    if match.group(5) and match.group(4).startswith('h'):
+        minutes += 30
+    return int(round(minutes))
+
+
+def parse_temporal(text: str, now: datetime.datetime = None, tz=None) -> dict:
+    """
+    Resolve the date, time and duration mentioned in free text.
+
+    Args:
+        text: User input, e.g. "dentist next Tuesday at 4pm for 45 minutes"
+        now: Reference time (default: current time in tz)
+        tz: Timezone for the result (default: USER_TIMEZONE / local)
+
+    Returns:
+        Dict with 'start' and 'end' (aware datetimes or None), 'date'
+        (date or None), 'duration_minutes' (int or None) and
+        'explicit_time' (bool)
+    """
+    tz = tz or DEFAULT_TZ
+    now = (now or datetime.datetime.now(tz)).astimezone(tz)
+    lowered = text.lower()
+
+    result = {'start': None, 'end': None, 'duration_minutes': _parse_duration(lowered), 'explicit_time': False}
+
+    day = None
+    relative = _RE_RELATIVE.search(lowered)
+    if relative:
+        offset = datetime.timedelta(minutes=_minutes(_number(relative.group(1)), relative.group(2)))
+        if relative.group(2).startswith(('d', 'w')):
+            # "in 3 days" only fixes the date; a clock time may follow
+            day = (now + offset).date()
+        else:
+            result['start'] = (now + offset).replace(second=0, microsecond=0)
+            result['explicit_time'] = True
+
+    if result['start'] is None:
+        day = day or _parse_date(lowered, now.date())
+        start_clock, end_clock, explicit = _parse_time(lowered)
+        if start_clock is not None:
+            if day is None:
+                # A bare time means its next occurrence
+                day = now.date()
+                if datetime.datetime.combine(day, start_clock, tzinfo=tz) <= now:
+                    day += datetime.timedelta(days=1)
+            result['start'] = datetime.datetime.combine(day, start_clock, tzinfo=tz)
+            result['explicit_time'] = explicit
+            if end_clock is not None:
+                end = datetime.datetime.combine(day, end_clock, tzinfo=tz)
+                if end <= result['start']:
+                    end += datetime.timedelta(days=1)
+                result['end'] = end
+                if result['duration_minutes'] is None:
+                    result['duration_minutes'] = int((end - result['start']).total_seconds() // 60)
+    result['date'] = day if result['start'] is None else result['start'].date()
+
+    if result['start'] is not None and result['end'] is None and result['duration_minutes']:
+        result['end'] = result['start'] + datetime.timedelta(minutes=result['duration_minutes'])
+    return result
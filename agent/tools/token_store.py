@@ -0,0 +1,280 @@
+"""
+Server-side OAuth token store and per-user Calendar services for the web app.
+
+The signed session cookie only carries a user id; the tokens live in SQLite
+(TOKEN_DB_PATH), so a refreshed access token is written back once and seen by
+every later request. The database holds refresh tokens in plain text: by
+default it lives in the user's data directory, outside the checkout, and is
+created readable by its owner only. Built Calendar services are kept per user in a bounded
+LRU (USER_SERVICE_CACHE_SIZE users). A service is checked out for one request
+at a time because httplib2 connections are not thread-safe, and up to
+USER_SERVICE_POOL_SIZE idle ones are kept for each user, together with the
+user's EventStores for the JSON events API.
+
+Access tokens are refreshed shortly before they expire, at most once per user
+at a time: concurrent requests for the same user wait for the refresh in
+flight instead of each sending their own.
+"""
+import os
+import json
+import time
+import logging
+import sqlite3
+import datetime
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional
+
+from .calendar_service import REFRESH_MARGIN_SECONDS, SCOPES, build_calendar_service, needs_refresh
+from .event_store import EventStore
+
+logger = logging.getLogger(__name__)
+
+TOKEN_DB_PATH = os.getenv("TOKEN_DB_PATH") or os.path.join(
+    os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), "calendar-agent", "tokens.db"
+)
+USER_SERVICE_CACHE_SIZE = int(os.getenv("USER_SERVICE_CACHE_SIZE", "256"))
+USER_SERVICE_POOL_SIZE = int(os.getenv("USER_SERVICE_POOL_SIZE", "4"))
+
+# Token endpoint used for refreshes, e.g. "http://127.0.0.1:8765/token" for the
+# offline benchmark backend. Empty means Google's (stored token_uri is ignored).
+OAUTH_TOKEN_URI = os.getenv("OAUTH_TOKEN_URI", "")
+
+
+def _create_private(path: str):
+    """Create the database file (and its directory) readable by the owner only."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        # An existing file may have been created with the umask's permissions
+        os.fchmod(fd, 0o600)
+    finally:
+        os.close(fd)
+
+
+class TokenStore:
+    """OAuth credentials per user in a SQLite database."""
+
+    def __init__(self, path: str = TOKEN_DB_PATH):
+        """
+        Args:
+            path: SQLite database file, created if missing (mode 0600)
+        """
+        self.path = path
+        _create_private(path)
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tokens ("
+                "user_id TEXT PRIMARY KEY, credentials TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must stay on the thread that opened them
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, user_id: str) -> Optional[dict]:
+        """Stored credentials of a user (authorized-user JSON), or None."""
+        row = self._connect().execute(
+            "SELECT credentials FROM tokens WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, user_id: str, creds):
+        """Insert or replace the credentials of a user."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tokens (user_id, credentials, updated) VALUES (?, ?, ?)",
+                (user_id, creds.to_json(), time.time())
+            )
+
+    def delete(self, user_id: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM tokens WHERE user_id = ?", (user_id,))
+
+
+class _UserEntry:
+    """Credentials, refresh lock, idle services and event stores of one user."""
+
+    __slots__ = ('creds', 'token', 'lock', 'idle', 'stores')
+
+    def __init__(self, creds):
+        self.creds = creds
+        self.token = creds.token    # last token written to the store
+        self.lock = threading.Lock()
+        self.idle = []
+        self.stores = {}
+
+
+class UserServiceCache:
+    """Bounded LRU of per-user credentials and built Calendar services."""
+
+    def __init__(
+        self,
+        store: TokenStore,
+        maxsize: int = USER_SERVICE_CACHE_SIZE,
+        pool_size: int = USER_SERVICE_POOL_SIZE,
+        refresh_margin_seconds: int = REFRESH_MARGIN_SECONDS,
+        scopes=None
+    ):
+        """
+        Args:
+            store: Where credentials are loaded from and refreshed tokens saved to
+            maxsize: Users kept in memory; the least recently used are dropped
+            pool_size: Idle services kept per user
+            refresh_margin_seconds: Refresh this long before the token expires
+            scopes: OAuth scopes of the stored credentials
+        """
+        self.store = store
+        self.maxsize = maxsize
+        self.pool_size = pool_size
+        self.refresh_margin = datetime.timedelta(seconds=refresh_margin_seconds)
+        self.scopes = scopes or SCOPES
+        self.builds = 0
+        self.refreshes = 0
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, user_id: str) -> Optional[_UserEntry]:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None:
+                self._users.move_to_end(user_id)
+                return entry
+
+        info = self.store.get(user_id)
+        if info is None:
+            return None
+        from google.oauth2.credentials import Credentials
+
+        creds = Credentials.from_authorized_user_info(info, self.scopes)
+        if OAUTH_TOKEN_URI:
+            expiry = creds.expiry
+            creds = creds.with_token_uri(OAUTH_TOKEN_URI)
+            creds.expiry = expiry    # not carried over by the copy
+        with self._lock:
+            # Another request may have loaded the same user meanwhile
+            entry = self._users.setdefault(user_id, _UserEntry(creds))
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+        return entry
+
+    def _save_if_changed(self, user_id: str, entry: _UserEntry):
+        # The HTTP layer refreshes on its own after a 401; persist that too
+        if entry.creds.token != entry.token:
+            self.store.save(user_id, entry.creds)
+            entry.token = entry.creds.token
+
+    def _valid_entry(self, user_id: str) -> Optional[_UserEntry]:
+        entry = self._entry(user_id)
+        if entry is None or not needs_refresh(entry.creds, self.refresh_margin):
+            return entry
+
+        with entry.lock:
+            # Single flight: whoever waited here finds the token already refreshed
+            if needs_refresh(entry.creds, self.refresh_margin):
+                from google.auth.exceptions import RefreshError
+                from google.auth.transport.requests import Request
+
+                try:
+                    entry.creds.refresh(Request())
+                except RefreshError as e:
+                    logger.warning("Token refresh for %s failed, signing out: %s", user_id, e)
+                    self.forget(user_id, delete=True)
+                    return None
+                self.refreshes += 1
+                self._save_if_changed(user_id, entry)
+        return entry
+
+    def get_credentials(self, user_id: str):
+        """
+        Valid credentials of a user, refreshed if they are about to expire.
+
+        Returns:
+            Credentials, or None if the user has no stored tokens or the
+            refresh token was revoked
+        """
+        entry = self._valid_entry(user_id)
+        return entry.creds if entry else None
+
+    @contextmanager
+    def _checkout(self, user_id: str, entry: _UserEntry):
+        with self._lock:
+            service = entry.idle.pop() if entry.idle else None
+        if service is None:
+            service = build_calendar_service(entry.creds)
+            self.builds += 1
+        try:
+            yield service
+        finally:
+            self._save_if_changed(user_id, entry)
+            with self._lock:
+                if len(entry.idle) < self.pool_size:
+                    entry.idle.append(service)
+
+    @contextmanager
+    def service(self, user_id: str):
+        """
+        Check out a Calendar service for the duration of one request.
+
+        Yields:
+            Service bound to the user's credentials, or None if the user has
+            to authorize again
+        """
+        entry = self._valid_entry(user_id)
+        if entry is None:
+            yield None
+            return
+        with self._checkout(user_id, entry) as service:
+            yield service
+
+    def synced_store(self, user_id: str, calendar_id: str = 'primary') -> Optional[EventStore]:
+        """
+        The user's local copy of a calendar, brought up to date.
+
+        Delta syncs are rate-limited by the store, so frequent polling mostly
+        answers from memory.
+
+        Returns:
+            EventStore, or None if the user has to authorize again
+        """
+        entry = self._valid_entry(user_id)
+        if entry is None:
+            return None
+        with self._lock:
+            store = entry.stores.get(calendar_id)
+            if store is None:
+                # Always synced with this user's service, never the agent's
+                store = entry.stores[calendar_id] = EventStore(calendar_id)
+        with self._checkout(user_id, entry) as service:
+            store.sync(service=service)
+        return store
+
+    def cached_store(self, user_id: str, calendar_id: str = 'primary') -> Optional[EventStore]:
+        """The user's event store if one is in memory, without syncing it (for write-through)."""
+        with self._lock:
+            entry = self._users.get(user_id)
+            return entry.stores.get(calendar_id) if entry else None
+
+    def add_user(self, user_id: str, creds):
+        """Store freshly obtained credentials and drop anything cached for the user."""
+        self.store.save(user_id, creds)
+        self.forget(user_id)
+
+    def forget(self, user_id: str, delete: bool = False):
+        """Drop the user's cached services; with delete=True also their stored tokens."""
+        with self._lock:
+            self._users.pop(user_id, None)
+        if delete:
+            self.store.delete(user_id)
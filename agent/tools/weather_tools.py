@@ -1,35 +1,173 @@
-import requests
-import schedule
-import datetime 
+import os
+import json
 import time
 import threading
-API_KEY = ""
+from typing import Optional
 
+from google.adk.tools.tool_context import ToolContext
 
+from .circuit_breaker import CircuitBreaker
+from .ttl_cache import TTLCache
+
+API_KEY = os.getenv("OPENWEATHER_API_KEY") or os.getenv("WEATHER_API_KEY", "")
+
+# Overridable so the offline benchmark backend can stand in for OpenWeather
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org").rstrip("/")
+GEOCODE_URL = f"{OPENWEATHER_BASE_URL}/geo/1.0/direct"
+CURRENT_WEATHER_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/weather"
+FORECAST_URL = f"{OPENWEATHER_BASE_URL}/data/2.5/forecast"
+
+# Current conditions change slowly and the forecast is refreshed every 3 hours
+CURRENT_WEATHER_TTL = float(os.getenv("WEATHER_CURRENT_TTL", "600"))
+FORECAST_TTL = float(os.getenv("WEATHER_FORECAST_TTL", "1800"))
+GEOCODE_TTL = float(os.getenv("WEATHER_GEOCODE_TTL", str(7 * 24 * 3600)))
+
+_weather_cache = TTLCache(maxsize=int(os.getenv("WEATHER_CACHE_SIZE", "256")))
+
+# IP geolocation: ipapi.co only allows 1,000 requests/day
+LOCATION_PROVIDERS = [
+    ("ipapi.co", "https://ipapi.co/json/"),
+    ("ipwhois.app", "https://ipwhois.app/json/"),
+]
+DEFAULT_LOCATION = {"city": "Toronto", "country": "CA"}
+LOCATION_TTL = float(os.getenv("LOCATION_CACHE_TTL", str(12 * 3600)))
+LOCATION_CACHE_FILE = os.getenv("LOCATION_CACHE_FILE", "")
+LOCATION_PROVIDER_TIMEOUT = float(os.getenv("LOCATION_PROVIDER_TIMEOUT", "3"))
+LOCATION_RATE_LIMIT_COOLDOWN = float(os.getenv("LOCATION_RATE_LIMIT_COOLDOWN", "3600"))
+LOCATION_FAILURE_COOLDOWN = float(os.getenv("LOCATION_FAILURE_COOLDOWN", "60"))
+
+_location_cache = TTLCache(maxsize=1024, ttl=LOCATION_TTL)
+_location_file_lock = threading.Lock()
+_provider_breaker = CircuitBreaker(cooldown=LOCATION_RATE_LIMIT_COOLDOWN)
+
+
+def _http_session(name: str = "default", **kwargs):
+    # requests is only imported once a weather or location call is made
+    from .http_session import get_http_session
+    return get_http_session(name, **kwargs)
+
+
+def _city_key(city: str) -> str:
+    """Normalize a city name so 'ottawa ' and 'Ottawa' share a cache entry."""
+    return " ".join(city.split()).casefold()
+
+
+def _location_params(city: str) -> dict:
+    """
+    Resolve a city to coordinates once and reuse them for later lookups.
+    Falls back to a plain name query if the geocoding call fails.
+    """
+    key = ("geo", _city_key(city))
+    coords = _weather_cache.get(key)
+    if coords is None:
+        try:
+            response = _http_session().get(GEOCODE_URL, params={"q": city, "limit": 1, "appid": API_KEY})
+            results = response.json() if response.status_code == 200 else []
+        except Exception as e:
+            print(f"⚠️ Geocoding failed for {city}: {e}")
+            results = []
+        if not results:
+            return {"q": city}
+        coords = {"lat": results[0]["lat"], "lon": results[0]["lon"]}
+        _weather_cache.set(key, coords, ttl=GEOCODE_TTL)
+    return dict(coords)
+
+
+
+def _client_key(tool_context) -> str:
+    """Cache key for the calling user; 'local' when no session is available."""
+    return getattr(tool_context, "user_id", None) or "local"
+
+
+def _load_location_file() -> dict:
+    if not LOCATION_CACHE_FILE or not os.path.exists(LOCATION_CACHE_FILE):
+        return {}
+    try:
+        with open(LOCATION_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {LOCATION_CACHE_FILE}: {e}")
+        return {}
+
+
+def _cached_location(client: str):
+    location = _location_cache.get(client)
+    if location is not None:
+        return location
+
+    # Fall back to the on-disk copy so restarts don't spend provider quota
+    entry = _load_location_file().get(client)
+    if entry and entry.get("expires", 0) > time.time():
+        _location_cache.set(client, entry["location"], ttl=entry["expires"] - time.time())
+        return entry["location"]
+    return None
+
+
+def _remember_location(client: str, location: dict):
+    _location_cache.set(client, location)
+    if not LOCATION_CACHE_FILE:
+        return
+    with _location_file_lock:
+        entries = _load_location_file()
+        entries[client] = {"location": location, "expires": time.time() + LOCATION_TTL}
+        try:
+            with open(LOCATION_CACHE_FILE, "w") as f:
+                json.dump(entries, f)
+        except OSError as e:
+            print(f"⚠️ Could not write {LOCATION_CACHE_FILE}: {e}")
+
+
+def _detect_location():
+    """Ask each IP geolocation provider in turn, skipping the ones cooling down."""
+    for name, url in LOCATION_PROVIDERS:
+        if _provider_breaker.is_open(name):
+            print(f"⏭️ Skipping {name} (rate limited recently)")
+            continue
+        try:
+            # Rate limits are handled by the circuit breaker, so no retries here
+            session = _http_session("location", max_retries=0)
+            response = session.get(url, timeout=LOCATION_PROVIDER_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ {name} failed: {e}")
+            _provider_breaker.trip(name, cooldown=LOCATION_FAILURE_COOLDOWN)
+            continue
 
-def get_location():
-    "Get location from  ipapi.co (1,000 request/day)"
-    try: 
-        response = requests.get("https://ipapi.co/json/")
         if response.status_code == 200:
-            print("✅ Location detect Automatically!")
             result = response.json()
-            dic_location = {"city": result.get("city"), "country": result.get("country")}
-            return dic_location
-        
+            if result.get("city"):
+                print(f"✅ Location detected ({name})")
+                return {"city": result.get("city"), "country": result.get("country")}
+            print(f"⚠️ {name} returned no city")
         elif response.status_code == 429:
-            print("⚠️ Rate limit reached, using default location(The staus_code is {response.status_code}).")
-            response_ipwhois = requests.get("https://ipwhois.app/json/", timeout=3)
-            if response_ipwhois.status_code == 200:
-                result = response_ipwhois.json()
-                print("✅ Location detected (ipwhois.app backup)")
-                dic_location = {"city": result.get("city"), "country": result.get("country")}
-            else:
-                # Final fallback: Use default
-                print("⚠️ All APIs failed, using default location")            
-                dic_location =  {"city": "Toronto", "country": "CA"}
-        
-        return dic_location  
+            retry_after = response.headers.get("Retry-After", "")
+            cooldown = float(retry_after) if retry_after.isdigit() else None
+            print(f"⚠️ Rate limit reached on {name} (status_code {response.status_code}).")
+            _provider_breaker.trip(name, cooldown=cooldown)
+        else:
+            print(f"⚠️ {name} returned status_code {response.status_code}")
+            _provider_breaker.trip(name, cooldown=LOCATION_FAILURE_COOLDOWN)
+    return None
+
+
+def get_location(tool_context: Optional[ToolContext] = None):
+    """Get the user's location from IP geolocation (ipapi.co, then ipwhois.app).
+    The result is cached per user, so providers are only asked once in a while.
+    """
+    try:
+        client = _client_key(tool_context)
+        location = _cached_location(client)
+        if location is not None:
+            print("✅ Location detected (cached)")
+            return location
+
+        location = _detect_location()
+        if location is None:
+            # Final fallback: Use default, but don't cache it
+            print("⚠️ All APIs failed, using default location")
+            return dict(DEFAULT_LOCATION)
+
+        _remember_location(client, location)
+        return location
 
     except Exception as e:
         print(f"Error is *{e}*")
@@ -44,30 +182,40 @@ def get_current_weather(city: str)-> dict:
     Returns:
         dict: Weather data including temperature, conditions, humidity, wind speed or None if request fails
     """
-    BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
-
     if not API_KEY:
         print("❌ OPENWEATHER_API_KEY not found.")
         return None
     
+    key = ("current", _city_key(city))
+    cached = _weather_cache.get(key)
+    if cached is not None:
+        print(f"✅ Weather in {city} (cached)")
+        return cached
+
     params = {
-        "q": city,
+        **_location_params(city),
         "appid": API_KEY,
         "units": "metric",
     }
 
-    response = requests.get(BASE_URL, params=params)
+    try:
+        response = _http_session().get(CURRENT_WEATHER_URL, params=params)
+    except Exception as e:
+        print(f"❌ Weather request failed: {e}")
+        return None
     
     if response.status_code == 200:
-        print(f"✅ Weather in {city}:{response.json()}")
-        return response.json()
+        weather = response.json()
+        print(f"✅ Weather in {city}:{weather}")
+        _weather_cache.set(key, weather, ttl=CURRENT_WEATHER_TTL)
+        return weather
 
     else:
         print(f"Error: {response.status_code}")
 
 
     
-def get_forecast_summary(city: str = None, days: int = 5):
+def get_forecast_summary(city: str = None, days: int = 5, tool_context: Optional[ToolContext] = None):
     """
     Get weather forecast for 1-5 days for a specific city.
     Auto-detects location if city is not provided.
@@ -86,7 +234,7 @@ def get_forecast_summary(city: str = None, days: int = 5):
         list: Daily weather summaries
     """
     if city is None:
-        location = get_location()
+        location = get_location(tool_context)
         if location:
             city = location.get('city', 'Toronto')
         else:
@@ -96,8 +244,6 @@ def get_forecast_summary(city: str = None, days: int = 5):
     if days is None:
         days = 5
 
-    FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"  
-
     if not API_KEY:
         print("❌ OPENWEATHER_API_KEY not found.")
         return None
@@ -107,54 +253,64 @@ def get_forecast_summary(city: str = None, days: int = 5):
         print(f"⚠️ Days must be between 1-5. Using default: 5")
         days = 5
 
-    params = {
-        "q": city,
-        "appid": API_KEY,
-        "units": "metric",
-    }
+    # The raw 5-day forecast serves every horizon, so it is cached per city
+    key = ("forecast", _city_key(city))
+    forecast_data = _weather_cache.get(key)
+
+    if forecast_data is None:
+        params = {
+            **_location_params(city),
+            "appid": API_KEY,
+            "units": "metric",
+        }
+
+        try:
+            response = _http_session().get(FORECAST_URL, params=params)
+        except Exception as e:
+            print(f"❌ Forecast request failed: {e}")
+            return None
+        if response.status_code != 200:
+            print(f"Error: {response.status_code}")
+            return None
 
-    response = requests.get(FORECAST_URL, params=params)
-    
-    if response.status_code == 200:
-        print(f"✅ {days}-day forecast for {city} retrieved")
         forecast_data = response.json()
+        _weather_cache.set(key, forecast_data, ttl=FORECAST_TTL)
+
+    print(f"✅ {days}-day forecast for {city} retrieved")
+    
+    daily_summaries = {}
+    
+    # Process the 3-hour interval forecasts
+    for item in forecast_data['list']:
+        date = item['dt_txt'].split(' ')[0]
         
-        daily_summaries = {}
-        
-        # Process the 3-hour interval forecasts
-        for item in forecast_data['list']:
-            date = item['dt_txt'].split(' ')[0]
-            
-            if date not in daily_summaries:
-                daily_summaries[date] = {
-                    'date': date,
-                    'temps': [],
-                    'conditions': [],
-                    'humidity': [],
-                    'wind_speed': []
-                }
-            
-            daily_summaries[date]['temps'].append(item['main']['temp'])
-            daily_summaries[date]['conditions'].append(item['weather'][0]['description'])
-            daily_summaries[date]['humidity'].append(item['main']['humidity'])
-            daily_summaries[date]['wind_speed'].append(item['wind']['speed'])
-        
-        # Calculate daily averages
-        result = []
-        for date, data in list(daily_summaries.items())[:days]:
-            result.append({
+        if date not in daily_summaries:
+            daily_summaries[date] = {
                 'date': date,
-                'avg_temp': round(sum(data['temps']) / len(data['temps'])),      
-                'min_temp': round(min(data['temps'])),                            
-                'max_temp': round(max(data['temps'])),                            
-                'condition': max(set(data['conditions']), key=data['conditions'].count),
-                'avg_humidity': round(sum(data['humidity']) / len(data['humidity'])),
-                'avg_wind_speed': round(sum(data['wind_speed']) / len(data['wind_speed']), 1)  
-            })
+                'temps': [],
+                'conditions': [],
+                'humidity': [],
+                'wind_speed': []
+            }
         
-        return result
-    else:
-        print(f"Error: {response.status_code}")
-        return None
+        daily_summaries[date]['temps'].append(item['main']['temp'])
+        daily_summaries[date]['conditions'].append(item['weather'][0]['description'])
+        daily_summaries[date]['humidity'].append(item['main']['humidity'])
+        daily_summaries[date]['wind_speed'].append(item['wind']['speed'])
+    
+    # Calculate daily averages
+    result = []
+    for date, data in list(daily_summaries.items())[:days]:
+        result.append({
+            'date': date,
+            'avg_temp': round(sum(data['temps']) / len(data['temps'])),      
+            'min_temp': round(min(data['temps'])),                            
+            'max_temp': round(max(data['temps'])),                            
+            'condition': max(set(data['conditions']), key=data['conditions'].count),
+            'avg_humidity': round(sum(data['humidity']) / len(data['humidity'])),
+            'avg_wind_speed': round(sum(data['wind_speed']) / len(data['wind_speed']), 1)  
+        })
+    
+    return result
     
    
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Show that a hanging tool call no longer blocks other sessions.
+
+One coroutine calls a tool that blocks for --hang seconds while other
+"sessions" on the same event loop run short tool calls. With the plain
+synchronous function everyone waits; with make_async the other sessions
+keep finishing their calls.
+
+Usage:
+    python -m benchmarks.bench_async_tools --hang 2 --sessions 20
+"""
+import argparse
+import asyncio
+import time
+
+from google.adk.tools import FunctionTool
+
+from agent.agent import tool_functions
+from agent.tools.async_tools import make_async
+
+
+def hanging_tool(seconds: float) -> str:
+    """Stands in for a Calendar/OpenWeather call that hangs."""
+    time.sleep(seconds)
+    return "done"
+
+
+def quick_tool(value: int) -> int:
+    """Stands in for a fast tool call from another session."""
+    time.sleep(0.01)
+    return value
+
+
+async def run(hang, quick, hang_seconds, sessions):
+    progress = []
+    t0 = time.perf_counter()
+
+    async def session(i):
+        await asyncio.sleep(0.05)
+        result = quick(i)
+        if asyncio.iscoroutine(result):
+            result = await result
+        progress.append(time.perf_counter() - t0)
+
+    async def stuck():
+        result = hang(hang_seconds)
+        if asyncio.iscoroutine(result):
+            await result
+
+    await asyncio.gather(stuck(), *(session(i) for i in range(sessions)))
+    return time.perf_counter() - t0, max(progress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hang', type=float, default=2.0)
+    parser.add_argument('--sessions', type=int, default=20)
+    args = parser.parse_args()
+
+    # The async wrappers must expose exactly the same declarations to the model
+    for func in tool_functions:
+        sync_decl = FunctionTool(func)._get_declaration()
+        async_decl = FunctionTool(make_async(func))._get_declaration()
+        assert sync_decl == async_decl, f"declaration changed for {func.__name__}"
+
+    total, worst = asyncio.run(run(hanging_tool, quick_tool, args.hang, args.sessions))
+    print(f"sync tools:  total {total:.2f}s, last other session done at {worst:.2f}s")
+
+    total, worst = asyncio.run(run(make_async(hanging_tool), make_async(quick_tool), args.hang, args.sessions))
+    print(f"async tools: total {total:.2f}s, last other session done at {worst:.2f}s")
+
+    assert worst < args.hang / 2, "other sessions were blocked by the hanging tool"
+    print("✅ concurrent sessions made progress while a tool call was hanging")
+
+
+if __name__ == '__main__':
+    main()
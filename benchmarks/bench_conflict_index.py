@@ -0,0 +1,121 @@
+"""
+Benchmark the interval-index conflict check against the old linear scan.
+
+The old `conflict_calendar` compared raw ISO strings of the next 100 events.
+Here both approaches run over the same synthetic calendar (mixed UTC offsets
+and all-day events); results are checked against a brute-force datetime scan.
+
+Usage:
+    python -m benchmarks.bench_conflict_index --events 20000 --queries 2000
+"""
+import argparse
+import datetime
+import random
+import time
+
+from agent.tools.calendar_time import event_bounds
+from agent.tools.interval_index import IntervalIndex
+
+OFFSETS = [datetime.timezone.utc, datetime.timezone(datetime.timedelta(hours=1)),
+           datetime.timezone(datetime.timedelta(hours=-5)), datetime.timezone(datetime.timedelta(hours=9))]
+
+
+def make_events(count, seed=7):
+    rng = random.Random(seed)
+    base = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+    events = []
+    for i in range(count):
+        start = base + datetime.timedelta(minutes=15 * rng.randrange(0, 4 * 24 * 365))
+        if rng.random() < 0.05:
+            day = start.date()
+            events.append({
+                'id': f'e{i}', 'summary': f'All day {i}',
+                'start': {'date': day.isoformat()},
+                'end': {'date': (day + datetime.timedelta(days=1)).isoformat()},
+            })
+            continue
+        end = start + datetime.timedelta(minutes=rng.choice([15, 30, 60, 90, 120]))
+        tz = rng.choice(OFFSETS)
+        events.append({
+            'id': f'e{i}', 'summary': f'Event {i}',
+            'start': {'dateTime': start.astimezone(tz).isoformat()},
+            'end': {'dateTime': end.astimezone(tz).isoformat()},
+        })
+    return events
+
+
+def make_queries(count, seed=11):
+    rng = random.Random(seed)
+    base = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone(datetime.timedelta(hours=1)))
+    queries = []
+    for _ in range(count):
+        start = base + datetime.timedelta(minutes=30 * rng.randrange(0, 2 * 24 * 365))
+        end = start + datetime.timedelta(minutes=rng.choice([30, 60]))
+        queries.append({'start': {'dateTime': start.isoformat()}, 'end': {'dateTime': end.isoformat()}})
+    return queries
+
+
+def legacy_conflicts(events, event_new):
+    """The pre-index algorithm: lexical comparison over every event."""
+    overlap = []
+    new_start = event_new['start']['dateTime']
+    new_end = event_new['end']['dateTime']
+    for ev in events:
+        ev_start = ev['start'].get('dateTime', ev['start'].get('date'))
+        ev_end = ev['end'].get('dateTime', ev['end'].get('date'))
+        if new_start < ev_end and new_end > ev_start:
+            overlap.append(ev['id'])
+    return overlap
+
+
+def brute_force(bounds, query):
+    q_start, q_end = event_bounds(query, datetime.timezone.utc)
+    return {ev_id for ev_id, (start, end) in bounds.items() if start < q_end and end > q_start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--verify', type=int, default=200, help='queries checked against brute force')
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    queries = make_queries(args.queries)
+    bounds = {ev['id']: event_bounds(ev, datetime.timezone.utc) for ev in events}
+
+    t0 = time.perf_counter()
+    index = IntervalIndex((start, end, ev_id) for ev_id, (start, end) in bounds.items())
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    legacy = [legacy_conflicts(events, q) for q in queries]
+    legacy_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    single = [index.overlapping(*event_bounds(q, datetime.timezone.utc)) for q in queries]
+    index_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    batched = index.overlapping_many(event_bounds(q, datetime.timezone.utc) for q in queries)
+    batch_s = time.perf_counter() - t0
+
+    legacy_wrong = index_wrong = 0
+    for q, old, new in list(zip(queries, legacy, single))[:args.verify]:
+        expected = brute_force(bounds, q)
+        legacy_wrong += set(old) != expected
+        index_wrong += set(new) != expected
+    assert single == batched, "batched results differ from single queries"
+
+    checked = min(args.verify, len(queries))
+    print(f"events={args.events} queries={args.queries}")
+    print(f"index build:        {build_s * 1000:9.2f} ms")
+    print(f"legacy linear scan: {legacy_s * 1000:9.2f} ms ({legacy_s / len(queries) * 1e6:8.1f} us/query)")
+    print(f"interval index:     {index_s * 1000:9.2f} ms ({index_s / len(queries) * 1e6:8.1f} us/query)")
+    print(f"batched index:      {batch_s * 1000:9.2f} ms")
+    print(f"speedup:            {legacy_s / index_s:9.1f}x")
+    print(f"wrong answers (of {checked} verified): legacy={legacy_wrong} index={index_wrong}")
+
+
+if __name__ == '__main__':
+    main()
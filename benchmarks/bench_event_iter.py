@@ -0,0 +1,78 @@
+"""
+Payload and time saved by field masks and early-stopping pagination.
+
+Runs against benchmarks.fake_backend, which honours `fields=` masks, and
+compares full event resources with the masks used by the tools:
+
+* full sync of the calendar (what the event store does on first use)
+* listing the next N events (the old single-page `events().list` vs iter_events)
+
+Usage:
+    python -m benchmarks.bench_event_iter --events 5000
+"""
+import os
+import time
+import argparse
+import datetime
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+
+
+def measure(backend, func, repeat):
+    backend.reset_stats()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed = (time.perf_counter() - t0) / repeat
+    stats = backend.stats().get('events.list', {'calls': 0, 'bytes_sent': 0})
+    return result, elapsed, stats['calls'] / repeat, stats['bytes_sent'] / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with FakeBackend(FakeCalendarData(events=args.events, recurring=50)) as backend:
+        os.environ['CALENDAR_API_ENDPOINT'] = backend.calendar_endpoint
+        from google.oauth2.credentials import Credentials
+        from agent.tools.calendar_service import build_calendar_service
+        from agent.tools.event_iter import LIST_FIELDS, SYNC_FIELDS, iter_event_pages, iter_events
+
+        service = build_calendar_service(Credentials(token='benchmark'))
+        now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+        def full_sync(fields):
+            return sum(len(page.get('items', [])) for page in
+                       iter_event_pages(service, fields=fields, singleEvents=True))
+
+        def old_listing():
+            # One unmasked page, then truncated client-side
+            response = service.events().list(
+                calendarId='primary', timeMin=now, singleEvents=True, orderBy='startTime'
+            ).execute()
+            return len(response.get('items', [])[:args.limit])
+
+        def new_listing():
+            return len(list(iter_events(
+                service, limit=args.limit, fields=LIST_FIELDS,
+                timeMin=now, singleEvents=True, orderBy='startTime'
+            )))
+
+        rows = [
+            ('full sync, full resources', lambda: full_sync(None)),
+            ('full sync, SYNC_FIELDS', lambda: full_sync(SYNC_FIELDS)),
+            (f'next {args.limit}, one full page', old_listing),
+            (f'next {args.limit}, iter_events + LIST_FIELDS', new_listing),
+        ]
+        print(f"{args.events} single events + 50 recurring series\n")
+        print(f"{'':<40}{'events':>8}{'calls':>7}{'KB sent':>10}{'ms':>9}")
+        for label, func in rows:
+            count, elapsed, calls, sent = measure(backend, func, args.repeat)
+            print(f"{label:<40}{count:>8}{calls:>7.0f}{sent / 1024:>10.1f}{elapsed * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Polling cost of the Flask app's /api/events with and without If-None-Match.
+
+Uses the Flask test client against benchmarks.fake_backend, signed in as one
+user, and polls the same page the way a dashboard widget does. Also walks
+every page with pageToken and checks the result against the event store.
+
+Usage:
+    python -m benchmarks.bench_events_api --polls 500 --page-size 50
+"""
+import os
+import time
+import logging
+import argparse
+import datetime
+import tempfile
+from urllib.parse import quote
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--polls', type=int, default=500)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with FakeBackend(FakeCalendarData(events=args.events)) as backend:
+        os.environ['CALENDAR_API_ENDPOINT'] = backend.calendar_endpoint
+        os.environ['TOKEN_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'tokens.db')
+        from google.oauth2.credentials import Credentials
+        from calendar_agent import app, services
+
+        services.add_user('bench', Credentials(
+            token='benchmark', refresh_token='bench', client_id='bench', client_secret='bench',
+            expiry=datetime.datetime.now(datetime.UTC).replace(tzinfo=None) + datetime.timedelta(hours=1)
+        ))
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 'bench'
+
+        time_min = quote(backend.data.start.isoformat())
+        url = f'/api/events?timeMin={time_min}&maxResults={args.page_size}'
+
+        # Every page, compared with the store
+        ids, token, pages = [], None, 0
+        while True:
+            response = client.get(url + (f'&pageToken={token}' if token else ''))
+            assert response.status_code == 200, response.get_data(as_text=True)
+            body = response.get_json()
+            ids += [item['id'] for item in body['items']]
+            pages += 1
+            token = body.get('nextPageToken')
+            if not token:
+                break
+        expected = [event['id'] for event in services.cached_store('bench').events_between(backend.data.start)]
+        assert ids == expected, "paging skipped or repeated events"
+
+        first = client.get(url)
+        etag = first.headers['ETag']
+
+        def poll(headers):
+            sent = 0
+            t0 = time.perf_counter()
+            for _ in range(args.polls):
+                response = client.get(url, headers=headers)
+                sent += len(response.get_data())
+            return (time.perf_counter() - t0) / args.polls, sent / args.polls, response.status_code
+
+        backend.reset_stats()
+        rows = [
+            ('no validator', poll({})),
+            ('If-None-Match', poll({'If-None-Match': etag})),
+        ]
+        calls = backend.stats().get('events.list', {'calls': 0})['calls']
+
+    print(f"{len(ids)} events in {pages} pages of {args.page_size}; {args.polls} polls per row, "
+          f"{calls} events.list calls in total\n")
+    print(f"{'':<16}{'status':>7}{'bytes':>9}{'ms':>8}")
+    for label, (elapsed, sent, status) in rows:
+        print(f"{label:<16}{status:>7}{sent:>9.0f}{elapsed * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Load test of the Flask app's /events page: per-request service vs cached services.
+
+Serves calendar_agent.app on a threaded local server, talks to
+benchmarks.fake_backend instead of Google, and drives it with concurrent
+clients, each signed in as one of --users users.
+
+* per request: the previous handler, which rebuilt Credentials from the
+  cookie and called build('calendar', 'v3') on every page view
+* cached: the /events route, with tokens in the SQLite store and services
+  checked out from the per-user cache
+
+Every user starts with an expired access token, so the cached run also shows
+how many refreshes went to the token endpoint (one per user when refresh is
+single-flight).
+
+Usage:
+    python -m benchmarks.bench_flask_app --users 20 --clients 16 --requests 800
+"""
+import os
+import time
+import logging
+import argparse
+import datetime
+import tempfile
+import threading
+
+import requests
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+
+
+def run_load(url, cookies, clients, total):
+    """Send `total` GET requests from `clients` threads; returns (requests/s, errors)."""
+    counter = iter(range(total))
+    lock = threading.Lock()
+    errors = []
+
+    def worker(index):
+        http = requests.Session()
+        http.cookies.set('session', cookies[index % len(cookies)])
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            response = http.get(url, allow_redirects=False)
+            if response.status_code != 200:
+                errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return total / (time.perf_counter() - t0), len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--clients', type=int, default=16, help='concurrent HTTP clients')
+    parser.add_argument('--requests', type=int, default=800)
+    parser.add_argument('--latency-ms', type=float, default=5, help='artificial Google API delay')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    tmp = tempfile.mkdtemp()
+    with FakeBackend(FakeCalendarData(events=500), latency_ms=args.latency_ms) as backend:
+        os.environ['CALENDAR_API_ENDPOINT'] = backend.calendar_endpoint
+        os.environ['TOKEN_DB_PATH'] = os.path.join(tmp, 'tokens.db')
+        os.environ['OAUTH_TOKEN_URI'] = f'{backend.url}/token'
+        from flask import session
+        from werkzeug.serving import make_server
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+
+        import calendar_agent
+        from calendar_agent import app, credentials_to_dict, services
+        from agent.tools.event_iter import LIST_FIELDS, iter_events
+
+        @app.route('/bench/events-per-request')
+        def events_per_request():
+            # The /events handler as it was before the token store
+            creds = Credentials(**session['credentials'])
+            service = build('calendar', 'v3', credentials=creds,
+                            client_options={'api_endpoint': backend.calendar_endpoint})
+            now = datetime.datetime.now(datetime.UTC).isoformat()
+            events = list(iter_events(service, 'primary', fields=LIST_FIELDS, limit=5,
+                                      timeMin=now, singleEvents=True, orderBy='startTime'))
+            return "<ul>" + "".join(f"<li>{e['summary']}</li>" for e in events) + "</ul>"
+
+        expired = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) - datetime.timedelta(minutes=5)
+        serializer = app.session_interface.get_signing_serializer(app)
+        legacy_cookies, cookies = [], []
+        for i in range(args.users):
+            creds = Credentials(
+                token=f'expired-{i}', refresh_token=f'refresh-{i}', expiry=expired,
+                token_uri=f'{backend.url}/token', client_id='bench', client_secret='bench',
+                scopes=calendar_agent.SCOPES
+            )
+            legacy_cookies.append(serializer.dumps({'credentials': credentials_to_dict(creds)}))
+            services.add_user(f'user-{i}', creds)
+            cookies.append(serializer.dumps({'user_id': f'user-{i}'}))
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        print(f"{args.users} users, {args.clients} clients, {args.requests} requests, "
+              f"{args.latency_ms:g} ms API latency\n")
+        print(f"{'':<16}{'req/s':>9}{'errors':>8}{'builds':>8}{'refreshes':>11}")
+        rows = [
+            ('per request', f'{base}/bench/events-per-request', legacy_cookies),
+            ('cached', f'{base}/events', cookies),
+        ]
+        for label, url, jar in rows:
+            backend.reset_stats()
+            builds = services.builds
+            rps, errors = run_load(url, jar, args.clients, args.requests)
+            refreshes = backend.stats().get('oauth.token', {'calls': 0})['calls']
+            built = args.requests if label == 'per request' else services.builds - builds
+            print(f"{label:<16}{rps:>9.0f}{errors:>8}{built:>8}{refreshes:>11}")
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
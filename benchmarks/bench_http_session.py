@@ -0,0 +1,222 @@
+"""
+Check the pooled HTTP session against a local stub server.
+
+Starts a small HTTP/1.1 server on a free port and runs the session from
+agent.tools.http_session against it:
+
+    retry on 5xx       503 twice, then 200: three attempts, backoff between them
+    retry exhausted    always 503: 1 + HTTP_MAX_RETRIES attempts, then the 503
+    retry on 429       429 with Retry-After, then 200: waits, capped at HTTP_MAX_RETRY_AFTER
+    no retry on POST   503 on a POST is returned at once (not idempotent)
+    read timeout       a response slower than the read timeout is retried, then raises
+    connect timeout    a listener that never accepts raises ConnectTimeout
+    gzip               the session asks for gzip and decodes the compressed body
+    keep-alive         sequential requests reuse one TCP connection
+
+Usage:
+    python -m benchmarks.bench_http_session
+"""
+import gzip
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+
+from agent.tools import http_session
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, payload=None, headers=None):
+        body = json.dumps(payload or {}).encode()
+        if 'gzip' in (headers or {}).get('Content-Encoding', ''):
+            body = gzip.compress(body)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        stub = self.server.stub
+        path = self.path.split('?')[0]
+        attempt = stub.hit(path, self.client_address[1])
+        if self.command == 'POST':
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        if path.startswith('/flaky/'):
+            failures = int(path.rsplit('/', 1)[1])
+            return self._send(503 if attempt <= failures else 200, {'attempt': attempt})
+        if path == '/ratelimit':
+            if attempt == 1:
+                return self._send(429, headers={'Retry-After': str(stub.retry_after)})
+            return self._send(200, {'attempt': attempt})
+        if path == '/slow':
+            time.sleep(stub.slow_seconds)
+            return self._send(200)
+        if path == '/gzip':
+            accepted = self.headers.get('Accept-Encoding', '')
+            payload = {'items': ['x' * 20] * 200, 'accept': accepted}
+            return self._send(200, payload, {'Content-Encoding': 'gzip'} if 'gzip' in accepted else None)
+        return self._send(200, {'ok': True})
+
+    do_GET = do_POST = _handle
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out close the connection before the stub answers
+        pass
+
+
+class StubServer:
+    """HTTP/1.1 stub recording attempts per path and the client port of every request."""
+
+    def __init__(self, retry_after=1, slow_seconds=1.0):
+        self.retry_after = retry_after
+        self.slow_seconds = slow_seconds
+        self.attempts = Counter()
+        self.ports = []
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), _Handler)
+        self._server.stub = self
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def hit(self, path, port):
+        with self._lock:
+            self.attempts[path] += 1
+            self.ports.append(port)
+            return self.attempts[path]
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _timed(call):
+    t0 = time.perf_counter()
+    try:
+        return call(), None, time.perf_counter() - t0
+    except Exception as e:
+        return None, e, time.perf_counter() - t0
+
+
+def _is_read_timeout(error) -> bool:
+    """Once retries are used up, requests reports a read timeout as a ConnectionError wrapping it."""
+    if isinstance(error, requests.exceptions.ReadTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if isinstance(error, requests.ConnectionError) and error.args else None
+    return isinstance(reason, urllib3.exceptions.ReadTimeoutError)
+
+
+def run_checks(stub, read_timeout, connect_timeout):
+    """Return (name, ok, detail) for every check."""
+    retries = http_session.HTTP_MAX_RETRIES
+    checks = []
+
+    session = http_session.build_session()
+    response, error, elapsed = _timed(lambda: session.get(f'{stub.url}/flaky/2'))
+    # urllib3 sleeps 0 before the first retry and backoff_factor * 2 before the second
+    checks.append(('retry on 5xx', response is not None and response.status_code == 200
+                   and stub.attempts['/flaky/2'] == 3 and elapsed >= http_session.HTTP_BACKOFF_FACTOR,
+                   f"{stub.attempts['/flaky/2']} attempts, {elapsed:.2f}s"))
+
+    response, error, elapsed = _timed(lambda: session.get(f'{stub.url}/flaky/99'))
+    checks.append(('retry exhausted', response is not None and response.status_code == 503
+                   and stub.attempts['/flaky/99'] == retries + 1,
+                   f"{stub.attempts['/flaky/99']} attempts, status {getattr(response, 'status_code', error)}"))
+
+    response, error, elapsed = _timed(lambda: session.get(f'{stub.url}/ratelimit'))
+    expected_wait = min(stub.retry_after, http_session.HTTP_MAX_RETRY_AFTER)
+    checks.append(('retry on 429', response is not None and response.status_code == 200
+                   and expected_wait <= elapsed < expected_wait + 2,
+                   f"{stub.attempts['/ratelimit']} attempts, waited {elapsed:.2f}s (Retry-After {stub.retry_after})"))
+
+    response, error, elapsed = _timed(lambda: session.post(f'{stub.url}/flaky/1', json={}))
+    checks.append(('no retry on POST', response is not None and response.status_code == 503,
+                   f"status {getattr(response, 'status_code', error)}"))
+
+    # Default timeouts come from the adapter; shorten them instead of waiting 10s
+    slow = http_session.build_session()
+    quick = http_session.build_session(max_retries=0)
+    for adapter in (*slow.adapters.values(), *quick.adapters.values()):
+        adapter.timeout = (connect_timeout, read_timeout)
+    _, error, elapsed = _timed(lambda: slow.get(f'{stub.url}/slow'))
+    checks.append(('read timeout', _is_read_timeout(error) and stub.attempts['/slow'] == retries + 1,
+                   f"{type(error).__name__ if error else 'no error'} after {stub.attempts['/slow']} attempts "
+                   f"of {read_timeout:g}s, {elapsed:.2f}s"))
+
+    # A listener with a full backlog that never accepts: the SYN goes unanswered
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(0)
+    fillers = []
+    for _ in range(4):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex(listener.getsockname())
+        fillers.append(filler)
+    host, port = listener.getsockname()
+    _, error, elapsed = _timed(lambda: quick.get(f'http://{host}:{port}/'))
+    checks.append(('connect timeout', isinstance(error, requests.exceptions.ConnectTimeout),
+                   f"{type(error).__name__ if error else 'no error'} after {elapsed:.2f}s"))
+    for sock in fillers + [listener]:
+        sock.close()
+
+    response, error, _ = _timed(lambda: session.get(f'{stub.url}/gzip'))
+    data = response.json() if response is not None else {}
+    checks.append(('gzip', response is not None and response.headers.get('Content-Encoding') == 'gzip'
+                   and len(data.get('items', [])) == 200 and 'gzip' in data.get('accept', ''),
+                   f"{response.headers.get('Content-Length')} bytes compressed" if response is not None else str(error)))
+
+    keep = http_session.build_session()
+    before = len(stub.ports)
+    for _ in range(10):
+        keep.get(f'{stub.url}/ok')
+    ports = set(stub.ports[before:])
+    checks.append(('keep-alive', len(ports) == 1, f"10 requests over {len(ports)} connection(s)"))
+    return checks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--read-timeout', type=float, default=0.3)
+    parser.add_argument('--connect-timeout', type=float, default=0.5)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with StubServer() as stub:
+        checks = run_checks(stub, args.read_timeout, args.connect_timeout)
+
+    for name, ok, detail in checks:
+        print(f"{'✅' if ok else '❌'} {name:<18}{detail}")
+    failed = [name for name, ok, _ in checks if not ok]
+    print(f"\n{len(checks) - len(failed)}/{len(checks)} checks passed")
+    assert not failed, f"failed: {', '.join(failed)}"
+
+
+if __name__ == '__main__':
+    main()
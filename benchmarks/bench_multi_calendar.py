@@ -0,0 +1,110 @@
+"""
+Multi-calendar reads: serial vs concurrent sync, and k-way merge vs sort.
+
+Runs against benchmarks.fake_backend with several calendars and a simulated
+network delay. Sync time is measured from empty stores; merge time uses the
+synced stores and asks for the next N events across all calendars.
+
+It also creates an event with cold caches, once with CALENDAR_SOURCES=primary
+and once with all selected calendars, and lists the requests each made: the
+window-bounded conflict query per calendar and the insert, plus, for the
+selected calendars, the calendarList request that finds them. A third create
+runs with every store synced and due for its delta sync; the delta syncs run
+concurrently, so it should take about one round trip more than the insert.
+
+Usage:
+    python -m benchmarks.bench_multi_calendar --calendars 6 --latency-ms 80
+"""
+import io
+import time
+import logging
+import argparse
+import datetime
+import contextlib
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _clear_caches, _configure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calendars', type=int, default=6)
+    parser.add_argument('--events', type=int, default=2000, help='events on the primary calendar (secondaries get a quarter)')
+    parser.add_argument('--latency-ms', type=float, default=80)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    data = FakeCalendarData(events=args.events, calendars=args.calendars)
+    with FakeBackend(data, latency_ms=args.latency_ms) as backend:
+        _configure(backend)
+        from agent.tools import calendars, event_store
+        from agent.tools.calendar_time import utc_now
+
+        ids = calendars.get_calendar_ids()
+
+        def reset():
+            with event_store._stores_lock:
+                event_store._stores.clear()
+
+        reset()
+        t0 = time.perf_counter()
+        for cal in ids:
+            event_store.get_event_store(cal).sync()
+        serial = time.perf_counter() - t0
+
+        reset()
+        t0 = time.perf_counter()
+        stores = calendars.get_synced_stores(ids)
+        parallel = time.perf_counter() - t0
+
+        now = utc_now()
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            merged = calendars.events_between(stores, now, limit=args.limit)
+        merge_time = (time.perf_counter() - t0) / args.repeat
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            everything = [(start, store.calendar_id, event)
+                          for store in stores for start, event in store.iter_between(now)]
+            everything.sort(key=lambda item: item[0])
+            naive = [(cal, event) for _, cal, event in everything[:args.limit]]
+        sort_time = (time.perf_counter() - t0) / args.repeat
+
+        total = sum(len(store.events_between(now)) for store in stores)
+        assert [e['id'] for _, e in merged] == [e['id'] for _, e in naive], "merge order differs from a full sort"
+
+        from agent.tools import calendar_tools
+
+        creates = []
+        start = data.start + datetime.timedelta(days=120, hours=23)
+        for sources, synced in (('primary', False), ('selected', False), ('selected', True)):
+            calendars.CALENDAR_SOURCES = sources
+            _clear_caches()
+            if synced:
+                # Stores synced earlier, with their sync interval passed: one delta sync each
+                for store in calendars.get_synced_stores():
+                    store.sync_interval = 0
+            backend.reset_stats()
+            t0 = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = calendar_tools.create_calendar_event(
+                    'Cold create', start.isoformat(), (start + datetime.timedelta(minutes=30)).isoformat())
+            elapsed = time.perf_counter() - t0
+            assert result.startswith('✅'), result
+            creates.append((sources + (', synced stores' if synced else ''), backend.stats(), elapsed))
+            start += datetime.timedelta(days=1)
+
+    print(f"{len(ids)} calendars, {args.latency_ms:g} ms per request, {total} upcoming events")
+    print(f"cold sync:  serial {serial * 1000:.0f} ms, concurrent {parallel * 1000:.0f} ms")
+    print(f"next {args.limit}: k-way merge {merge_time * 1e6:.0f} us, concatenate + sort {sort_time * 1e6:.0f} us")
+    for sources, stats, elapsed in creates:
+        requests = ', '.join(f"{stat['calls']} {route}" for route, stat in stats.items())
+        kb = sum(stat['bytes_sent'] for stat in stats.values()) / 1024
+        print(f"create, CALENDAR_SOURCES={sources}: {requests} ({kb:.1f} KB, {elapsed * 1000:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Recurring events: server-side expansion (singleEvents=True) vs local expansion.
+
+Runs against benchmarks.fake_backend with many long-running daily and weekly
+series and compares the two EventStore modes:
+
+* full sync: API calls, bytes received and events held in memory
+* conflict checks for a batch of proposed meetings
+* the next N events, and every event in the planning horizon, which must be
+  identical in both modes (instance ids and start times)
+
+Usage:
+    python -m benchmarks.bench_recurrence --series 100 --occurrences 365
+"""
+import time
+import logging
+import argparse
+import datetime
+import tracemalloc
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _configure
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=500, help='single events')
+    parser.add_argument('--series', type=int, default=100, help='recurring series')
+    parser.add_argument('--occurrences', type=int, default=365, help='instances per series')
+    parser.add_argument('--queries', type=int, default=20, help='proposed meetings per conflict check')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    data = FakeCalendarData(events=args.events, recurring=args.series, occurrences=args.occurrences)
+    with FakeBackend(data) as backend:
+        _configure(backend)
+        from agent.tools.event_store import EventStore
+
+        start = data.start
+        queries = [
+            (start + datetime.timedelta(days=3 * i, hours=10), start + datetime.timedelta(days=3 * i, hours=11))
+            for i in range(args.queries)
+        ]
+        horizon = (start, start + datetime.timedelta(days=max(args.occurrences * 7, data.days) + 1))
+
+        rows, results = [], {}
+        for mode in ('server', 'local'):
+            store = EventStore('primary', recurrence=mode)
+            backend.reset_stats()
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            store.sync()
+            sync_time = time.perf_counter() - t0
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            stats = backend.stats()['events.list']
+
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                conflicts = store.overlapping_many(queries)
+            conflict_time = (time.perf_counter() - t0) / args.repeat
+
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                upcoming = store.events_between(start + datetime.timedelta(days=30), limit=10)
+            next_time = (time.perf_counter() - t0) / args.repeat
+
+            everything = store.events_between(*horizon)
+            results[mode] = (
+                [(event['id'], event['start'].get('dateTime', event['start'].get('date'))) for event in everything],
+                [[event['id'] for event in found] for found in conflicts],
+                [event['id'] for event in upcoming],
+            )
+            rows.append((mode, len(store._events), stats['calls'], stats['bytes_sent'], memory,
+                         sync_time, conflict_time, next_time))
+
+    server, local = results['server'], results['local']
+    assert {(i, _normal(s)) for i, s in server[0]} == {(i, _normal(s)) for i, s in local[0]}, "expanded events differ"
+    assert [sorted(found) for found in server[1]] == [sorted(found) for found in local[1]], "conflicts differ"
+    assert sorted(server[2]) == sorted(local[2]), "next events differ"
+
+    print(f"{args.events} single events, {args.series} series x {args.occurrences} instances, "
+          f"{len(server[0])} events in the horizon (same in both modes)\n")
+    print(f"{'':<8}{'stored':>8}{'calls':>7}{'KB recv':>9}{'MB held':>9}{'sync ms':>9}"
+          f"{f'{args.queries} conflicts ms':>18}{'next 10 ms':>12}")
+    for mode, stored, calls, received, memory, sync_time, conflict_time, next_time in rows:
+        print(f"{mode:<8}{stored:>8}{calls:>7}{received / 1024:>9.0f}{memory / 2**20:>9.1f}{sync_time * 1000:>9.0f}"
+              f"{conflict_time * 1000:>18.2f}{next_time * 1000:>12.3f}")
+
+
+def _normal(value: str) -> str:
+    """Compare '...Z' and '+00:00' renderings of the same instant."""
+    if 'T' not in value:
+        return value
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Intent router: hit rate, false positives and latency on a message set.
+
+Runs a fixed set of user messages through agent.router.IntentRouter against
+benchmarks.fake_backend. Messages marked as routable must be answered by
+the expected intent; all others (requests that need the model, replies to
+its questions) must fall through, and weather questions must name the
+expected city. Reports the router latency per intent and
+the model time saved, assuming --model-ms per model call.
+
+Usage:
+    python -m benchmarks.bench_router --model-ms 1200
+"""
+import io
+import os
+import time
+import asyncio
+import logging
+import argparse
+import contextlib
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _configure
+
+# (message, expected intent or None for "goes to the model")
+MESSAGES = [
+    ("What's on today?", 'events_today'),
+    ("what's on my calendar today", 'events_today'),
+    ("Show me my meetings for today", 'events_today'),
+    ("Do I have any meetings today?", 'events_today'),
+    ("What's my schedule for today please", 'events_today'),
+    ("What's the weather?", 'weather'),
+    ("how's the weather in Paris today", 'weather'),
+    ("Hey, what's the weather like today?", 'weather'),
+    ("What time is it?", 'time'),
+    ("what's the time now", 'time'),
+    ("What's today's date?", 'date'),
+    ("What day is it today?", 'date'),
+    ("today", None),
+    ("weather today", 'weather'),
+    ("Weather in Amsterdam?", 'weather'),
+    ("weather in paris please", 'weather'),
+    ("What's the weather in New York City today?", 'weather'),
+    ("weather in Paris tomorrow", None),
+    ("weather in Paris this weekend", None),
+    ("weather", None),
+    ("Weather?", None),
+    ("What's the weather tomorrow?", None),
+    ("What time is my dentist appointment?", None),
+    ("Schedule gym today at 6pm", None),
+    ("Find a 30 minute slot with person1@example.com this week", None),
+    ("What's on next Monday?", None),
+    ("Move my focus time to the afternoon", None),
+    ("yes", None),
+]
+
+# City the weather intent must ask for; anything else trailing the city is not part of it
+CITIES = {
+    "how's the weather in Paris today": 'paris',
+    "Weather in Amsterdam?": 'amsterdam',
+    "weather in paris please": 'paris',
+    "What's the weather in New York City today?": 'new york city',
+}
+
+
+async def run(router, repeat):
+    rows = []
+    for message, expected in MESSAGES:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            with contextlib.redirect_stdout(io.StringIO()):
+                answer = await router.answer(message, 'bench')
+        elapsed = (time.perf_counter() - t0) / repeat
+        matched = router.match(message)
+        got = matched[0] if matched and answer else None
+        if got == 'weather' and message in CITIES and matched[1].group('city') != CITIES[message]:
+            got = f"weather in {matched[1].group('city')!r}"
+        rows.append((message, expected, got, elapsed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--model-ms', type=float, default=1000, help='assumed latency of one model call')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    os.environ['ROUTER_MODEL_LATENCY_MS'] = str(args.model_ms)
+
+    with FakeBackend(FakeCalendarData(events=500)) as backend:
+        _configure(backend)
+        from agent.router import IntentRouter
+        from agent.tools.metrics import registry, snapshot
+
+        registry.reset()
+        router = IntentRouter('time,date,events_today,weather')
+        rows = asyncio.run(run(router, args.repeat))
+        stats = snapshot()['router']
+
+    wrong = [(message, expected, got) for message, expected, got, _ in rows if expected != got]
+    routable = sum(1 for _, expected in MESSAGES if expected)
+    print(f"{len(MESSAGES)} messages ({routable} routable), {args.repeat} runs each\n")
+    print(f"{'message':<58}{'intent':>14}{'ms':>8}")
+    for message, expected, got, elapsed in rows:
+        print(f"{message[:56]:<58}{got or '→ model':>14}{elapsed * 1000:>8.2f}")
+    print(f"\nhit rate {stats['hit_rate']:.0%}, {len(wrong)} misrouted, "
+          f"model time saved {stats['saved_ms'] / 1000 / args.repeat:.1f} s per pass "
+          f"({len(MESSAGES)} messages, {args.model_ms:g} ms per model call)")
+    for message, expected, got in wrong:
+        print(f"  ✗ {message!r}: expected {expected}, got {got}")
+    assert not wrong, f"{len(wrong)} message(s) misrouted"
+
+
+if __name__ == '__main__':
+    main()
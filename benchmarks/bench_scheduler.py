@@ -0,0 +1,114 @@
+"""
+Schedule planner: tasks placed into a synthetic multi-week calendar.
+
+Syncs the primary calendar from benchmarks.fake_backend, generates a mix of
+CRITICAL / CORE / FILLER tasks (fixed, same-day and anytime), and times
+plan_tasks with and without moving MOVABLE events. Every plan is checked:
+no two placed items overlap, nothing overlaps a locked event, and every task
+stays inside working hours.
+
+Usage:
+    python -m benchmarks.bench_scheduler --days 14 --events 150 --tasks 50
+"""
+import time
+import random
+import logging
+import argparse
+import datetime
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _configure
+
+NAMES = ['Write report', 'Study for exam', 'Gym', 'Call the bank', 'Prepare slides', 'Read paper',
+         'Tax deadline', 'Groceries', 'Review PRs', 'Plan trip']
+
+
+def make_tasks(count, start, days, rng):
+    """Task dicts shaped like parse_user_input_to_task output."""
+    tasks = []
+    for i in range(count):
+        task = {
+            'task_name': f'{rng.choice(NAMES)} #{i}',
+            'priority': rng.choice(['CRITICAL', 'CORE', 'CORE', 'FILLER']),
+            'flexibility': 'LIQUID',
+            'duration_minutes': rng.choice([30, 45, 60, 90, 120]),
+        }
+        kind = rng.random()
+        day = start + datetime.timedelta(days=rng.randrange(days))
+        if kind < 0.1:
+            begin = day + datetime.timedelta(hours=rng.randrange(9, 16))
+            task.update(flexibility='FIXED', hard_start_time=begin.strftime('%H:%M'),
+                        start_time=begin.isoformat(),
+                        end_time=(begin + datetime.timedelta(minutes=task['duration_minutes'])).isoformat())
+        elif kind < 0.4:
+            task['date'] = day.date().isoformat()
+        tasks.append(task)
+    return tasks
+
+
+def check(plan, events, tz, day_start, day_end):
+    """Count placed tasks or moved events that overlap anything else (must be 0)."""
+    from agent.tools.calendar_time import event_bounds
+
+    moved = {move['event']['id'] for move in plan['moves']}
+    placed = [(item['start'], item['end'], bool(item['task'].get('hard_start_time'))) for item in plan['scheduled']]
+    placed += [(move['new_start'], move['new_end'], False) for move in plan['moves'] if move['new_start']]
+    existing = [
+        event_bounds(event, tz) for _, event in events
+        if 'date' not in event['start'] and event.get('transparency') != 'transparent' and event['id'] not in moved
+    ]
+
+    overlaps = 0
+    for i, (start, end, fixed) in enumerate(placed):
+        others = [(lo, hi) for j, (lo, hi, _) in enumerate(placed) if j != i]
+        if not fixed:
+            # Fixed tasks may clash with locked events; those are reported as conflicts
+            others += existing
+            assert day_start <= start.time() and end <= datetime.datetime.combine(start.date(), day_end, tzinfo=tz)
+        overlaps += any(lo < end and start < hi for lo, hi in others)
+    return overlaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--events', type=int, default=150)
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    data = FakeCalendarData(events=args.events, recurring=10, occurrences=args.days, days=args.days)
+    with FakeBackend(data) as backend:
+        _configure(backend)
+        from agent.tools.calendars import events_between, get_synced_stores
+        from agent.tools.scheduler import plan_schedule, plan_tasks
+
+        tz = datetime.timezone.utc
+        start = data.start
+        end = start + datetime.timedelta(days=args.days)
+        events = events_between(get_synced_stores(), start, end)
+        tasks = make_tasks(args.tasks, start, args.days, random.Random(7))
+        hours = (datetime.time(9), datetime.time(18))
+
+        print(f"{len(events)} events over {args.days} days, {len(tasks)} tasks, working hours 09:00-18:00\n")
+        print(f"{'':<14}{'scheduled':>10}{'unplaced':>10}{'moves':>7}{'clashes':>9}{'overlaps':>10}{'ms':>8}")
+        for label, allow_moving in (('locked only', False), ('with moving', True)):
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                plan = plan_tasks(tasks, events, start, end, working_hours=hours,
+                                  allow_moving=allow_moving, now=start)
+            elapsed = (time.perf_counter() - t0) / args.repeat
+            overlaps = check(plan, events, tz, *hours)
+            print(f"{label:<14}{len(plan['scheduled']):>10}{len(plan['unscheduled']):>10}{len(plan['moves']):>7}"
+                  f"{len(plan['conflicts']):>9}{overlaps:>10}{elapsed * 1000:>8.2f}")
+
+        t0 = time.perf_counter()
+        output = plan_schedule(['Finish the report by Friday', 'Gym tomorrow for 90 minutes', 'quick call with Sam today'],
+                               time_min=start.isoformat(), time_max=end.isoformat())
+        print(f"\nplan_schedule tool, 3 natural-language tasks: {(time.perf_counter() - t0) * 1000:.1f} ms")
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Session tool cache: a conversation's tool calls with and without the memo.
+
+Replays the tool calls of a typical conversation (listing, searching,
+repeated availability checks around clarifying questions, a create in the
+middle) through the same wrappers the agent registers, against
+benchmarks.fake_backend with an artificial API latency. Reports API calls,
+wall time and cache hits/misses/invalidations, and checks that every answer
+of the cached run equals what the uncached tool returns at that point (those
+check calls are not counted).
+
+Usage:
+    python -m benchmarks.bench_session_cache --latency-ms 40
+"""
+import io
+import time
+import logging
+import argparse
+import datetime
+import contextlib
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _configure
+
+
+def conversation(data):
+    """Tool calls (name, kwargs) of one conversation."""
+    day = data.start + datetime.timedelta(days=1)
+    window = dict(time_min=day.isoformat(), time_max=(day + datetime.timedelta(days=3)).isoformat())
+    attendees = data.attendees[:4]
+    meeting = day + datetime.timedelta(days=1, hours=15)
+    return [
+        ('list_upcoming_events', dict(max_results=10)),
+        ('search_events', dict(query='review', max_results=10)),
+        ('get_movable_events_from_calendar', {}),
+        ('check_free_busy', dict(attendee_emails=attendees, **window)),
+        # "Only Tuesday afternoon works for Sam" -> same question again
+        ('check_free_busy', dict(attendee_emails=attendees, **window)),
+        ('find_meeting_slots', dict(attendee_emails=attendees, duration_minutes=60, **window)),
+        ('list_upcoming_events', dict(max_results=10)),
+        ('create_meeting_with_attendees', dict(
+            summary='Design sync', start_time=meeting.isoformat(),
+            end_time=(meeting + datetime.timedelta(hours=1)).isoformat(),
+            attendee_emails=attendees, send_notifications=False)),
+        ('find_meeting_slots', dict(attendee_emails=attendees, duration_minutes=60, **window)),
+        ('check_free_busy', dict(attendee_emails=attendees, **window)),
+        ('list_upcoming_events', dict(max_results=10)),
+        ('search_events', dict(query='review', max_results=10)),
+    ]
+
+
+def api_calls(backend):
+    return sum(stat['calls'] for route, stat in backend.stats().items() if not route.startswith('weather'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency-ms', type=float, default=40, help='artificial Google API delay')
+    parser.add_argument('--events', type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    with FakeBackend(FakeCalendarData(events=args.events), latency_ms=args.latency_ms) as backend:
+        _configure(backend)
+        from agent.tools import calendar_tools, prompt_tools
+        from agent.tools.event_store import get_event_store
+        from agent.tools.metrics import registry, snapshot
+        from agent.tools.session_cache import cache, release_session, session_cached, use_session
+
+        funcs = {}
+        for module in (calendar_tools, prompt_tools):
+            for name, _ in conversation(backend.data):
+                if hasattr(module, name):
+                    funcs[name] = getattr(module, name)
+        cached = {name: session_cached(func) for name, func in funcs.items()}
+
+        rows, mismatches = [], []
+        for label, tools, session_id in (('uncached', funcs, None), ('session cache', cached, 'bench')):
+            # Same starting point for both runs: synced store, fresh counters
+            get_event_store().sync(force=True)
+            cache.clear()
+            registry.reset()
+            backend.reset_stats()
+            token = use_session(session_id)
+            unchecked, elapsed = 0, 0.0
+            with contextlib.redirect_stdout(io.StringIO()):
+                for name, kwargs in conversation(backend.data):
+                    if name == 'create_meeting_with_attendees':
+                        # Distinct event per run, the other run's one is already on the calendar
+                        kwargs = dict(kwargs, summary=f"{kwargs['summary']} ({label})")
+                    t0 = time.perf_counter()
+                    result = tools[name](**kwargs)
+                    elapsed += time.perf_counter() - t0
+                    if session_id is not None and name != 'create_meeting_with_attendees':
+                        before = api_calls(backend)
+                        check = use_session(None)
+                        if funcs[name](**kwargs) != result:
+                            mismatches.append(name)
+                        release_session(check)
+                        unchecked += api_calls(backend) - before
+            release_session(token)
+            rows.append((label, api_calls(backend) - unchecked, elapsed))
+            stats = snapshot()['cache']
+
+    print(f"{len(conversation(backend.data))} tool calls, {args.latency_ms:g} ms API latency\n")
+    print(f"{'':<16}{'API calls':>10}{'ms':>9}")
+    for label, calls, elapsed in rows:
+        print(f"{label:<16}{calls:>10}{elapsed * 1000:>9.0f}")
+    print(f"\n{'tool':<34}{'hits':>6}{'misses':>8}{'invalidated':>13}")
+    for tool, entry in stats.items():
+        print(f"{tool:<34}{entry['hits']:>6}{entry['misses']:>8}{entry['invalidations']:>13}")
+    print(f"\ncached answers identical to uncached: {'yes' if not mismatches else 'NO: ' + ', '.join(mismatches)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Cold-start benchmark: import time, agent build time and first tool calls.
+
+Every sample runs in a fresh interpreter, like a new serverless instance.
+Tool calls go to benchmarks.fake_backend, so no Google account is needed.
+It also compares building a Calendar service with `build()` against the
+cached discovery document used by calendar_service.
+
+Usage:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+
+# Runs in the child interpreter; prints one JSON line with timings in seconds
+CHILD = r"""
+import json, os, sys, time
+t0 = time.perf_counter()
+import agent.tools.calendar_tools as calendar_tools
+import agent.tools.weather_tools as weather_tools
+t1 = time.perf_counter()
+import agent
+agent.root_agent
+t2 = time.perf_counter()
+
+from google.oauth2.credentials import Credentials
+from agent.tools.calendar_service import set_calendar_credentials
+set_calendar_credentials(Credentials(token='benchmark'))
+weather_tools.LOCATION_PROVIDERS = [('fake', os.environ['OPENWEATHER_BASE_URL'] + '/json/')]
+
+stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+if os.environ.get('BENCH_IDLE'):
+    # Time the model would spend on the first turn before calling a tool
+    time.sleep(float(os.environ['BENCH_IDLE']))
+t3 = time.perf_counter()
+calendar_tools.list_upcoming_events(10)
+t4 = time.perf_counter()
+weather_tools.get_current_weather('Ottawa')
+t5 = time.perf_counter()
+sys.stdout = stdout
+print(json.dumps({
+    'import_tools': t1 - t0,
+    'import_and_build_agent': t2 - t1,
+    'first_list_upcoming_events': t4 - t3,
+    'first_get_current_weather': t5 - t4,
+}))
+"""
+
+
+def run_child(env):
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare_service_builds(repeat):
+    from googleapiclient.discovery import build
+    from google.oauth2.credentials import Credentials
+    from agent.tools.calendar_service import build_calendar_service, get_discovery_document
+
+    creds = Credentials(token='benchmark')
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        build('calendar', 'v3', credentials=creds, cache_discovery=False)
+    per_build = (time.perf_counter() - t0) / repeat
+
+    get_discovery_document()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        build_calendar_service(creds)
+    per_cached = (time.perf_counter() - t0) / repeat
+    return per_build, per_cached
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start latency of the agent')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per configuration')
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--idle', type=float, default=0.5,
+                        help='seconds between startup and the first tool call (model think time)')
+    args = parser.parse_args()
+
+    with FakeBackend(FakeCalendarData(events=args.events)) as backend:
+        base_env = dict(
+            os.environ,
+            CALENDAR_API_ENDPOINT=backend.calendar_endpoint,
+            OPENWEATHER_BASE_URL=backend.url,
+            OPENWEATHER_API_KEY='benchmark',
+            EVENT_STORE_SYNC_INTERVAL='0',
+            PYTHONPATH=os.getcwd(),
+        )
+        configs = [
+            ('preload on', dict(base_env, TOOL_PRELOAD='1', BENCH_IDLE=str(args.idle))),
+            ('preload off', dict(base_env, TOOL_PRELOAD='0', BENCH_IDLE=str(args.idle))),
+        ]
+        for label, env in configs:
+            samples = [run_child(env) for _ in range(args.runs)]
+            print(f"\n{label} ({args.runs} fresh interpreters, {args.idle:g}s before the first call), median ms:")
+            for key in samples[0]:
+                values = [sample[key] * 1000 for sample in samples]
+                print(f"   {key:<28}{statistics.median(values):>9.1f}   (min {min(values):.1f}, max {max(values):.1f})")
+
+    per_build, per_cached = compare_service_builds(20)
+    print(f"\nCalendar service build: build() {per_build * 1000:.1f} ms, "
+          f"cached discovery document {per_cached * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Accuracy and latency of the deterministic temporal parser.
+
+Each phrasing in CORPUS is resolved against a fixed reference time
+(Wednesday 2025-11-26 10:20 +01:00) and compared with the expected start,
+end and date. The old parser only recognised "<hour>am/pm", so its coverage
+is reported alongside.
+
+Usage:
+    python -m benchmarks.bench_time_parser --repeat 2000
+"""
+import argparse
+import datetime
+import re
+import time
+
+from agent.tools.time_parser import parse_temporal
+
+TZ = datetime.timezone(datetime.timedelta(hours=1))
+NOW = datetime.datetime(2025, 11, 26, 10, 20, tzinfo=TZ)
+
+# (phrase, expected start, expected end, expected date) - times are local to TZ
+CORPUS = [
+    ("dentist tomorrow at 4pm", "2025-11-27 16:00", None, "2025-11-27"),
+    ("gym next Tuesday for 45 minutes at 7am", "2025-12-02 07:00", "2025-12-02 07:45", "2025-12-02"),
+    ("call mom in 2 hours", "2025-11-26 12:20", None, "2025-11-26"),
+    ("lunch with Sarah tomorrow at noon", "2025-11-27 12:00", None, "2025-11-27"),
+    ("team meeting 2-4pm friday", "2025-11-28 14:00", "2025-11-28 16:00", "2025-11-28"),
+    ("standup at 9:30", "2025-11-27 09:30", None, "2025-11-27"),
+    ("focus block from 1pm to 3:30pm", "2025-11-26 13:00", "2025-11-26 15:30", "2025-11-26"),
+    ("review in 30 minutes for half an hour", "2025-11-26 10:50", "2025-11-26 11:20", "2025-11-26"),
+    ("dinner tonight", "2025-11-26 20:00", None, "2025-11-26"),
+    ("2 hour workshop on Dec 3rd at 10am", "2025-12-03 10:00", "2025-12-03 12:00", "2025-12-03"),
+    ("study in 3 days at 14:00", "2025-11-29 14:00", None, "2025-11-29"),
+    ("report due 2025-12-01", None, None, "2025-12-01"),
+    ("gym sometime today", None, None, "2025-11-26"),
+    ("quick call at 3", "2025-11-26 15:00", None, "2025-11-26"),
+    ("interview next wednesday 11am for 1 hour", "2025-12-03 11:00", "2025-12-03 12:00", "2025-12-03"),
+    ("yoga this evening for an hour and a half", "2025-11-26 18:00", "2025-11-26 19:30", "2025-11-26"),
+    ("flight on the 5th of January", None, None, "2026-01-05"),
+    ("coffee with Tom day after tomorrow at 8:15am", "2025-11-28 08:15", None, "2025-11-28"),
+    ("pick up kids at 3:30pm", "2025-11-26 15:30", None, "2025-11-26"),
+    ("haircut saturday 11am", "2025-11-29 11:00", None, "2025-11-29"),
+    ("1:1 with manager monday at 10:00 for 30 min", "2025-12-01 10:00", "2025-12-01 10:30", "2025-12-01"),
+    ("submit taxes by march 15", None, None, "2026-03-15"),
+    ("run tomorrow morning", "2025-11-27 09:00", None, "2025-11-27"),
+    ("doctor appointment 9am", "2025-11-27 09:00", None, "2025-11-27"),
+    ("reminder in 15 min", "2025-11-26 10:35", None, "2025-11-26"),
+    ("plan sprint next week", None, None, "2025-12-01"),
+    ("movie at midnight", "2025-11-27 00:00", None, "2025-11-27"),
+    ("write blog post this afternoon for 2 hours", "2025-11-26 14:00", "2025-11-26 16:00", "2025-11-26"),
+    ("read a book", None, None, None),
+    ("piano lesson thursday between 5 and 6pm", "2025-11-27 17:00", "2025-11-27 18:00", "2025-11-27"),
+    ("call back in 0.5 hours", "2025-11-26 10:50", None, "2025-11-26"),
+    ("check the oven in 1.5 hours", "2025-11-26 11:50", None, "2025-11-26"),
+    ("workshop tomorrow at 2pm for 1.5 hours", "2025-11-27 14:00", "2025-11-27 15:30", "2025-11-27"),
+    ("Marketing 1:1 at 3pm", "2025-11-26 15:00", None, "2025-11-26"),
+    ("call janet 5 pm tomorrow", "2025-11-27 17:00", None, "2025-11-27"),
+    ("prepare 2 decks tomorrow", None, None, "2025-11-27"),
+    ("decide 2 options friday", None, None, "2025-11-28"),
+    ("offsite on Sept. 9", None, None, "2026-09-09"),
+]
+
+_LEGACY_RE = r'(\d{1,2})(:\d{2})?\s*(am|pm|AM|PM)'
+
+
+def _fmt(value):
+    return value.strftime("%Y-%m-%d %H:%M") if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=1000)
+    args = parser.parse_args()
+
+    failures = []
+    for phrase, start, end, date in CORPUS:
+        result = parse_temporal(phrase, NOW, TZ)
+        got = (_fmt(result['start']), _fmt(result['end']),
+               result['date'].isoformat() if result['date'] else None)
+        if got != (start, end, date):
+            failures.append((phrase, got, (start, end, date)))
+
+    legacy_hits = sum(1 for phrase, start, _, _ in CORPUS if start and re.search(_LEGACY_RE, phrase))
+    resolvable = sum(1 for _, start, _, _ in CORPUS if start)
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        for phrase, *_ in CORPUS:
+            parse_temporal(phrase, NOW, TZ)
+    per_call = (time.perf_counter() - t0) / (args.repeat * len(CORPUS))
+
+    print(f"phrasings: {len(CORPUS)}, with a concrete start: {resolvable}")
+    print(f"correct:   {len(CORPUS) - len(failures)}/{len(CORPUS)}")
+    print(f"old am/pm regex found an hour in {legacy_hits}/{resolvable} of the timed phrasings")
+    print(f"latency:   {per_call * 1e6:.1f} us per phrase")
+    for phrase, got, expected in failures:
+        print(f"  ✗ {phrase!r}: got {got}, expected {expected}")
+    assert not failures
+
+
+if __name__ == '__main__':
+    main()
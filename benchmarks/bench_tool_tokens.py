@@ -0,0 +1,173 @@
+"""
+Tool result size in the model context: prose vs TOOL_RESULT_FORMAT=compact.
+
+Replays a standard conversation (list, search, availability, slot finding,
+parsing, a conflicting create, planning) against benchmarks.fake_backend in
+both result formats and counts the tokens each result adds to the context.
+Since every result stays in the context for the rest of the conversation,
+it also reports the total input tokens those results cost over all turns.
+Before that it checks that over-budget results are cut to their budget, also
+when they have no list to shorten, and that a create with a description far
+over budget still reports the created event.
+
+Token counts use tiktoken (cl100k_base) when it is installed and its
+encoding can be loaded, otherwise an approximation of the same pre-tokenizer:
+words cost one token per 4 letters, numbers one per 3 digits, runs of
+punctuation one per 2 characters, whitespace runs one, non-ASCII characters
+(emoji) two each.
+
+Usage:
+    python -m benchmarks.bench_tool_tokens --events 500
+"""
+import re
+import io
+import logging
+import argparse
+import datetime
+import contextlib
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+from benchmarks.run_benchmarks import _configure
+
+_PIECES = re.compile(r' ?[A-Za-z]+| ?\d+| ?[!-/:-@\[-`{-~]+|\s+|[^\x00-\x7f]')
+
+
+def token_counter():
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return (lambda text: len(encoding.encode(text))), 'tiktoken cl100k_base'
+    except Exception:
+        return approximate_tokens, 'approximate'
+
+
+def approximate_tokens(text):
+    count = 0
+    for piece in _PIECES.findall(text):
+        word = piece.strip()
+        if not word:
+            count += 1
+        elif not word.isascii():
+            count += 2
+        elif word.isalpha():
+            count += -(-len(word) // 4)
+        elif word.isdigit():
+            count += -(-len(word) // 3)
+        else:
+            count += -(-len(word) // 2)
+    return count
+
+
+def conversation(data, turn):
+    """(label, call) pairs of the standard conversation; turn makes created events unique per run."""
+    from agent.tools import calendar_tools, prompt_tools
+    from agent.tools.scheduler import plan_schedule
+
+    day = data.start + datetime.timedelta(days=1)
+    window_min = day.isoformat()
+    window_max = (day + datetime.timedelta(days=5)).isoformat()
+    attendees = data.attendees[:5]
+    # Busy for sure: on top of the first event of the day
+    first = calendar_tools.events_between(calendar_tools.get_synced_stores(), day, limit=1)[0][1]
+    busy_start, busy_end = first['start']['dateTime'], first['end']['dateTime']
+    free_start = day + datetime.timedelta(days=30 + turn, hours=23)
+
+    return [
+        ('list_upcoming_events(10)', lambda: calendar_tools.list_upcoming_events(10)),
+        ('search_events', lambda: calendar_tools.search_events('review', 10)),
+        ('check_free_busy x5', lambda: calendar_tools.check_free_busy(attendees, window_min, window_max)),
+        ('find_meeting_slots', lambda: calendar_tools.find_meeting_slots(
+            attendees, 60, window_min, window_max, max_suggestions=5,
+            working_hours_start='09:00', working_hours_end='17:00', additional_durations=[30])),
+        ('smart_create_event_from_text', lambda: prompt_tools.smart_create_event_from_text(
+            'Dentist appointment next Tuesday at 4pm for 45 minutes')),
+        ('create_calendar_event (conflict)', lambda: calendar_tools.create_calendar_event(
+            'Design review', busy_start, busy_end)),
+        ('force_create_event', lambda: calendar_tools.force_create_event(
+            'Design review', free_start.isoformat(), (free_start + datetime.timedelta(minutes=30)).isoformat())),
+        ('get_movable_events_from_calendar', lambda: prompt_tools.get_movable_events_from_calendar()),
+        ('plan_schedule (4 tasks)', lambda: plan_schedule(
+            ['Write report for 2 hours', 'Gym tomorrow', 'quick call with the bank', 'Study session'],
+            time_min=window_min, time_max=window_max)),
+        ('list_upcoming_events(50)', lambda: calendar_tools.list_upcoming_events(50)),
+    ]
+
+
+def check_budgets(data):
+    """Over-budget edge cases of result_format.compact(); returns the number of checks, raises AssertionError on failure."""
+    import json
+    from agent.tools import calendar_tools
+    from agent.tools.result_format import RESULT_BUDGET, RESULT_BUDGETS, compact
+
+    cases = [
+        ('one long string', {'t': 'a' * 3000}),
+        ('strings and a list', {'t': 'a' * 3000, 'd': 'b' * 500, 'ev': [{'t': 'c' * 50}] * 40}),
+        ('nested strings', {'rows': [['x' * 1500, 'y' * 1500]]}),
+    ]
+    for label, payload in cases:
+        text = compact('check', payload)
+        assert len(text) <= RESULT_BUDGET, f"{label}: {len(text)} > {RESULT_BUDGET}"
+        json.loads(text)
+
+    # Few rows with long nested lists: the lists inside the rows are cut, never the table header
+    people = [{'who': f'person{i}@example.com', 'busy': [f'2025-12-01 {h % 24:02d}:00-{h % 24:02d}:30' for h in range(150)]}
+              for i in range(2)]
+    text = compact('check_free_busy', {'people': people})
+    table = json.loads(text)['people']
+    assert len(text) <= RESULT_BUDGETS['check_free_busy'], f"nested lists: {len(text)} chars"
+    assert table['cols'] == ['who', 'busy', 'busy+'], table['cols']
+    assert [row[0] for row in table['rows']] == ['person0@example.com', 'person1@example.com'], table['rows']
+    assert all(len(row[1]) + row[2] == 150 for row in table['rows']), "busy+ does not match the spans left out"
+
+    start = data.start + datetime.timedelta(days=200, hours=23)
+    result = json.loads(calendar_tools.create_calendar_event(
+        'Long description', start.isoformat(), (start + datetime.timedelta(minutes=30)).isoformat(),
+        description='d' * 5000, force_create=True))
+    assert result.get('created') is True, result
+    return len(cases) + 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--events', type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    count, method = token_counter()
+    with FakeBackend(FakeCalendarData(events=args.events)) as backend:
+        _configure(backend)
+        from agent.tools import result_format
+
+        result_format.RESULT_FORMAT = 'compact'
+        with contextlib.redirect_stdout(io.StringIO()):
+            checked = check_budgets(backend.data)
+        print(f"Budget checks: {checked} ok\n")
+
+        results = {}
+        for turn, mode in enumerate(('text', 'compact')):
+            result_format.RESULT_FORMAT = mode
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[mode] = [(label, call()) for label, call in conversation(backend.data, turn)]
+        result_format.RESULT_FORMAT = 'text'
+
+    turns = len(results['text'])
+    print(f"Standard conversation, {turns} tool calls, tokens: {method}\n")
+    print(f"{'':<34}{'text':>7}{'compact':>9}{'saved':>8}{'chars':>8}{'chars':>8}")
+    totals = {'text': [0, 0], 'compact': [0, 0]}
+    for i, ((label, text), (_, short)) in enumerate(zip(results['text'], results['compact'])):
+        text_tokens, short_tokens = count(text), count(short)
+        # Each result is re-sent with every later turn of the conversation
+        for mode, tokens in (('text', text_tokens), ('compact', short_tokens)):
+            totals[mode][0] += tokens
+            totals[mode][1] += tokens * (turns - i)
+        saved = 1 - short_tokens / text_tokens if text_tokens else 0
+        print(f"{label:<34}{text_tokens:>7}{short_tokens:>9}{saved:>8.0%}{len(text):>8}{len(short):>8}")
+
+    print()
+    for index, name in ((0, 'all results once'), (1, 'input tokens over the conversation')):
+        text_total, short_total = totals['text'][index], totals['compact'][index]
+        print(f"{name:<34}{text_total:>7}{short_total:>9}{1 - short_total / text_total:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,692 @@
+"""
+Local stand-in for the Google Calendar v3 and OpenWeather APIs.
+
+Serves seeded synthetic calendars over plain HTTP so the tools can be timed
+without live Google accounts or API keys. It covers what the agent calls:
+
+    GET    /calendar/v3/calendars/{id}/events            (paging, syncToken, timeMin/timeMax, q)
+    POST   /calendar/v3/calendars/{id}/events            (insert)
+    PATCH  /calendar/v3/calendars/{id}/events/{eventId}
+    DELETE /calendar/v3/calendars/{id}/events/{eventId}
+    POST   /calendar/v3/freeBusy
+    GET    /calendar/v3/users/me/calendarList
+    GET    /data/2.5/weather, /data/2.5/forecast, /geo/1.0/direct   (OpenWeather)
+    GET    /json/                                                   (IP geolocation)
+    POST   /token                                                   (OAuth token refresh)
+
+Partial responses (`fields=`) are honoured, so field masks show up in the byte counts.
+
+Every request is counted per endpoint together with the bytes that went over
+the wire (responses are gzipped when the client asks for it, like Google does).
+
+Run it standalone to point a live agent at it:
+    python -m benchmarks.fake_backend --port 8765 --events 2000
+    CALENDAR_API_ENDPOINT=http://127.0.0.1:8765/calendar/v3/ \
+    OPENWEATHER_BASE_URL=http://127.0.0.1:8765 OPENWEATHER_API_KEY=fake adk web
+"""
+import re
+import gzip
+import json
+import time
+import random
+import argparse
+import datetime
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+UTC = datetime.timezone.utc
+
+SUMMARIES = [
+    'Team standup', 'Sprint planning', '1:1 with manager', 'Client call', 'Lunch',
+    'Gym', 'Dentist appointment', 'Project review', 'Coffee chat', 'Focus time',
+    'Interview', 'Design sync', 'Yoga class', 'Board meeting', 'Study session',
+]
+CITIES = {
+    'toronto': (43.65, -79.38, 'CA'), 'ottawa': (45.42, -75.69, 'CA'),
+    'montreal': (45.50, -73.57, 'CA'), 'paris': (48.86, 2.35, 'FR'),
+    'london': (51.51, -0.13, 'GB'), 'tehran': (35.69, 51.39, 'IR'),
+}
+CONDITIONS = ['clear sky', 'few clouds', 'scattered clouds', 'light rain', 'overcast clouds', 'light snow']
+
+
+def _rfc3339(value: datetime.datetime) -> str:
+    return value.astimezone(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse_time(value: str) -> float:
+    return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def _bounds(event: dict):
+    start, end = event['start'], event['end']
+    if 'dateTime' in start:
+        return _parse_time(start['dateTime']), _parse_time(end['dateTime'])
+    return (
+        datetime.datetime.fromisoformat(start['date']).replace(tzinfo=UTC).timestamp(),
+        datetime.datetime.fromisoformat(end['date']).replace(tzinfo=UTC).timestamp(),
+    )
+
+
+def parse_fields(mask: str) -> dict:
+    """
+    Parse a partial-response mask like "nextPageToken,items(id,start/dateTime)".
+
+    Returns a tree of {name: subtree}, where a None subtree keeps the whole value.
+    """
+    pos = 0
+
+    def merge(tree, name, sub):
+        if name in tree and (tree[name] is None or sub is None):
+            tree[name] = None
+        elif name in tree:
+            for key, value in sub.items():
+                merge(tree[name], key, value)
+        else:
+            tree[name] = sub
+
+    def element(tree):
+        nonlocal pos
+        start = pos
+        while pos < len(mask) and mask[pos] not in ',()/':
+            pos += 1
+        name = mask[start:pos].strip()
+        sub = None
+        if pos < len(mask) and mask[pos] == '/':
+            pos += 1
+            sub = {}
+            element(sub)
+        elif pos < len(mask) and mask[pos] == '(':
+            pos += 1
+            sub = elements()
+            pos += 1
+        if name:
+            merge(tree, name, sub)
+
+    def elements():
+        nonlocal pos
+        tree = {}
+        while pos < len(mask) and mask[pos] != ')':
+            element(tree)
+            if pos < len(mask) and mask[pos] == ',':
+                pos += 1
+        return tree
+
+    return elements()
+
+
+def apply_fields(value, tree):
+    """Keep only the parts of a response selected by a parse_fields() tree."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: apply_fields(value[key], sub) for key, sub in tree.items() if key in value}
+    return value
+
+
+class FakeCalendarData:
+    """Seeded synthetic calendars plus a change log for sync tokens."""
+
+    def __init__(
+        self,
+        events: int = 500,
+        attendees: int = 20,
+        recurring: int = 20,
+        occurrences: int = 10,
+        calendars: int = 1,
+        days: int = 60,
+        busy_per_attendee: int = 40,
+        seed: int = 42,
+        start: datetime.datetime = None
+    ):
+        """
+        Args:
+            events: Single (non-recurring) events on the primary calendar
+            attendees: Number of other people with their own free/busy data
+            recurring: Recurring series on the primary calendar
+            occurrences: Instances per recurring series
+            calendars: Total calendars in calendarList (primary + secondaries)
+            days: Span of days the events are spread over
+            busy_per_attendee: Busy blocks generated for each attendee
+            seed: Random seed, so every run serves the same calendars
+            start: First day of the span (default: today, UTC midnight)
+        """
+        self.rng = random.Random(seed)
+        self.start = start or datetime.datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+        self.days = days
+        self.owner = 'owner@example.com'
+        self.attendees = [f'person{i}@example.com' for i in range(attendees)]
+        self.calendar_ids = ['primary'] + [f'team{i}@group.calendar.example.com' for i in range(1, calendars)]
+
+        self.version = 0
+        self.min_sync_version = 0
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # calendar id -> event id -> (event, start_ts, end_ts, version)
+        self._events = {cal: {} for cal in self.calendar_ids}
+        # calendar id -> event id -> recurring master row (returned when singleEvents=false)
+        self._masters = {cal: {} for cal in self.calendar_ids}
+        # calendar id -> ids of moved or cancelled instances (also returned when singleEvents=false)
+        self._exceptions = {cal: set() for cal in self.calendar_ids}
+
+        for cal in self.calendar_ids:
+            count = events if cal == 'primary' else max(1, events // 4)
+            for _ in range(count):
+                self._store(cal, self._random_event())
+            for _ in range(recurring if cal == 'primary' else recurring // 4):
+                self._add_series(cal, occurrences)
+
+        self.busy = {
+            email: self._random_busy(busy_per_attendee) for email in self.attendees
+        }
+
+    # ---------------------------------------------------------------- seeding
+
+    def _new_id(self, prefix='ev') -> str:
+        self._next_id += 1
+        return f'{prefix}{self._next_id:07d}'
+
+    def _random_start(self) -> datetime.datetime:
+        day = self.rng.randrange(self.days)
+        minutes = self.rng.randrange(7 * 4, 20 * 4) * 15
+        return self.start + datetime.timedelta(days=day, minutes=minutes)
+
+    def _random_event(self) -> dict:
+        start = self._random_start()
+        event = {
+            'summary': self.rng.choice(SUMMARIES),
+            'location': self.rng.choice(['', 'Room 4', 'Zoom', 'Cafe']),
+            'description': 'Synthetic benchmark event',
+        }
+        if self.rng.random() < 0.03:
+            event['start'] = {'date': start.date().isoformat()}
+            event['end'] = {'date': (start.date() + datetime.timedelta(days=1)).isoformat()}
+        else:
+            end = start + datetime.timedelta(minutes=self.rng.choice([15, 30, 45, 60, 90, 120]))
+            event['start'] = {'dateTime': _rfc3339(start), 'timeZone': 'UTC'}
+            event['end'] = {'dateTime': _rfc3339(end), 'timeZone': 'UTC'}
+        if self.rng.random() < 0.3:
+            code = ''.join(self.rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(10))
+            event['hangoutLink'] = f'https://meet.example.com/{code}'
+            event['conferenceData'] = {
+                'entryPoints': [
+                    {'entryPointType': 'video', 'uri': f'https://meet.example.com/{code}', 'label': f'meet.example.com/{code}'},
+                    {'entryPointType': 'phone', 'uri': 'tel:+1-555-010-0199', 'label': '+1 555-010-0199', 'pin': '123456789'},
+                    {'entryPointType': 'more', 'uri': f'https://tel.meet.example.com/{code}?pin=123456789'},
+                ],
+                'conferenceSolution': {'key': {'type': 'hangoutsMeet'}, 'name': 'Google Meet',
+                                       'iconUri': 'https://fonts.example.com/logo_meet_2020q4_color_2x_web_512dp.png'},
+                'conferenceId': code,
+            }
+        if self.attendees and self.rng.random() < 0.5:
+            guests = self.rng.sample(self.attendees, min(len(self.attendees), self.rng.randint(1, 6)))
+            event['attendees'] = [{'email': self.owner, 'responseStatus': 'accepted'}] + [
+                {'email': email, 'responseStatus': 'needsAction'} for email in guests
+            ]
+        return event
+
+    def _add_series(self, cal: str, occurrences: int):
+        template = self._random_event()
+        while 'date' in template['start']:
+            template = self._random_event()
+        master_id = self._new_id('rec')
+        first = datetime.datetime.fromisoformat(template['start']['dateTime'].replace('Z', '+00:00'))
+        length = _parse_time(template['end']['dateTime']) - first.timestamp()
+        freq = self.rng.choice(['DAILY', 'WEEKLY'])
+        step = datetime.timedelta(days=1 if freq == 'DAILY' else 7)
+        recurrence = [f'RRULE:FREQ={freq};COUNT={occurrences}']
+
+        # Some series carry the exceptions Google produces: an EXDATE, a
+        # cancelled instance and a moved one
+        exdate = cancelled = moved = None
+        if occurrences > 3:
+            exdate = 2 if self.rng.random() < 0.3 else None
+            cancelled = 1 if self.rng.random() < 0.3 else None
+            moved = 3 if self.rng.random() < 0.3 else None
+        if exdate is not None:
+            recurrence.append(f"EXDATE:{(first + exdate * step).strftime('%Y%m%dT%H%M%SZ')}")
+
+        master = dict(template, id=master_id, status='confirmed', recurrence=recurrence)
+        self._store(cal, master, series=True)
+
+        for i in range(occurrences):
+            if i == exdate:
+                continue
+            original = first + i * step
+            start = original + datetime.timedelta(hours=1) if i == moved else original
+            instance = dict(template)
+            instance['start'] = {'dateTime': _rfc3339(start), 'timeZone': 'UTC'}
+            instance['end'] = {'dateTime': _rfc3339(start + datetime.timedelta(seconds=length)), 'timeZone': 'UTC'}
+            instance['recurringEventId'] = master_id
+            instance['originalStartTime'] = {'dateTime': _rfc3339(original), 'timeZone': 'UTC'}
+            instance['id'] = f"{master_id}_{original.strftime('%Y%m%dT%H%M%SZ')}"
+            if i == moved:
+                instance['summary'] = f"{template['summary']} (moved)"
+            if i == cancelled:
+                instance['status'] = 'cancelled'
+            if i in (moved, cancelled):
+                self._exceptions[cal].add(instance['id'])
+            self._store(cal, instance)
+
+    def _random_busy(self, count: int):
+        busy = []
+        for _ in range(count):
+            start = self._random_start()
+            end = start + datetime.timedelta(minutes=self.rng.choice([30, 60, 90]))
+            busy.append((start.timestamp(), end.timestamp()))
+        return sorted(busy)
+
+    # ---------------------------------------------------------------- storage
+
+    def _store(self, cal: str, event: dict, series: bool = False) -> dict:
+        event.setdefault('id', self._new_id())
+        event.setdefault('status', 'confirmed')
+        event.setdefault('organizer', {'email': self.owner, 'self': True})
+        event.setdefault('kind', 'calendar#event')
+        event.setdefault('creator', {'email': self.owner, 'self': True})
+        event.setdefault('created', _rfc3339(self.start))
+        event.setdefault('iCalUID', f"{event['id']}@example.com")
+        event.setdefault('sequence', 0)
+        event.setdefault('eventType', 'default')
+        event.setdefault('reminders', {'useDefault': True})
+        event['htmlLink'] = f"https://calendar.example.com/event?eid={event['id']}"
+        self.version += 1
+        event['etag'] = f'"{self.version}"'
+        event['updated'] = _rfc3339(datetime.datetime.now(UTC))
+        start, end = _bounds(event) if event['status'] != 'cancelled' else (0, 0)
+        table = self._masters if series else self._events
+        table[cal][event['id']] = (event, start, end, self.version)
+        return event
+
+    def calendar(self, cal: str):
+        if cal == self.owner:
+            cal = 'primary'
+        return cal if cal in self._events else None
+
+    def list_events(self, cal: str, params: dict):
+        """Return a Calendar v3 events.list response or an (status, reason) error."""
+        single = params.get('singleEvents', 'false') == 'true'
+        show_deleted = params.get('showDeleted', 'false') == 'true'
+        page_size = min(int(params.get('maxResults', 250)), 2500)
+        offset = int(params.get('pageToken', 0))
+
+        with self._lock:
+            if 'syncToken' in params:
+                token = params['syncToken']
+                if not token.isdigit() or int(token) < self.min_sync_version:
+                    return 410, 'fullSyncRequired'
+                since = int(token)
+                rows = [row for row in self._events[cal].values() if row[3] > since]
+            else:
+                time_min = _parse_time(params['timeMin']) if 'timeMin' in params else None
+                time_max = _parse_time(params['timeMax']) if 'timeMax' in params else None
+                query = params.get('q', '').lower()
+                rows = [
+                    row for row in self._events[cal].values()
+                    if (show_deleted or row[0]['status'] != 'cancelled')
+                    and (time_min is None or row[2] > time_min)
+                    and (time_max is None or row[1] < time_max)
+                    and (not query or query in row[0].get('summary', '').lower())
+                ]
+            if not single:
+                # Collapse instances into their series master, like the real API;
+                # moved and cancelled instances stay as exceptions
+                exceptions = self._exceptions[cal]
+                rows = [row for row in rows if 'recurringEventId' not in row[0] or row[0]['id'] in exceptions]
+                rows += [
+                    row for row in self._masters[cal].values()
+                    if 'syncToken' not in params or row[3] > since
+                ]
+            rows.sort(key=lambda row: (row[1], row[0]['id']))
+            version = self.version
+
+        page = rows[offset:offset + page_size]
+        response = {
+            'kind': 'calendar#events',
+            'summary': self.owner if cal == 'primary' else cal,
+            'timeZone': 'UTC',
+            'items': [row[0] for row in page],
+        }
+        if offset + page_size < len(rows):
+            response['nextPageToken'] = str(offset + page_size)
+        else:
+            response['nextSyncToken'] = str(version)
+        return response
+
+    def insert_event(self, cal: str, body: dict) -> dict:
+        with self._lock:
+            body.pop('id', None)
+            return self._store(cal, dict(body))
+
+    def patch_event(self, cal: str, event_id: str, body: dict):
+        with self._lock:
+            row = self._events[cal].get(event_id)
+            if row is None or row[0]['status'] == 'cancelled':
+                return None
+            return self._store(cal, dict(row[0], **body))
+
+    def delete_event(self, cal: str, event_id: str) -> bool:
+        with self._lock:
+            row = self._events[cal].get(event_id)
+            if row is None or row[0]['status'] == 'cancelled':
+                return False
+            self._store(cal, {'id': event_id, 'status': 'cancelled'})
+            return True
+
+    def expire_sync_tokens(self):
+        """Make every outstanding sync token answer 410 GONE."""
+        with self._lock:
+            self.min_sync_version = self.version + 1
+
+    def free_busy(self, body: dict) -> dict:
+        time_min, time_max = _parse_time(body['timeMin']), _parse_time(body['timeMax'])
+        calendars = {}
+        for item in body.get('items', []):
+            cal_id = item['id']
+            cal = self.calendar(cal_id)
+            if cal is not None:
+                with self._lock:
+                    blocks = sorted(
+                        (row[1], row[2]) for row in self._events[cal].values()
+                        if row[0]['status'] != 'cancelled' and row[0]['start'].get('dateTime')
+                        and row[0].get('transparency') != 'transparent'
+                    )
+            elif cal_id in self.busy:
+                blocks = self.busy[cal_id]
+            else:
+                calendars[cal_id] = {'errors': [{'domain': 'global', 'reason': 'notFound'}], 'busy': []}
+                continue
+            calendars[cal_id] = {'busy': [
+                {'start': _rfc3339(datetime.datetime.fromtimestamp(max(s, time_min), UTC)),
+                 'end': _rfc3339(datetime.datetime.fromtimestamp(min(e, time_max), UTC))}
+                for s, e in blocks if e > time_min and s < time_max
+            ]}
+        return {'kind': 'calendar#freeBusy', 'timeMin': body['timeMin'], 'timeMax': body['timeMax'],
+                'calendars': calendars}
+
+    def calendar_list(self) -> dict:
+        items = []
+        for cal in self.calendar_ids:
+            primary = cal == 'primary'
+            items.append({
+                'kind': 'calendar#calendarListEntry',
+                'id': self.owner if primary else cal,
+                'summary': self.owner if primary else f'Team calendar {cal.split("@")[0]}',
+                'timeZone': 'UTC',
+                'accessRole': 'owner' if primary else 'reader',
+                'selected': True,
+                'primary': primary,
+            })
+        return {'kind': 'calendar#calendarList', 'items': items}
+
+
+# ------------------------------------------------------------------ weather
+
+def _city_info(params: dict):
+    if 'lat' in params:
+        lat, lon = float(params['lat']), float(params['lon'])
+        for name, (c_lat, c_lon, country) in CITIES.items():
+            if abs(c_lat - lat) < 0.01 and abs(c_lon - lon) < 0.01:
+                return name.title(), lat, lon, country
+        return 'Somewhere', lat, lon, 'XX'
+    name = params.get('q', 'Toronto').split(',')[0].strip()
+    lat, lon, country = CITIES.get(name.lower(), (0.0, 0.0, 'XX'))
+    return name.title(), lat, lon, country
+
+
+def _weather_sample(rng: random.Random, when: datetime.datetime) -> dict:
+    temp = round(rng.uniform(-10, 25), 2)
+    return {
+        'dt': int(when.timestamp()),
+        'main': {'temp': temp, 'feels_like': temp - 2, 'temp_min': temp - 1, 'temp_max': temp + 1,
+                 'pressure': 1013, 'humidity': rng.randint(30, 95)},
+        'weather': [{'id': 800, 'main': 'Clouds', 'description': rng.choice(CONDITIONS), 'icon': '03d'}],
+        'clouds': {'all': rng.randint(0, 100)},
+        'wind': {'speed': round(rng.uniform(0, 12), 2), 'deg': rng.randint(0, 359)},
+        'visibility': 10000,
+    }
+
+
+def current_weather(params: dict) -> dict:
+    name, lat, lon, country = _city_info(params)
+    rng = random.Random(f'{name}-now')
+    data = _weather_sample(rng, datetime.datetime.now(UTC))
+    data.update({'coord': {'lat': lat, 'lon': lon}, 'sys': {'country': country}, 'name': name, 'cod': 200})
+    return data
+
+
+def forecast(params: dict) -> dict:
+    name, lat, lon, country = _city_info(params)
+    rng = random.Random(f'{name}-forecast')
+    start = datetime.datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+    start -= datetime.timedelta(hours=start.hour % 3)
+    items = []
+    for i in range(40):
+        when = start + datetime.timedelta(hours=3 * (i + 1))
+        item = _weather_sample(rng, when)
+        item['dt_txt'] = when.strftime('%Y-%m-%d %H:%M:%S')
+        items.append(item)
+    return {'cod': '200', 'cnt': len(items), 'list': items,
+            'city': {'name': name, 'coord': {'lat': lat, 'lon': lon}, 'country': country}}
+
+
+def geocode(params: dict) -> list:
+    name, lat, lon, country = _city_info(params)
+    if country == 'XX':
+        return []
+    return [{'name': name, 'lat': lat, 'lon': lon, 'country': country}]
+
+
+# ------------------------------------------------------------------- server
+
+_EVENTS_PATH = re.compile(r'^/calendar/v3/calendars/([^/]+)/events(?:/([^/]+))?$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeGoogle/1.0'
+    # Headers and body are written separately; without this Nagle + delayed ACK adds ~40 ms
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    def _send(self, route: str, status: int, payload=None, received: int = 0):
+        fields = self._params.get('fields') if status < 400 else None
+        if payload is not None and fields:
+            payload = apply_fields(payload, parse_fields(fields))
+        body = b'' if payload is None else json.dumps(payload).encode()
+        headers = {'Content-Type': 'application/json; charset=UTF-8'}
+        if body and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Content-Length'] = str(len(body))
+
+        backend = self.server.backend
+        if backend.latency:
+            time.sleep(backend.latency)
+        # Count the request before answering, so a client reading stats() right
+        # after its last response sees it
+        request_bytes = len(self.requestline) + sum(len(k) + len(v) + 4 for k, v in self.headers.items())
+        backend.record(route, request_bytes + received, len(body), status)
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def _error(self, route: str, status: int, reason: str, received: int = 0):
+        self._send(route, status, {'error': {'code': status, 'message': reason,
+                                             'errors': [{'domain': 'global', 'reason': reason}]}}, received)
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        path = unquote(parts.path)
+        params = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        self._params = params
+        raw = self._read_body() if method in ('POST', 'PATCH', 'PUT') else b''
+        data = self.server.backend.data
+
+        match = _EVENTS_PATH.match(path)
+        if match:
+            cal = data.calendar(match.group(1))
+            event_id = match.group(2)
+            route = 'events.' + {'GET': 'list' if event_id is None else 'get', 'POST': 'insert',
+                                 'PATCH': 'patch', 'PUT': 'update', 'DELETE': 'delete'}[method]
+            if cal is None:
+                return self._error(route, 404, 'notFound', len(raw))
+            if method == 'GET' and event_id is None:
+                result = data.list_events(cal, params)
+                if isinstance(result, tuple):
+                    return self._error(route, *result, len(raw))
+                return self._send(route, 200, result, len(raw))
+            if method == 'POST' and event_id is None:
+                return self._send(route, 200, data.insert_event(cal, json.loads(raw or b'{}')), len(raw))
+            if method in ('PATCH', 'PUT') and event_id:
+                event = data.patch_event(cal, event_id, json.loads(raw or b'{}'))
+                if event is None:
+                    return self._error(route, 404, 'notFound', len(raw))
+                return self._send(route, 200, event, len(raw))
+            if method == 'DELETE' and event_id:
+                if not data.delete_event(cal, event_id):
+                    return self._error(route, 410, 'deleted', len(raw))
+                return self._send(route, 204, None, len(raw))
+            return self._error(route, 405, 'methodNotAllowed', len(raw))
+
+        if path == '/calendar/v3/freeBusy' and method == 'POST':
+            return self._send('freebusy.query', 200, data.free_busy(json.loads(raw)), len(raw))
+        if path == '/calendar/v3/users/me/calendarList' and method == 'GET':
+            return self._send('calendarList.list', 200, data.calendar_list(), len(raw))
+        if path == '/data/2.5/weather':
+            return self._send('weather.current', 200, current_weather(params))
+        if path == '/data/2.5/forecast':
+            return self._send('weather.forecast', 200, forecast(params))
+        if path == '/geo/1.0/direct':
+            return self._send('weather.geocode', 200, geocode(params))
+        if path == '/token' and method == 'POST':
+            return self._send('oauth.token', 200, {'access_token': f'fake-{random.getrandbits(64):016x}',
+                                                   'expires_in': 3600, 'token_type': 'Bearer'}, len(raw))
+        if path == '/json/':
+            return self._send('location', 200, {'city': 'Ottawa', 'country': 'CA', 'ip': '203.0.113.7'})
+        return self._error('unknown', 404, 'notFound', len(raw))
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_PUT(self):
+        self._dispatch('PUT')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+
+class FakeBackend:
+    """Threaded HTTP server around a FakeCalendarData, with per-endpoint counters."""
+
+    def __init__(self, data: FakeCalendarData = None, host: str = '127.0.0.1', port: int = 0, latency_ms: float = 0):
+        """
+        Args:
+            data: Calendars to serve (default: FakeCalendarData())
+            host: Interface to bind
+            port: Port to bind; 0 picks a free one
+            latency_ms: Artificial delay added to every response
+        """
+        self.data = data or FakeCalendarData()
+        self.latency = latency_ms / 1000.0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.backend = self
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'calls': 0, 'bytes_sent': 0, 'bytes_received': 0, 'errors': 0})
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def calendar_endpoint(self) -> str:
+        """Value for CALENDAR_API_ENDPOINT."""
+        return f'{self.url}/calendar/v3/'
+
+    def record(self, route: str, received: int, sent: int, status: int):
+        with self._stats_lock:
+            stats = self._stats[route]
+            stats['calls'] += 1
+            stats['bytes_received'] += received
+            stats['bytes_sent'] += sent
+            if status >= 400:
+                stats['errors'] += 1
+
+    def stats(self) -> dict:
+        """Per-endpoint counters: calls, bytes_sent, bytes_received, errors."""
+        with self._stats_lock:
+            return {route: dict(values) for route, values in self._stats.items()}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._stats.clear()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-backend', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve fake Google Calendar / OpenWeather APIs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--events', type=int, default=500)
+    parser.add_argument('--attendees', type=int, default=20)
+    parser.add_argument('--recurring', type=int, default=20)
+    parser.add_argument('--occurrences', type=int, default=10)
+    parser.add_argument('--calendars', type=int, default=1)
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    data = FakeCalendarData(
+        events=args.events, attendees=args.attendees, recurring=args.recurring,
+        occurrences=args.occurrences, calendars=args.calendars, days=args.days, seed=args.seed
+    )
+    backend = FakeBackend(data, args.host, args.port, args.latency_ms)
+    print(f"✅ Fake backend on {backend.url}")
+    print(f"   CALENDAR_API_ENDPOINT={backend.calendar_endpoint}")
+    print(f"   OPENWEATHER_BASE_URL={backend.url}")
+    print(f"   Attendees: {', '.join(data.attendees[:3])}{' ...' if len(data.attendees) > 3 else ''}")
+    try:
+        backend._server.serve_forever()
+    except KeyboardInterrupt:
+        backend.stop()
+
+
+if __name__ == '__main__':
+    main()
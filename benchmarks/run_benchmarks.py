@@ -0,0 +1,198 @@
+"""
+Per-tool latency, API calls and bytes transferred against the fake backend.
+
+Starts benchmarks.fake_backend on a free port, points the Calendar service
+and the weather tools at it, and calls each tool repeatedly. For every tool it
+reports p50/p95/p99 latency, API calls per call and bytes on the wire per call.
+
+By default the in-process caches (event store, weather, location) behave as
+in production, so the numbers are steady-state. `--cold` clears them before
+every call to measure the worst case.
+
+Save a run and compare a later build against it to catch regressions:
+    python -m benchmarks.run_benchmarks --json baseline.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json --max-regression 0.25
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import datetime
+import itertools
+import contextlib
+
+from benchmarks.fake_backend import FakeBackend, FakeCalendarData
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-pct * len(ordered) // 100))
+    return ordered[int(rank) - 1]
+
+
+def _configure(backend):
+    """Point the agent at the fake backend; must run before agent.tools is imported."""
+    os.environ['CALENDAR_API_ENDPOINT'] = backend.calendar_endpoint
+    os.environ['OPENWEATHER_BASE_URL'] = backend.url
+    os.environ.setdefault('OPENWEATHER_API_KEY', 'benchmark')
+    os.environ.setdefault('USER_TIMEZONE', 'UTC')
+
+    from google.oauth2.credentials import Credentials
+    from agent.tools import calendar_service, weather_tools
+
+    calendar_service.set_calendar_credentials(Credentials(token='benchmark'))
+    weather_tools.LOCATION_PROVIDERS = [('fake', f'{backend.url}/json/')]
+
+
+def _clear_caches():
+    from agent.tools import calendars, event_store, weather_tools
+
+    with event_store._stores_lock:
+        event_store._stores.clear()
+    calendars._calendar_list_cache.clear()
+    weather_tools._weather_cache.clear()
+    weather_tools._location_cache.clear()
+
+
+def build_scenarios(data):
+    """Return (name, callable) pairs for every tool under test."""
+    from agent.tools import calendar_tools, weather_tools
+
+    day = data.start + datetime.timedelta(days=1)
+    window_min = day.isoformat()
+    window_max = (day + datetime.timedelta(days=5)).isoformat()
+    attendees = data.attendees[:5]
+    proposed = {
+        'start': {'dateTime': (day + datetime.timedelta(hours=14)).isoformat()},
+        'end': {'dateTime': (day + datetime.timedelta(hours=15)).isoformat()},
+    }
+    # Free late-evening slots months ahead, a new one per call
+    far_slots = (day + datetime.timedelta(days=90 + i, hours=22) for i in itertools.count())
+
+    def create_far_event():
+        start = next(far_slots)
+        return calendar_tools.create_calendar_event(
+            'Benchmark', start.isoformat(), (start + datetime.timedelta(minutes=30)).isoformat())
+
+    return [
+        ('list_upcoming_events', lambda: calendar_tools.list_upcoming_events(10)),
+        ('search_events', lambda: calendar_tools.search_events('review', 10)),
+        ('conflict_calendar', lambda: calendar_tools.conflict_calendar(proposed)),
+        ('create_calendar_event', create_far_event),
+        ('check_free_busy', lambda: calendar_tools.check_free_busy(attendees, window_min, window_max)),
+        ('find_meeting_slots', lambda: calendar_tools.find_meeting_slots(attendees, 60, window_min, window_max)),
+        ('get_current_weather', lambda: weather_tools.get_current_weather('Ottawa')),
+        ('get_forecast_summary', lambda: weather_tools.get_forecast_summary('Ottawa', 5)),
+        ('get_location', lambda: weather_tools.get_location()),
+    ]
+
+
+def run_scenario(backend, func, iterations, cold):
+    latencies = []
+    backend.reset_stats()
+    sink = io.StringIO()
+    for _ in range(iterations):
+        if cold:
+            _clear_caches()
+        with contextlib.redirect_stdout(sink):
+            t0 = time.perf_counter()
+            result = func()
+            latencies.append(time.perf_counter() - t0)
+        if isinstance(result, str) and result.startswith('❌'):
+            raise RuntimeError(result)
+        sink.seek(0)
+        sink.truncate()
+
+    stats = backend.stats()
+    calls = sum(s['calls'] for s in stats.values())
+    sent = sum(s['bytes_sent'] for s in stats.values())
+    received = sum(s['bytes_received'] for s in stats.values())
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'calls_per_run': calls / iterations,
+        'bytes_per_run': (sent + received) / iterations,
+        'endpoints': sorted(stats),
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Return a list of human-readable regressions against a saved run."""
+    problems = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + max_regression) and current['p95_ms'] - previous['p95_ms'] > 1:
+            problems.append(f"{name}: p95 {previous['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if current['calls_per_run'] > previous['calls_per_run'] + 1e-9:
+            problems.append(f"{name}: API calls {previous['calls_per_run']:.2f} -> {current['calls_per_run']:.2f} per run")
+        if current['bytes_per_run'] > previous['bytes_per_run'] * (1 + max_regression) + 1024:
+            problems.append(f"{name}: bytes {previous['bytes_per_run']:.0f} -> {current['bytes_per_run']:.0f} per run")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the agent tools against a local fake backend')
+    parser.add_argument('--events', type=int, default=2000, help='single events on the primary calendar')
+    parser.add_argument('--attendees', type=int, default=20)
+    parser.add_argument('--recurring', type=int, default=50, help='recurring series on the primary calendar')
+    parser.add_argument('--occurrences', type=int, default=10, help='instances per recurring series')
+    parser.add_argument('--days', type=int, default=60)
+    parser.add_argument('--calendars', type=int, default=1, help='calendars in calendarList (primary + secondaries)')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--latency-ms', type=float, default=0, help='artificial network delay per request')
+    parser.add_argument('--cold', action='store_true', help='clear in-process caches before every call')
+    parser.add_argument('--only', nargs='*', help='run only these tools')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--baseline', help='compare against a previous --json file')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed p95/bytes growth (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    # Sync progress is logged at INFO; keep the table readable
+    logging.disable(logging.INFO)
+
+    data = FakeCalendarData(
+        events=args.events, attendees=args.attendees, recurring=args.recurring,
+        occurrences=args.occurrences, calendars=args.calendars, days=args.days
+    )
+    with FakeBackend(data, latency_ms=args.latency_ms) as backend:
+        _configure(backend)
+        results = {}
+        mode = 'cold' if args.cold else 'warm'
+        print(f"Fake backend {backend.url}: {args.events} events, {args.recurring}x{args.occurrences} "
+              f"recurring, {args.attendees} attendees, {args.latency_ms:g} ms latency, {mode} caches\n")
+        print(f"{'tool':<22}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'calls':>8}{'KB':>10}")
+        for name, func in build_scenarios(data):
+            if args.only and name not in args.only:
+                continue
+            result = run_scenario(backend, func, args.iterations, args.cold)
+            results[name] = result
+            print(f"{name:<22}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}"
+                  f"{result['calls_per_run']:>8.2f}{result['bytes_per_run'] / 1024:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.max_regression)
+        if problems:
+            print("\n❌ Regressions against baseline:")
+            for problem in problems:
+                print(f"   • {problem}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,17 @@
 import os
+import json
+import base64
+import hashlib
+import secrets
 import datetime
 import flask
-import google.auth.transport.requests
 from google_auth_oauthlib.flow import Flow
-from googleapiclient.discovery import build
 from flask import session, redirect, url_for, request
 from google.oauth2.credentials import Credentials
 
+from agent.tools.event_iter import LIST_FIELDS, iter_events
+from agent.tools.token_store import TokenStore, UserServiceCache
+
 app = flask.Flask(__name__)
 app.secret_key = "a3f9c1d27b4e3a9e1c847d2a90c9f5ef"
 
@@ -17,6 +22,14 @@ SCOPES = ['https://www.googleapis.com/auth/calendar',
           'openid'
          ]
 
+# Tokens are kept server-side; the session cookie only holds the user id
+services = UserServiceCache(TokenStore())
+
+# /api/events paging and the event fields it returns
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 250
+API_EVENT_FIELDS = ('id', 'status', 'summary', 'location', 'start', 'end', 'htmlLink')
+
 def credentials_to_dict(credentials):
     return {
         'token': credentials.token,
@@ -27,24 +40,33 @@ def credentials_to_dict(credentials):
         'scopes': credentials.scopes
     }
 
-def get_credentials():
-    """Helper function to get credentials from session"""
-    if 'credentials' not in session:
-        return None
-    
-    creds_dict = session['credentials']
-    
-    # Check if all required fields are present
-    required_fields = ['token', 'refresh_token', 'token_uri', 'client_id', 'client_secret']
-    if not all(field in creds_dict and creds_dict[field] for field in required_fields):
-        print("Missing credentials fields:", {k: v for k, v in creds_dict.items()})
-        return None
-    
-    return Credentials(**creds_dict)
+def user_id_for(credentials):
+    """Stable id of the Google account (the ID token's subject), or a random one"""
+    if credentials.id_token:
+        from google.auth import jwt
+
+        # Received straight from Google's token endpoint over TLS, so not re-verified
+        claims = jwt.decode(credentials.id_token, verify=False)
+        if claims.get('sub'):
+            return claims['sub']
+    return secrets.token_urlsafe(16)
+
+def get_user_id():
+    """Helper function to get the signed-in user from session"""
+    if 'credentials' in session:
+        # Session from before the token store: move the tokens server-side
+        creds_dict = session.pop('credentials')
+        required_fields = ['token', 'refresh_token', 'token_uri', 'client_id', 'client_secret']
+        if all(creds_dict.get(field) for field in required_fields):
+            session['user_id'] = secrets.token_urlsafe(16)
+            services.add_user(session['user_id'], Credentials(**creds_dict))
+        else:
+            print("Missing credentials fields:", list(creds_dict.keys()))
+    return session.get('user_id')
 
 @app.route('/')
 def index():
-    if 'credentials' not in session:
+    if not get_user_id():
         return redirect('/authorize')
     return redirect('/events')
 
@@ -81,10 +103,12 @@ def oauth2callback():
     
     credentials = flow.credentials
     
-    # Store credentials properly
-    session['credentials'] = credentials_to_dict(credentials)
+    # Store credentials server-side, keyed by the Google account
+    user_id = user_id_for(credentials)
+    services.add_user(user_id, credentials)
+    session['user_id'] = user_id
     
-    print("✅ Credentials saved:", session['credentials'].keys())
+    print("✅ Credentials saved:", list(credentials_to_dict(credentials).keys()))
     print("Refresh token present:", bool(credentials.refresh_token))
     
     return redirect('/events')
@@ -92,29 +116,33 @@ def oauth2callback():
 
 @app.route('/logout')
 def logout():
+    user_id = session.get('user_id')
+    if user_id:
+        services.forget(user_id, delete=True)
     session.clear()
     return 'Logged out! <a href="/authorize">Login again</a>'
 
 
 @app.route('/events')
 def events():
-    creds = get_credentials()
-    if not creds:
+    user_id = get_user_id()
+    if not user_id:
         return redirect('/authorize')
-    
-    service = build('calendar', 'v3', credentials=creds)
 
     # Fix deprecation warning
     now = datetime.datetime.now(datetime.UTC).isoformat()
-    events_result = service.events().list(
-        calendarId='primary', 
-        timeMin=now,
-        maxResults=5, 
-        singleEvents=True, 
-        orderBy='startTime'
-    ).execute()
-
-    events = events_result.get('items', [])
+    with services.service(user_id) as service:
+        if service is None:
+            return redirect('/authorize')
+        events = list(iter_events(
+            service,
+            'primary',
+            fields=LIST_FIELDS,
+            limit=5,
+            timeMin=now,
+            singleEvents=True,
+            orderBy='startTime'
+        ))
 
     if not events:
         return "No upcoming events found."
@@ -130,11 +158,9 @@ def events():
 
 @app.route('/add-event')
 def add_event():
-    creds = get_credentials()
-    if not creds:
+    user_id = get_user_id()
+    if not user_id:
         return redirect('/authorize')
-    
-    service = build('calendar', 'v3', credentials=creds)
 
     event = {
         'summary': 'Test event from Flask',
@@ -142,9 +168,117 @@ def add_event():
         'end': {'dateTime': '2025-11-24T11:00:00+01:00'},
     }
 
-    created_event = service.events().insert(calendarId='primary', body=event).execute()
+    with services.service(user_id) as service:
+        if service is None:
+            return redirect('/authorize')
+        created_event = service.events().insert(calendarId='primary', body=event).execute()
+    store = services.cached_store(user_id)
+    if store:
+        store.upsert(created_event)
     return f"✅ Event created on your calendar!<br><a href='/events'>View Events</a>"
 
 
+def parse_time(value, name):
+    """RFC 3339 timestamp from a query parameter (None if missing)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} is not an RFC 3339 timestamp")
+    if parsed.tzinfo is None:
+        raise ValueError(f"{name} needs a UTC offset")
+    return parsed
+
+def encode_page_token(start, event_id):
+    raw = json.dumps([start.isoformat(), event_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_page_token(token):
+    """(start, event id) of the last event on the previous page"""
+    if not token:
+        return None
+    try:
+        start, event_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return datetime.datetime.fromisoformat(start), event_id
+    except (ValueError, TypeError):
+        raise ValueError("invalid pageToken")
+
+def events_after(events, cursor):
+    """Skip (start, event) pairs up to and including the cursor event"""
+    after_start, after_id = cursor
+    passed = False
+    for start, event in events:
+        if start < after_start:
+            continue
+        if start == after_start and not passed:
+            passed = event['id'] == after_id
+            continue
+        yield start, event
+
+
+@app.route('/api/events')
+def api_events():
+    """
+    Events as JSON, answered from the user's synced event store.
+
+    Query parameters: timeMin and timeMax (RFC 3339, timeMin defaults to the
+    current minute), maxResults (up to 250) and pageToken. The ETag changes
+    only when the calendar or the query changes, so pollers sending
+    If-None-Match get an empty 304 most of the time.
+    """
+    user_id = get_user_id()
+    if not user_id:
+        return flask.jsonify(error="Not signed in"), 401
+
+    try:
+        time_min = parse_time(request.args.get('timeMin'), 'timeMin')
+        time_max = parse_time(request.args.get('timeMax'), 'timeMax')
+        page_size = int(request.args.get('maxResults', API_PAGE_SIZE))
+        if not 1 <= page_size <= API_MAX_PAGE_SIZE:
+            raise ValueError(f"maxResults must be between 1 and {API_MAX_PAGE_SIZE}")
+        page_token = request.args.get('pageToken')
+        cursor = decode_page_token(page_token)
+    except ValueError as e:
+        return flask.jsonify(error=str(e)), 400
+    if time_min is None:
+        # Rounded so the ETag stays the same for a minute of polling
+        time_min = datetime.datetime.now(datetime.UTC).replace(second=0, microsecond=0)
+
+    store = services.synced_store(user_id)
+    if store is None:
+        return flask.jsonify(error="Authorization expired"), 401
+
+    query = f"{store.state_tag}|{time_min.isoformat()}|{time_max}|{page_size}|{page_token}"
+    etag = hashlib.sha1(query.encode()).hexdigest()[:20]
+    if request.if_none_match.contains(etag):
+        response = flask.Response(status=304)
+    else:
+        events = store.iter_between(time_min, time_max)
+        if cursor:
+            events = events_after(events, cursor)
+        page = []
+        next_token = None
+        for start, event in events:
+            if len(page) == page_size:
+                last_start, last_event = page[-1]
+                next_token = encode_page_token(last_start, last_event['id'])
+                break
+            page.append((start, event))
+
+        body = {
+            'timeZone': store.time_zone,
+            'items': [{key: event[key] for key in API_EVENT_FIELDS if key in event} for _, event in page],
+        }
+        if next_token:
+            body['nextPageToken'] = next_token
+        response = flask.jsonify(body)
+
+    response.set_etag(etag)
+    # Let browsers keep the body but always revalidate it
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file